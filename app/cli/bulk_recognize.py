@@ -0,0 +1,85 @@
+"""
+Recognize plates in archived images offline, on a pool of worker processes.
+
+    python -m app.cli.bulk_recognize SOURCE --output results.csv|results.parquet
+                                     [--engine local|vision] [--workers N]
+                                     [--profile fast|balanced|thorough] [--batch-size N]
+
+SOURCE is a directory (walked recursively for .jpg/.jpeg/.png) or a
+manifest: a text file with one path per line, or a CSV with a "path" and
+optional "camera_id" column. Relative manifest paths are resolved from the
+manifest's directory.
+
+A .csv output is appended to; a .parquet output is a directory of part
+files. Rows are committed every --batch-size images, and images already in
+the output are skipped, so rerunning an interrupted command resumes it.
+"""
+import argparse
+import csv
+import json
+import os
+from typing import Iterator, Optional, Tuple
+
+from app.config.settings import ImageConfig, PipelineConfig
+from app.services.bulk_recognition_service import (
+    BulkRecognitionService, CsvResultWriter, ParquetResultWriter, GCP_VISION, LOCAL
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENGINES = {'local': LOCAL, 'vision': GCP_VISION}
+
+
+def iter_images(source: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """(path, camera_id) pairs of a directory or manifest, in a stable order"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.rsplit('.', 1)[-1].lower() in ImageConfig.ALLOWED_EXTENSIONS:
+                    yield os.path.join(root, name), None
+        return
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, newline='') as f:
+        first_line = f.readline()
+        f.seek(0)
+        if first_line.strip().split(',')[0].strip().lower() == 'path':
+            for row in csv.DictReader(f):
+                if row.get('path'):
+                    yield os.path.join(base, row['path']), row.get('camera_id') or None
+            return
+        for line in f:
+            if line.strip():
+                yield os.path.join(base, line.strip()), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='Image directory or manifest file')
+    parser.add_argument('--output', required=True, help='Results file (.csv) or Parquet directory (.parquet)')
+    parser.add_argument('--engine', choices=ENGINES, default='local')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per core)')
+    parser.add_argument('--profile', choices=PipelineConfig.PROFILES, help='Local pipeline profile')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per committed batch')
+    args = parser.parse_args(argv)
+
+    if args.output.endswith('.parquet'):
+        writer = ParquetResultWriter(args.output)
+    else:
+        writer = CsvResultWriter(args.output)
+
+    service = BulkRecognitionService(
+        writer,
+        engine=ENGINES[args.engine],
+        workers=args.workers,
+        profile=args.profile,
+        batch_size=args.batch_size
+    )
+    stats = service.run(iter_images(args.source))
+    logger.info(f"Bulk recognition finished: {json.dumps(stats)}")
+
+
+if __name__ == '__main__':
+    main()
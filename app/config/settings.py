@@ -17,6 +17,237 @@ class OCRConfig:
 class ImageConfig:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+    # Checked against the header before any pixel buffer is allocated
+    MAX_MEGAPIXELS = float(os.getenv('MAX_IMAGE_MEGAPIXELS', 40))
+    
+    
+class QualityGateConfig:
+    # Cheap pre-check on a thumbnail; frames failing it skip the threshold/OCR pipeline.
+    # Opt-in: its thresholds need tuning per camera before it can reject real traffic
+    ENABLED = os.getenv('QUALITY_GATE_ENABLED', 'False').lower() == 'true'
+    THUMBNAIL_WIDTH = int(os.getenv('QUALITY_GATE_THUMBNAIL_WIDTH', 320))
+    MIN_SHARPNESS = float(os.getenv('QUALITY_GATE_MIN_SHARPNESS', 15))  # Laplacian variance
+    MIN_BRIGHTNESS = float(os.getenv('QUALITY_GATE_MIN_BRIGHTNESS', 25))
+    MAX_BRIGHTNESS = float(os.getenv('QUALITY_GATE_MAX_BRIGHTNESS', 235))
+    MIN_CONTRAST = float(os.getenv('QUALITY_GATE_MIN_CONTRAST', 20))  # p95 - p5 intensity
+    MAX_CLIPPED_FRACTION = float(os.getenv('QUALITY_GATE_MAX_CLIPPED_FRACTION', 0.9))
+    MIN_EDGE_DENSITY = float(os.getenv('QUALITY_GATE_MIN_EDGE_DENSITY', 0.005))
+    
+    
+class AdaptiveScheduleConfig:
+    # Learn the threshold/variant order of the santifiorino pipeline from accepted plates
+    ENABLED = os.getenv('ADAPTIVE_SCHEDULE_ENABLED', 'False').lower() == 'true'
+    STATE_PATH = os.getenv('ADAPTIVE_SCHEDULE_STATE_PATH', 'threshold_schedule.json')
+    CONTEXT_BY_CAMERA = os.getenv('ADAPTIVE_SCHEDULE_BY_CAMERA', 'True').lower() == 'true'
+    CONTEXT_BY_HOUR = os.getenv('ADAPTIVE_SCHEDULE_BY_HOUR', 'False').lower() == 'true'
+    MIN_CONTEXT_TRIALS = int(os.getenv('ADAPTIVE_SCHEDULE_MIN_CONTEXT_TRIALS', 50))
+    # The configured order is kept until every arm has been tried this many times
+    MIN_ARM_TRIALS = int(os.getenv('ADAPTIVE_SCHEDULE_MIN_ARM_TRIALS', 30))
+    # Pruning skips arms that almost never succeed; off unless enabled
+    PRUNE_ENABLED = os.getenv('ADAPTIVE_SCHEDULE_PRUNE_ENABLED', 'False').lower() == 'true'
+    PRUNE_MIN_TRIALS = int(os.getenv('ADAPTIVE_SCHEDULE_PRUNE_MIN_TRIALS', 200))
+    PRUNE_MAX_SUCCESS_RATE = float(os.getenv('ADAPTIVE_SCHEDULE_PRUNE_MAX_SUCCESS_RATE', 0.01))
+    PRUNED_EXPLORATION_RATE = float(os.getenv('ADAPTIVE_SCHEDULE_PRUNED_EXPLORATION_RATE', 0.05))
+    SAVE_EVERY_UPDATES = int(os.getenv('ADAPTIVE_SCHEDULE_SAVE_EVERY_UPDATES', 100))
+    SAVE_INTERVAL_SECONDS = float(os.getenv('ADAPTIVE_SCHEDULE_SAVE_INTERVAL_SECONDS', 60))
+    
+    
+class PipelineConfig:
+    # Local pipeline profiles, selectable per request:
+    # fast: one Otsu/adaptive pass; balanced: that pass plus the best sweep thresholds;
+    # thorough: the full fixed-threshold sweep and the contour fallback
+    PROFILES = ('fast', 'balanced', 'thorough')
+    DEFAULT_PROFILE = os.getenv('PIPELINE_DEFAULT_PROFILE', 'thorough')
+    FAST_BINARIZATION = os.getenv('PIPELINE_FAST_BINARIZATION', 'otsu')  # otsu | adaptive
+    # Morphological close joining broken plate borders after single-pass binarization; 0 disables
+    FAST_CLOSE_KERNEL = int(os.getenv('PIPELINE_FAST_CLOSE_KERNEL', 3))
+    BALANCED_SWEEP_PASSES = int(os.getenv('PIPELINE_BALANCED_SWEEP_PASSES', 2))
+    
+    
+class ColorLocalizationConfig:
+    # White/near-white plate mask on a downscaled HSV + Lab copy of the color frame:
+    # '' disables it, 'seed' OCRs its candidates before the threshold sweep,
+    # 'replace' runs the sweep only when the mask finds no candidate at all
+    MODE = os.getenv('COLOR_LOCALIZATION_MODE', '')
+    WIDTH = int(os.getenv('COLOR_LOCALIZATION_WIDTH', 320))
+    MAX_SATURATION = int(os.getenv('COLOR_LOCALIZATION_MAX_SATURATION', 60))  # HSV S, 0-255
+    MIN_VALUE = int(os.getenv('COLOR_LOCALIZATION_MIN_VALUE', 140))  # HSV V, 0-255
+    MAX_CHROMA = int(os.getenv('COLOR_LOCALIZATION_MAX_CHROMA', 24))  # Lab distance from neutral grey
+    # Characters make plates edge-dense; blank white walls and signs are not
+    MIN_EDGE_DENSITY = float(os.getenv('COLOR_LOCALIZATION_MIN_EDGE_DENSITY', 0.06))
+    MIN_FILL = float(os.getenv('COLOR_LOCALIZATION_MIN_FILL', 0.6))
+    MAX_CANDIDATES = int(os.getenv('COLOR_LOCALIZATION_MAX_CANDIDATES', 3))
+    
+    
+class ROIConfig:
+    # Per-camera search window tried before the full frame
+    ENABLED = os.getenv('ROI_ENABLED', 'True').lower() == 'true'
+    # JSON {"camera_id": [x0, y0, x1, y1]} in fractions of the frame; overrides learned ROIs
+    MANUAL_ROIS = os.getenv('CAMERA_ROIS', '')
+    STATE_PATH = os.getenv('ROI_STATE_PATH', 'camera_roi.json')
+    HEATMAP_GRID = int(os.getenv('ROI_HEATMAP_GRID', 32))
+    HEATMAP_DECAY = float(os.getenv('ROI_HEATMAP_DECAY', 0.995))
+    # Learned ROI only kicks in after this many detections from the camera
+    MIN_DETECTIONS = int(os.getenv('ROI_MIN_DETECTIONS', 30))
+    # Cells with at least this share of the peak heat form the ROI
+    HEAT_FRACTION = float(os.getenv('ROI_HEAT_FRACTION', 0.05))
+    MARGIN = float(os.getenv('ROI_MARGIN', 0.05))
+    SAVE_EVERY_UPDATES = int(os.getenv('ROI_SAVE_EVERY_UPDATES', 50))
+    SAVE_INTERVAL_SECONDS = float(os.getenv('ROI_SAVE_INTERVAL_SECONDS', 60))
+    
+    
+class VideoIngestConfig:
+    # Frames handed to the motion gate per second of video; 0 keeps every frame
+    SAMPLE_FPS = float(os.getenv('VIDEO_SAMPLE_FPS', 5))
+    # Motion gate: frame difference on a small grayscale copy of the camera ROI
+    MOTION_WIDTH = int(os.getenv('VIDEO_MOTION_WIDTH', 160))
+    MOTION_PIXEL_THRESHOLD = int(os.getenv('VIDEO_MOTION_PIXEL_THRESHOLD', 25))
+    MOTION_MIN_CHANGED_FRACTION = float(os.getenv('VIDEO_MOTION_MIN_CHANGED_FRACTION', 0.01))
+    # Same plate from the same camera within this many seconds of video is one event
+    EVENT_COOLDOWN_SECONDS = float(os.getenv('VIDEO_EVENT_COOLDOWN_SECONDS', 10))
+    # Network streams are reopened after read failures; files simply end
+    MAX_RECONNECTS = int(os.getenv('VIDEO_MAX_RECONNECTS', 5))
+    RECONNECT_DELAY_SECONDS = float(os.getenv('VIDEO_RECONNECT_DELAY_SECONDS', 2))
+    
+    
+class TrackingConfig:
+    # Video ingest: follow plate boxes across frames and OCR each vehicle once
+    ENABLED = os.getenv('TRACKING_ENABLED', 'True').lower() == 'true'
+    # Association of a candidate box to a track (predicted box from its last motion)
+    MIN_IOU = float(os.getenv('TRACKING_MIN_IOU', 0.3))
+    # ... or a centroid shift up to this many plate widths when boxes don't overlap
+    MAX_CENTROID_SHIFT = float(os.getenv('TRACKING_MAX_CENTROID_SHIFT', 1.0))
+    # Track closed (and read) after this many seconds of video without a match
+    TIMEOUT_SECONDS = float(os.getenv('TRACKING_TIMEOUT_SECONDS', 1.5))
+    # Long-lived tracks (e.g. a sign that looks like a plate) are read and restarted
+    MAX_TRACK_SECONDS = float(os.getenv('TRACKING_MAX_TRACK_SECONDS', 30))
+    # Only the best-quality crops of a track are OCR'd
+    OCR_FRAMES = int(os.getenv('TRACKING_OCR_FRAMES', 3))
+    # Crop quality: plate-likeness score + sharpness + size, the last two saturating here
+    SHARPNESS_SCALE = float(os.getenv('TRACKING_SHARPNESS_SCALE', 500))
+    READABLE_HEIGHT = int(os.getenv('TRACKING_READABLE_HEIGHT', 60))
+    
+    
+class MultiPlateConfig:
+    # /detect-license-plates: every plate in the frame, located once and OCR'd together
+    MAX_PLATES = int(os.getenv('MULTI_PLATE_MAX_PLATES', 8))
+    # Candidates kept per binarization pass (single-plate mode keeps the top 3)
+    MAX_CANDIDATES = int(os.getenv('MULTI_PLATE_MAX_CANDIDATES', 24))
+    # Stack the crops into one image for a single tesseract call; unread crops are retried one by one
+    BATCH_OCR = os.getenv('MULTI_PLATE_BATCH_OCR', 'True').lower() == 'true'
+    BATCH_OCR_HEIGHT = int(os.getenv('MULTI_PLATE_BATCH_OCR_HEIGHT', 64))
+    
+    
+class ProfilingConfig:
+    # Requests carrying X-Profile-Request: <token> are profiled; empty disables the header
+    # and the /admin/profiles endpoints (which need X-Admin-Token: <token>)
+    ADMIN_TOKEN = os.getenv('PROFILING_ADMIN_TOKEN', '')
+    # Fraction of API requests profiled without the header
+    SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+    OUTPUT_DIR = os.getenv('PROFILING_OUTPUT_DIR', 'profiles')
+    # Oldest profiles are deleted beyond this many
+    MAX_PROFILES = int(os.getenv('PROFILING_MAX_PROFILES', 100))
+    SAMPLE_INTERVAL_SECONDS = float(os.getenv('PROFILING_SAMPLE_INTERVAL_SECONDS', 0.002))
+    TOP_ALLOCATIONS = int(os.getenv('PROFILING_TOP_ALLOCATIONS', 25))
+    # Frames kept per allocation traceback by tracemalloc
+    TRACEMALLOC_FRAMES = int(os.getenv('PROFILING_TRACEMALLOC_FRAMES', 5))
+    
+    
+class ConcurrencyConfig:
+    # CPU-bound pipeline defaults to one slot per core; I/O-bound engines get more
+    OPENCV_MAX_CONCURRENCY = int(os.getenv('OPENCV_MAX_CONCURRENCY', os.cpu_count() or 1))
+    GCP_MAX_CONCURRENCY = int(os.getenv('GCP_MAX_CONCURRENCY', 8))
+    DB_MAX_CONCURRENCY = int(os.getenv('DB_MAX_CONCURRENCY', 4))
+    MAX_QUEUE_SIZE = int(os.getenv('ADMISSION_MAX_QUEUE_SIZE', 16))
+    QUEUE_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', 5))
+    RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', 2))
+    
+    
+class ProcessPoolConfig:
+    # Run the local pipeline in worker processes; frames are handed over in shared memory
+    ENABLED = os.getenv('PROCESS_POOL_ENABLED', 'False').lower() == 'true'
+    WORKERS = int(os.getenv('PROCESS_POOL_WORKERS', os.cpu_count() or 1))
+    START_METHOD = os.getenv('PROCESS_POOL_START_METHOD', 'spawn')  # spawn | forkserver | fork
+    # Idle shared-memory blocks kept for reuse; larger frames get a new block
+    MAX_IDLE_BLOCKS = int(os.getenv('PROCESS_POOL_MAX_IDLE_BLOCKS', 16))
+    
+    
+class AuditConfig:
+    # Write-behind log of every detection, inserted into Postgres in batches off the request path
+    ENABLED = os.getenv('AUDIT_ENABLED', 'False').lower() == 'true'
+    # Empty uses the DatabaseService connection; a DSN points the log at another (e.g. local) database
+    DATABASE_URL = os.getenv('AUDIT_DATABASE_URL', '')
+    TABLE = os.getenv('AUDIT_TABLE', 'detection_audit')
+    CREATE_TABLE = os.getenv('AUDIT_CREATE_TABLE', 'True').lower() == 'true'
+    # Events beyond this many waiting are dropped and counted, never blocking a request
+    QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))
+    # A batch is flushed when it reaches BATCH_SIZE events or its oldest event is this old
+    BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+    FLUSH_INTERVAL_SECONDS = float(os.getenv('AUDIT_FLUSH_INTERVAL_SECONDS', 2))
+    SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv('AUDIT_SHUTDOWN_TIMEOUT_SECONDS', 10))
+    
+    
+class ShadowConfig:
+    # Fraction of detections re-run through the other engines after the response is sent
+    SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0))
+    # Engines compared; the one that served the request is skipped
+    ENGINES = os.getenv('SHADOW_ENGINES', 'opencv_tesseract,gcp_vision')
+    WORKERS = int(os.getenv('SHADOW_WORKERS', 1))
+    # Sampled requests beyond this many waiting are not shadowed
+    MAX_PENDING = int(os.getenv('SHADOW_MAX_PENDING', 16))
+    # Niceness of the shadow threads (and the tesseract processes they start), Linux only
+    NICE = int(os.getenv('SHADOW_NICE', 10))
+    # JSON {"engine": USD per call}; Vision TEXT_DETECTION list price per image by default
+    COST_PER_CALL = os.getenv('SHADOW_COST_PER_CALL', '{"gcp_vision": 0.0015}')
+    # Images where the engines disagree are saved here with a JSON sidecar; empty disables
+    DISAGREEMENT_DIR = os.getenv('SHADOW_DISAGREEMENT_DIR', '')
+    MAX_SAVED_DISAGREEMENTS = int(os.getenv('SHADOW_MAX_SAVED_DISAGREEMENTS', 500))
+    
+    
+class GCPVisionConfig:
+    ENDPOINT = os.getenv('GCP_VISION_ENDPOINT', 'vision.googleapis.com:443')
+    # Plain-text channel, for a local fake Vision server in tests
+    INSECURE_ENDPOINT = os.getenv('GCP_VISION_INSECURE', 'False').lower() == 'true'
+    DEADLINE_SECONDS = float(os.getenv('GCP_VISION_DEADLINE_SECONDS', 5))
+    RETRY_INITIAL_BACKOFF_SECONDS = float(os.getenv('GCP_VISION_RETRY_INITIAL_BACKOFF_SECONDS', 0.1))
+    RETRY_MAX_BACKOFF_SECONDS = float(os.getenv('GCP_VISION_RETRY_MAX_BACKOFF_SECONDS', 1.0))
+    # The shared channel closes its connection after this long without calls (gRPC default: 30 min)
+    CLIENT_IDLE_TIMEOUT_MS = int(os.getenv('GCP_VISION_CLIENT_IDLE_TIMEOUT_MS', 24 * 3600 * 1000))
+    
+    # Hedging: if Vision hasn't answered after the hedge delay, start HEDGE_TARGET
+    # (local engine or a second Vision request) and take whichever answers first
+    HEDGE_ENABLED = os.getenv('GCP_VISION_HEDGE_ENABLED', 'False').lower() == 'true'
+    HEDGE_TARGET = os.getenv('GCP_VISION_HEDGE_TARGET', 'opencv_tesseract')
+    # Fixed delay in seconds; empty means "use the observed Vision p90"
+    HEDGE_DELAY_SECONDS = os.getenv('GCP_VISION_HEDGE_DELAY_SECONDS', '')
+    HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv('GCP_VISION_HEDGE_DEFAULT_DELAY_SECONDS', 1.5))
+    HEDGE_MAX_WORKERS = int(os.getenv('GCP_VISION_HEDGE_MAX_WORKERS', 8))
+    
+    
+class RouterConfig:
+    # legacy: engine chosen by route (v1 forced onto GCP Vision on Heroku)
+    # local_first: OpenCV/Tesseract first, escalate to GCP Vision below ESCALATION_CONFIDENCE
+    # latency: engine with the lowest observed p95 latency, within the GCP quota
+    POLICY = os.getenv('ROUTER_POLICY', 'legacy')
+    ESCALATION_CONFIDENCE = float(os.getenv('ROUTER_ESCALATION_CONFIDENCE', 0.8))
+    LATENCY_WINDOW = int(os.getenv('ROUTER_LATENCY_WINDOW', 200))
+    LATENCY_MIN_SAMPLES = int(os.getenv('ROUTER_LATENCY_MIN_SAMPLES', 20))
+    GCP_DAILY_QUOTA = int(os.getenv('ROUTER_GCP_DAILY_QUOTA', 0))  # 0 = unlimited
+    GCP_SLOW_CALL_SECONDS = float(os.getenv('ROUTER_GCP_SLOW_CALL_SECONDS', 10))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('ROUTER_BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_RESET_SECONDS = float(os.getenv('ROUTER_BREAKER_RESET_SECONDS', 30))
+    
+    
+class JobConfig:
+    DB_PATH = os.getenv('JOB_DB_PATH', 'jobs.sqlite3')
+    WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    POLL_INTERVAL_SECONDS = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', 2))
+    # A running job not updated within the lease is assumed orphaned (worker restart) and re-queued
+    LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', 300))
+    MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    WEBHOOK_TIMEOUT_SECONDS = float(os.getenv('JOB_WEBHOOK_TIMEOUT_SECONDS', 5))
+    # Comma-separated hosts callback_url may point to; empty allows any https host
+    CALLBACK_ALLOWED_HOSTS = os.getenv('JOB_CALLBACK_ALLOWED_HOSTS', '')
     
     
 class AppInfo:
@@ -0,0 +1,71 @@
+from flask import request, jsonify, url_for
+from ..services.engine_router_service import EngineRouter
+from ..services.job_queue_service import JobQueueService
+from ..utils.validators import CallbackUrlValidator, FileValidator
+
+
+class JobController:
+    
+    ENGINES = {
+        'v1': EngineRouter.LOCAL,
+        'v2': EngineRouter.GCP_VISION,
+        EngineRouter.LOCAL: EngineRouter.LOCAL,
+        EngineRouter.GCP_VISION: EngineRouter.GCP_VISION
+    }
+    
+    def __init__(self, license_plate_controller):
+        self.job_queue_service = JobQueueService(license_plate_controller.process_image)
+        self.file_validator = FileValidator()
+    
+    def create_job(self):
+        try:
+            validation_result = self.file_validator.validate_image_upload(request)
+            if not validation_result['valid']:
+                return jsonify({
+                    "job_id": None,
+                    "error": validation_result['error']
+                }), validation_result['status_code']
+            
+            engine = self.ENGINES.get(request.form.get('engine', 'v1'))
+            if engine is None:
+                return jsonify({
+                    "job_id": None,
+                    "error": "Invalid engine. Allowed: v1, v2"
+                }), 400
+            
+            callback_url = request.form.get('callback_url') or None
+            if callback_url:
+                validation_result = CallbackUrlValidator.validate(callback_url)
+                if not validation_result['valid']:
+                    return jsonify({
+                        "job_id": None,
+                        "error": validation_result['error']
+                    }), validation_result['status_code']
+            
+            file = request.files['image']
+            job_id = self.job_queue_service.submit(file.read(), engine, callback_url)
+            
+            print(f"\nQueued job {job_id} for image: {file.filename}")
+            
+            response = jsonify({
+                "job_id": job_id,
+                "status": "queued"
+            })
+            response.headers['Location'] = url_for('api.get_job', job_id=job_id)
+            return response, 202
+            
+        except Exception as e:
+            print(f"❌ Job controller error: {e}")
+            return jsonify({
+                "job_id": None,
+                "error": "Internal server error"
+            }), 500
+    
+    def get_job(self, job_id: str):
+        job = self.job_queue_service.get(job_id)
+        if job is None:
+            return jsonify({
+                "job_id": job_id,
+                "error": "Job not found"
+            }), 404
+        return jsonify(job), 200
@@ -1,15 +1,28 @@
-from flask import request, jsonify
+import time
+from flask import request, jsonify, after_this_request, has_request_context
 from ..services.gcp_vision_service import GCPVisionService
 from ..services.database_service import DatabaseService
+from ..services.admission_control_service import AdmissionControlService, AdmissionRejectedError
+from ..services.engine_router_service import EngineRouter
+from ..services.audit_log_service import DetectionAuditLog
+from ..services.shadow_evaluation_service import ShadowEvaluator
 from ..utils.validators import FileValidator
-from ..config.settings import Config
+from ..utils.single_flight import SingleFlight
+from ..utils.request_body_reader import RequestBodyReader
+from ..utils.metrics import metrics
+from ..config.settings import AuditConfig, PipelineConfig, ProcessPoolConfig, ShadowConfig
 
 # Try to import OpenCV-dependent services
 try:
     from ..services.license_plate_service import LicensePlateService
+    from ..services.process_pool_service import PipelinePoolService
+    from ..services.image_processing_service import ImageTooLargeError
     OPENCV_AVAILABLE = True
 except ImportError:
     OPENCV_AVAILABLE = False
+    
+    class ImageTooLargeError(ValueError):
+        """Only raised by the local decoder, unavailable without OpenCV"""
 
 
 class LicensePlateController:
@@ -22,14 +35,27 @@ class LicensePlateController:
         self.gcp_vision_service = GCPVisionService()
         self.database_service = DatabaseService()
         self.file_validator = FileValidator()
+        self.body_reader = RequestBodyReader()
+        # Identical images processed concurrently share one engine run + DB lookup
+        self.single_flight = SingleFlight()
+        self.admission_control = AdmissionControlService()
+        # Process mode: the router's local engine runs in worker processes instead of request threads
+        self.pipeline_pool = (PipelinePoolService(fallback_service=self.license_plate_service)
+                              if OPENCV_AVAILABLE and ProcessPoolConfig.ENABLED else None)
+        self.engine_router = EngineRouter(
+            self.pipeline_pool or self.license_plate_service,
+            self.gcp_vision_service,
+            self.admission_control
+        )
+        # Write-behind: detections are queued here and inserted in batches off the request path
+        self.audit_log = DetectionAuditLog(self.database_service) if AuditConfig.ENABLED else None
+        self.shadow_evaluator = self._create_shadow_evaluator() if ShadowConfig.SAMPLE_RATE > 0 else None
     
     def detect_license_plate(self):
         try:
-            # In Heroku, redirect v1 to v2 (GCP Vision only)
-            if Config.IS_HEROKU or not OPENCV_AVAILABLE:
-                return self.detect_license_plate_v2()
-            
-            validation_result = self.file_validator.validate_image_upload(request)
+            validation_result, image_bytes, image_name = self._read_upload()
+            if validation_result['valid']:
+                validation_result = self._validate_profile()
             if not validation_result['valid']:
                 return jsonify({
                     "placa": None, 
@@ -39,39 +65,16 @@ class LicensePlateController:
                     "method": "opencv_tesseract"
                 }), 200
             
-            file = request.files['image']
-            image_bytes = file.read()
+            print(f"\nProcessing image: {image_name}")
             
-            print(f"\nProcessing image: {file.filename}")
+            payload = self.process_image(image_bytes, EngineRouter.LOCAL, self._camera_id(), self._profile())
             
-            result = self.license_plate_service.recognize(image_bytes)
-            
-            if result.plate:
-                print(f"✅ Detection successful: {result.plate} (method: {result.processing_method})")
-                
-                # Check if license plate exists in database
-                db_result = self.database_service.check_license_plate_exists(result.plate)
-                
-                is_on_database = 1 if db_result['exists'] else 0
-                status_code = 200 if db_result['exists'] else 404
-                
-                return jsonify({
-                    "placa": result.plate,
-                    "isOnDatabase": is_on_database,
-                    "status": status_code,
-                    "method": "opencv_tesseract"
-                }), 200
-            else:
-                print(f"❌ No license plate detected (method: {result.processing_method})")
-                if result.error:
-                    print(f"Error: {result.error}")
-                return jsonify({
-                    "placa": None,
-                    "isOnDatabase": 0,
-                    "status": 404,
-                    "method": "opencv_tesseract"
-                }), 200
+            return jsonify(payload), 200
             
+        except AdmissionRejectedError as e:
+            return self._overloaded_response(e, "opencv_tesseract")
+        except ImageTooLargeError as e:
+            return self._too_large_response(e, "opencv_tesseract")
         except Exception as e:
             print(f"❌ Controller error: {e}")
             return jsonify({
@@ -87,7 +90,9 @@ class LicensePlateController:
         Version 2: Uses Google Cloud Vision API for license plate detection
         """
         try:
-            validation_result = self.file_validator.validate_image_upload(request)
+            validation_result, image_bytes, image_name = self._read_upload()
+            if validation_result['valid']:
+                validation_result = self._validate_profile()
             if not validation_result['valid']:
                 return jsonify({
                     "placa": None, 
@@ -95,38 +100,16 @@ class LicensePlateController:
                     "method": "gcp_vision"
                 }), validation_result['status_code']
             
-            file = request.files['image']
-            image_bytes = file.read()
+            print(f"\nProcessing image with GCP Vision: {image_name}")
             
-            print(f"\nProcessing image with GCP Vision: {file.filename}")
+            payload = self.process_image(image_bytes, EngineRouter.GCP_VISION, self._camera_id(), self._profile())
             
-            # Use GCP Vision API to extract license plate
-            license_plate = self.gcp_vision_service.extract_license_plate_from_image(image_bytes)
-            
-            if license_plate:
-                print(f"✅ GCP Vision detection successful: {license_plate}")
-                
-                # Check if license plate exists in database
-                db_result = self.database_service.check_license_plate_exists(license_plate)
-                
-                is_on_database = 1 if db_result['exists'] else 0
-                status_code = 200 if db_result['exists'] else 404
-                
-                return jsonify({
-                    "placa": license_plate,
-                    "isOnDatabase": is_on_database,
-                    "status": status_code,
-                    "method": "gcp_vision"
-                }), 200
-            else:
-                print(f"❌ No license plate detected with GCP Vision")
-                return jsonify({
-                    "placa": None,
-                    "isOnDatabase": 0,
-                    "status": 404,
-                    "method": "gcp_vision"
-                }), 200
+            return jsonify(payload), 200
             
+        except AdmissionRejectedError as e:
+            return self._overloaded_response(e, "gcp_vision")
+        except ImageTooLargeError as e:
+            return self._too_large_response(e, "gcp_vision")
         except Exception as e:
             print(f"❌ Controller error (v2): {e}")
             return jsonify({
@@ -135,4 +118,259 @@ class LicensePlateController:
                 "status": 500,
                 "error": "Internal server error",
                 "method": "gcp_vision"
-            }), 200
\ No newline at end of file
+            }), 200
+    
+    def detect_license_plates(self):
+        """
+        Multi-plate mode: every plate in the frame with its bounding box and
+        confidence, all checked against the database in one query
+        """
+        try:
+            validation_result, image_bytes, image_name = self._read_upload()
+            if validation_result['valid']:
+                validation_result = self._validate_profile()
+            if validation_result['valid'] and self.license_plate_service is None:
+                validation_result = {'valid': False, 'error': "Local engine unavailable", 'status_code': 503}
+            if not validation_result['valid']:
+                return jsonify({
+                    "placas": [],
+                    "status": validation_result['status_code'],
+                    "error": validation_result['error'],
+                    "method": "opencv_tesseract"
+                }), 200
+            
+            print(f"\nProcessing image in multi-plate mode: {image_name}")
+            
+            payload = self.process_image_multi(image_bytes, self._camera_id(), self._profile())
+            
+            return jsonify(payload), 200
+            
+        except AdmissionRejectedError as e:
+            return self._overloaded_response(e, "opencv_tesseract")
+        except ImageTooLargeError as e:
+            return self._too_large_response(e, "opencv_tesseract", multi_plate=True)
+        except Exception as e:
+            print(f"❌ Controller error (multi-plate): {e}")
+            return jsonify({
+                "placas": [],
+                "status": 500,
+                "error": "Internal server error",
+                "method": "opencv_tesseract"
+            }), 200
+    
+    def _read_upload(self):
+        """
+        Read the image from a multipart form (field 'image') or a raw
+        application/octet-stream / image/jpeg / image/png body
+        
+        Returns:
+            Tuple of (validation_result, image bytes or memoryview, display name)
+        """
+        if RequestBodyReader.is_raw_upload(request):
+            validation_result = self.file_validator.validate_raw_upload(request)
+            if not validation_result['valid']:
+                return validation_result, None, None
+            # Zero-copy path: body lands in a reusable buffer, decoded in place
+            return validation_result, self.body_reader.read(request), request.headers.get('X-Filename', 'raw body')
+        
+        validation_result = self.file_validator.validate_image_upload(request)
+        if not validation_result['valid']:
+            return validation_result, None, None
+        
+        file = request.files['image']
+        return validation_result, file.read(), file.filename
+    
+    @staticmethod
+    def _camera_id():
+        """Optional source camera: form field / query arg 'camera_id' or the X-Camera-Id header"""
+        camera_id = request.values.get('camera_id') or request.headers.get('X-Camera-Id')
+        if not camera_id:
+            return None
+        return camera_id.strip() or None
+    
+    @staticmethod
+    def _profile():
+        """Local pipeline profile: form field / query arg 'profile' or the X-Pipeline-Profile header"""
+        return request.values.get('profile') or request.headers.get('X-Pipeline-Profile') or None
+    
+    def _validate_profile(self) -> dict:
+        profile = self._profile()
+        if profile is not None and profile not in PipelineConfig.PROFILES:
+            return {
+                'valid': False,
+                'error': f"Invalid profile, expected one of: {', '.join(PipelineConfig.PROFILES)}",
+                'status_code': 400
+            }
+        return {'valid': True}
+    
+    def process_image(self, image_bytes: bytes, requested_engine: str, camera_id: str = None,
+                      profile: str = None) -> dict:
+        """
+        Recognize a plate and look it up in the database
+        
+        Args:
+            image_bytes: Encoded image
+            requested_engine: EngineRouter.LOCAL or EngineRouter.GCP_VISION
+            camera_id: Optional source camera, enables its region-of-interest prior
+            profile: Local pipeline profile (fast, balanced, thorough); None uses the default
+            
+        Returns:
+            Response payload (placa, isOnDatabase, status, method)
+        """
+        namespace = f"{requested_engine}@{camera_id}" if camera_id else requested_engine
+        if profile:
+            namespace = f"{namespace}/{profile}"
+        started = time.perf_counter()
+        (payload, result), shared = self.single_flight.do(
+            SingleFlight.image_key(namespace, image_bytes),
+            lambda: self._recognize(image_bytes, requested_engine, camera_id, profile)
+        )
+        if shared:
+            metrics.increment(f"single_flight.{requested_engine}.coalesced")
+            print(f"↪ Reused in-flight result for identical image: {payload['placa']}")
+        if self.audit_log is not None:
+            self.audit_log.record({
+                "camera_id": camera_id,
+                "plate": result.plate,
+                "engine": result.engine or requested_engine,
+                "method": result.processing_method,
+                "confidence": result.confidence,
+                "is_on_database": payload["isOnDatabase"],
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                "coalesced": shared
+            })
+        if self.shadow_evaluator is not None and not shared and self.shadow_evaluator.should_sample():
+            self._schedule_shadow(bytes(image_bytes), result, camera_id, profile)
+        return payload
+    
+    def process_image_multi(self, image_bytes: bytes, camera_id: str = None, profile: str = None) -> dict:
+        """
+        Read every plate in the image with the local engine and look them all
+        up with a single database query
+        
+        Returns:
+            Response payload (placas: [{placa, isOnDatabase, confidence, boundingBox}], status, method)
+        """
+        started = time.perf_counter()
+        with self.admission_control.slot(AdmissionControlService.OPENCV):
+            result = self.license_plate_service.recognize_all(image_bytes, camera_id, profile)
+        
+        db_results = {}
+        if result.plates:
+            with self.admission_control.slot(AdmissionControlService.DATABASE):
+                db_results = self.database_service.check_license_plates_exist([plate.plate for plate in result.plates])
+        
+        entries = []
+        for plate in result.plates:
+            is_on_database = 1 if db_results.get(plate.plate, {}).get('exists') else 0
+            entries.append({
+                "placa": plate.plate,
+                "isOnDatabase": is_on_database,
+                "confidence": plate.confidence,
+                "boundingBox": list(plate.bounding_box)
+            })
+            if self.audit_log is not None:
+                self.audit_log.record({
+                    "camera_id": camera_id,
+                    "plate": plate.plate,
+                    "engine": EngineRouter.LOCAL,
+                    "method": plate.processing_method,
+                    "confidence": plate.confidence,
+                    "is_on_database": is_on_database,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "coalesced": False
+                })
+        
+        print(f"{'✅' if entries else '❌'} Multi-plate detection: {[entry['placa'] for entry in entries]}")
+        payload = {
+            "placas": entries,
+            "status": 200 if entries else 404,
+            "method": EngineRouter.LOCAL
+        }
+        if result.rejection_reasons:
+            payload["unreadableReasons"] = result.rejection_reasons
+        return payload
+    
+    def _create_shadow_evaluator(self) -> ShadowEvaluator:
+        engines = {EngineRouter.GCP_VISION: ShadowEvaluator.vision_engine(self.gcp_vision_service)}
+        local_engine = self.pipeline_pool or self.license_plate_service
+        if local_engine is not None:
+            engines[EngineRouter.LOCAL] = local_engine.recognize
+        return ShadowEvaluator(engines)
+    
+    def _schedule_shadow(self, image_bytes: bytes, result, camera_id: str = None, profile: str = None):
+        """Shadow-evaluate once the response has been sent; background jobs submit right away"""
+        if not has_request_context():
+            self.shadow_evaluator.submit(image_bytes, result, camera_id, profile)
+            return
+        
+        @after_this_request
+        def shadow_after_response(response):
+            response.call_on_close(lambda: self.shadow_evaluator.submit(image_bytes, result, camera_id, profile))
+            return response
+    
+    def _recognize(self, image_bytes: bytes, requested_engine: str, camera_id: str = None,
+                   profile: str = None) -> tuple:
+        # Engine choice (route, cascade, latency, circuit breaker) lives in the router
+        result = self.engine_router.recognize(image_bytes, requested_engine, camera_id, profile)
+        
+        if result.plate:
+            print(f"✅ Detection successful: {result.plate} (engine: {result.engine}, method: {result.processing_method})")
+            return self._build_detection_payload(result.plate, result.engine), result
+        
+        print(f"❌ No license plate detected (engine: {result.engine}, method: {result.processing_method})")
+        if result.error:
+            print(f"Error: {result.error}")
+        payload = self._build_not_found_payload(result.engine or requested_engine)
+        if result.rejection_reasons:
+            payload["unreadableReasons"] = result.rejection_reasons
+        return payload, result
+    
+    def _build_detection_payload(self, plate: str, method: str) -> dict:
+        # Check if license plate exists in database
+        with self.admission_control.slot(AdmissionControlService.DATABASE):
+            db_result = self.database_service.check_license_plate_exists(plate)
+        
+        is_on_database = 1 if db_result['exists'] else 0
+        status_code = 200 if db_result['exists'] else 404
+        
+        return {
+            "placa": plate,
+            "isOnDatabase": is_on_database,
+            "status": status_code,
+            "method": method
+        }
+    
+    @staticmethod
+    def _build_not_found_payload(method: str) -> dict:
+        return {
+            "placa": None,
+            "isOnDatabase": 0,
+            "status": 404,
+            "method": method
+        }
+    
+    @staticmethod
+    def _overloaded_response(error: AdmissionRejectedError, method: str):
+        print(f"⚠️  Rejected request, {error}")
+        response = jsonify({
+            "placa": None,
+            "isOnDatabase": 0,
+            "status": 503,
+            "error": "Service overloaded, retry later",
+            "method": method
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
+    
+    @staticmethod
+    def _too_large_response(error: ImageTooLargeError, method: str, multi_plate: bool = False):
+        """Decoded size over ImageConfig.MAX_MEGAPIXELS: 413, like an oversized upload"""
+        print(f"⚠️  Rejected image, {error}")
+        payload = {"placas": []} if multi_plate else {"placa": None, "isOnDatabase": 0}
+        payload.update({
+            "status": 413,
+            "error": "Image too large",
+            "method": method
+        })
+        return jsonify(payload), 413
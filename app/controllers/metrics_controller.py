@@ -0,0 +1,9 @@
+from flask import jsonify
+from ..utils.metrics import metrics
+
+
+class MetricsController:
+    
+    @staticmethod
+    def get_metrics():
+        return jsonify(metrics.snapshot()), 200
@@ -0,0 +1,55 @@
+import os
+from flask import g, jsonify, request, send_file
+from ..services.profiling_service import RequestProfiler
+
+
+class ProfilingController:
+    """
+    Request hooks that profile opted-in API requests, and the admin
+    endpoints serving the results. Only registered when profiling is
+    configured, so unprofiled deployments pay nothing.
+    """
+
+    def __init__(self, request_profiler: RequestProfiler = None):
+        self.request_profiler = request_profiler or RequestProfiler()
+
+    def start_request(self):
+        if request.path.startswith('/admin/') or not self.request_profiler.should_profile(request.headers):
+            return
+        g.profile_session = self.request_profiler.start(request.headers.get('X-Request-Id'))
+
+    def finish_request(self, response):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            self._finish(session, response.status_code)
+            response.headers['X-Profile-Id'] = session.profile_id
+        return response
+
+    def teardown_request(self, exception=None):
+        # after_request is skipped when the view raised
+        session = g.pop('profile_session', None)
+        if session is not None:
+            self._finish(session, 500)
+
+    def list_profiles(self):
+        if not self.request_profiler.is_admin(request.headers):
+            return jsonify({"error": "Forbidden"}), 403
+        return jsonify({"profiles": self.request_profiler.list_profiles()}), 200
+
+    def get_profile(self, profile_id: str, kind: str):
+        if not self.request_profiler.is_admin(request.headers):
+            return jsonify({"error": "Forbidden"}), 403
+        path = self.request_profiler.profile_path(profile_id, kind)
+        if path is None:
+            return jsonify({"error": "Profile not found"}), 404
+        mimetype = 'application/json' if kind == 'meta' else 'text/plain'
+        return send_file(path, mimetype=mimetype, as_attachment=kind != 'meta',
+                         download_name=os.path.basename(path))
+
+    def _finish(self, session, status_code: int):
+        self.request_profiler.finish(session, {
+            "method": request.method,
+            "path": request.path,
+            "status": status_code,
+            "camera_id": request.form.get('camera_id') or request.headers.get('X-Camera-Id')
+        })
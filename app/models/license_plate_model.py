@@ -1,6 +1,7 @@
-from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Dict, Any
 import re
+from ..utils.plate_grammar import PlateGrammar
 
 
 @dataclass
@@ -9,6 +10,68 @@ class LicensePlateResult:
     confidence: float = 0.0
     processing_method: str = ""
     error: Optional[str] = None
+    engine: str = ""
+    rejection_reasons: Optional[List[str]] = None
+    # (x, y, w, h) of the accepted plate crop in the decoded frame
+    bounding_box: Optional[Tuple[int, int, int, int]] = None
+    # Milliseconds spent per local cascade stage (quality_gate, santifiorino, contour)
+    timings: Optional[Dict[str, float]] = None
+
+
+@dataclass
+class MultiPlateResult:
+    # Every plate read in the frame, each with its bounding box, in reading order
+    plates: List[LicensePlateResult]
+    error: Optional[str] = None
+    rejection_reasons: Optional[List[str]] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+@dataclass
+class QualityAssessment:
+    readable: bool
+    reasons: List[str]
+    sharpness: float
+    brightness: float
+    contrast: float
+    clipped_fraction: float
+    edge_density: float
+
+
+@dataclass
+class CharacterSegmentation:
+    plausible: bool
+    # Character boxes (x, y, w, h) in crop coordinates, left to right
+    boxes: List[Tuple[int, int, int, int]]
+
+
+@dataclass
+class PlateCandidate:
+    box: Tuple[int, int, int, int]  # x, y, w, h
+    score: float
+    contour: Any = None
+    character_boxes: Optional[List[Tuple[int, int, int, int]]] = None
+
+
+@dataclass
+class TrackObservation:
+    quality: float
+    crop: Any  # grayscale plate crop, copied out of the frame
+    box: Tuple[int, int, int, int]
+    frame_index: int
+    position_ms: float
+
+
+@dataclass
+class PlateTrack:
+    track_id: int
+    box: Tuple[int, int, int, int]  # last matched box
+    velocity: Tuple[float, float]  # centroid shift per matched frame
+    first_seen_ms: float
+    last_seen_ms: float
+    frames_observed: int = 1
+    # Highest-quality observations only, best first; these are the frames OCR'd on close
+    best_observations: List[TrackObservation] = field(default_factory=list)
 
 
 @dataclass
@@ -18,6 +81,38 @@ class ImageProcessingParams:
     max_aspect_ratio: float
     min_width: int
     min_height: int
+    # None decodes at full resolution: min_width/min_height are absolute pixel sizes
+    decode_target_width: Optional[int] = None
+    # Candidate ranking: candidates are OCR'd best first; max_ocr_candidates caps
+    # them per threshold pass (None OCRs every candidate, so recall is unchanged)
+    rank_candidates: bool = True
+    max_ocr_candidates: Optional[int] = None
+    target_aspect_ratio: float = 36.0 / 13.0  # Chilean plate, 360 x 130 mm
+    candidate_score_weights: Dict[str, float] = field(default_factory=lambda: {
+        'aspect': 2.0,
+        'edge_density': 1.5,
+        'contrast': 1.0,
+        'fill': 1.0,
+        'position': 0.5
+    })
+    # Candidates overlapping an already OCR'd box above this IoU are skipped
+    duplicate_iou: float = 0.85
+    # Pre-OCR gate: crops must hold this many aligned character-shaped blobs.
+    # Opt-in: it can reject real plates with touching or broken characters
+    segmentation_gate: bool = False
+    min_plate_characters: int = 6
+    # Single-pass binarization ('otsu' or 'adaptive') tried before the threshold sweep
+    binarization: Optional[str] = None
+    adaptive_block_size: int = 31
+    adaptive_offset: int = 10
+    # Square kernel size of a morphological close on the binary image; None skips it
+    close_kernel_size: Optional[int] = None
+    # Cap on fixed-threshold passes after scheduling; None runs them all, 0 none
+    max_threshold_passes: Optional[int] = None
+    # Fall back to the contour method when the santifiorino pipeline misses
+    contour_fallback: bool = True
+    # White-plate color mask ahead of the binarization passes: None, 'seed' or 'replace'
+    color_localization: Optional[str] = None
     
     @classmethod
     def default(cls):
@@ -31,26 +126,28 @@ class ImageProcessingParams:
 
 
 class ChileanLicensePlateValidator:
-    PATTERNS = [
-        r'^[A-Z]{4}[0-9]{2}$',  # AAAA##
-        r'^[A-Z]{2}[0-9]{4}$',  # AA####
-        r'^[A-Z]{3}[0-9]{3}$',  # AAA###
-    ]
+    # Characters outside the OCR whitelist
+    NON_PLATE_CHARACTERS = re.compile(r'[^A-Z0-9]')
     
     @classmethod
     def validate(cls, text: str) -> bool:
         if not text or len(text) < 5:
             return False
         
-        for pattern in cls.PATTERNS:
-            if re.match(pattern, text):
-                return True
+        if PlateGrammar.parse(text) is not None:
+            return True
         
         letter_count = sum(1 for c in text if c.isalpha())
         number_count = sum(1 for c in text if c.isdigit())
         
         return letter_count >= 2 and number_count >= 1
     
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Grammar reading of text with OCR confusions corrected; text itself when it isn't a full plate"""
+        match = PlateGrammar.parse(text)
+        return match.plate if match is not None else text
+    
     @classmethod
     def clean_text(cls, text: str) -> str:
-        return re.sub(r'[^A-Z0-9]', '', text.upper().strip())
\ No newline at end of file
+        return cls.NON_PLATE_CHARACTERS.sub('', text.upper().strip())
@@ -1,6 +1,10 @@
 from flask import Blueprint
 from ..controllers.health_controller import HealthController
 from ..controllers.license_plate_controller import LicensePlateController
+from ..controllers.metrics_controller import MetricsController
+from ..controllers.job_controller import JobController
+from ..controllers.profiling_controller import ProfilingController
+from ..config.settings import ProfilingConfig
 
 
 def create_api_routes():
@@ -8,11 +12,17 @@ def create_api_routes():
     
     health_controller = HealthController()
     license_plate_controller = LicensePlateController()
+    metrics_controller = MetricsController()
+    job_controller = JobController(license_plate_controller)
     
     @api_bp.route('/health', methods=['GET'])
     def health():
         return health_controller.health_check()
     
+    @api_bp.route('/metrics', methods=['GET'])
+    def get_metrics():
+        return metrics_controller.get_metrics()
+    
     @api_bp.route('/detect-license-plate/v2', methods=['POST'])
     def detect_license_plate_v2():
         return license_plate_controller.detect_license_plate_v2()
@@ -21,4 +31,36 @@ def create_api_routes():
     def detect_license_plate_v1():
         return license_plate_controller.detect_license_plate()
     
-    return api_bp
\ No newline at end of file
+    @api_bp.route('/detect-license-plates/v1', methods=['POST'])
+    def detect_license_plates_v1():
+        return license_plate_controller.detect_license_plates()
+    
+    @api_bp.route('/jobs', methods=['POST'])
+    def create_job():
+        return job_controller.create_job()
+    
+    @api_bp.route('/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        return job_controller.get_job(job_id)
+    
+    if ProfilingConfig.ADMIN_TOKEN or ProfilingConfig.SAMPLE_RATE > 0:
+        register_profiling(api_bp, ProfilingController())
+    
+    return api_bp
+
+
+def register_profiling(api_bp, profiling_controller):
+    api_bp.before_request(profiling_controller.start_request)
+    api_bp.after_request(profiling_controller.finish_request)
+    api_bp.teardown_request(profiling_controller.teardown_request)
+    
+    if not ProfilingConfig.ADMIN_TOKEN:
+        return
+    
+    @api_bp.route('/admin/profiles', methods=['GET'])
+    def list_profiles():
+        return profiling_controller.list_profiles()
+    
+    @api_bp.route('/admin/profiles/<profile_id>/<kind>', methods=['GET'])
+    def get_profile(profile_id, kind):
+        return profiling_controller.get_profile(profile_id, kind)
@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict
+from ..config.settings import ConcurrencyConfig
+from ..utils.metrics import metrics
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an engine has no free slot and its wait queue is full"""
+
+    def __init__(self, engine: str, reason: str, retry_after: int):
+        super().__init__(f"{engine} overloaded ({reason})")
+        self.engine = engine
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class EngineLimiter:
+    """
+    Bounded concurrency for one engine plus a bounded wait queue.
+
+    Callers beyond max_concurrency wait for a slot; once max_queue callers
+    are already waiting (or the wait exceeds queue_timeout) the call is
+    rejected immediately instead of piling up on the worker threads.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int,
+                 queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+
+        metrics.register_gauge(f"admission.{name}.active", lambda: self._active)
+        metrics.register_gauge(f"admission.{name}.queue_depth", lambda: self._waiting)
+
+    @contextmanager
+    def slot(self):
+        self._acquire()
+        with self._lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._semaphore.release()
+
+    def _acquire(self):
+        if self._semaphore.acquire(blocking=False):
+            metrics.increment(f"admission.{self.name}.admitted")
+            return
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                metrics.increment(f"admission.{self.name}.rejected_queue_full")
+                raise AdmissionRejectedError(self.name, "queue full", self.retry_after)
+            self._waiting += 1
+
+        try:
+            acquired = self._semaphore.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        if not acquired:
+            metrics.increment(f"admission.{self.name}.rejected_timeout")
+            raise AdmissionRejectedError(self.name, "queue timeout", self.retry_after)
+
+        metrics.increment(f"admission.{self.name}.admitted")
+
+
+class AdmissionControlService:
+    """Per-engine limiters for the OpenCV/Tesseract pipeline, GCP Vision and DB lookups"""
+
+    OPENCV = "opencv_tesseract"
+    GCP_VISION = "gcp_vision"
+    DATABASE = "database"
+
+    def __init__(self):
+        limits = {
+            self.OPENCV: ConcurrencyConfig.OPENCV_MAX_CONCURRENCY,
+            self.GCP_VISION: ConcurrencyConfig.GCP_MAX_CONCURRENCY,
+            self.DATABASE: ConcurrencyConfig.DB_MAX_CONCURRENCY,
+        }
+        self.limiters: Dict[str, EngineLimiter] = {
+            name: EngineLimiter(
+                name,
+                max_concurrency,
+                ConcurrencyConfig.MAX_QUEUE_SIZE,
+                ConcurrencyConfig.QUEUE_TIMEOUT_SECONDS,
+                ConcurrencyConfig.RETRY_AFTER_SECONDS
+            )
+            for name, max_concurrency in limits.items()
+        }
+
+    def slot(self, engine: str):
+        return self.limiters[engine].slot()
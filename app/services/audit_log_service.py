@@ -0,0 +1,181 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from ..config.settings import AuditConfig
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class DetectionAuditLog:
+    """
+    Write-behind audit log of detections.
+
+    record() only puts the event on a bounded in-memory queue; a background
+    thread drains it and inserts whole batches with one multi-row INSERT
+    (execute_values) per flush, so requests never wait on the database.
+
+    A batch is flushed once it holds AuditConfig.BATCH_SIZE events or its
+    oldest event has waited FLUSH_INTERVAL_SECONDS. When the queue is full
+    (database down or slower than the request rate) new events are dropped
+    and counted. close() (also run at exit) flushes what is still queued.
+    """
+
+    COLUMNS = (
+        "detected_at", "camera_id", "plate", "engine", "method", "confidence",
+        "is_on_database", "latency_ms", "coalesced"
+    )
+
+    def __init__(self, database_service=None, table: Optional[str] = None, queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.database_service = database_service
+        self.table = table or AuditConfig.TABLE
+        self.batch_size = max(1, batch_size or AuditConfig.BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else AuditConfig.FLUSH_INTERVAL_SECONDS
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "failed": 0, "flushes": 0}
+        self._queue = queue.Queue(maxsize=queue_size or AuditConfig.QUEUE_SIZE)
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._conn = None
+        self._table_ready = not AuditConfig.CREATE_TABLE
+        self._insert = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+            sql.Identifier(self.table),
+            sql.SQL(', ').join(map(sql.Identifier, self.COLUMNS))
+        )
+
+        metrics.register_gauge("audit.queue_depth", self._queue.qsize)
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, event: Dict[str, Any]):
+        """Queue a detection event; never blocks, drops it when the queue is full"""
+        event.setdefault("detected_at", time.time())
+        try:
+            self._queue.put_nowait(tuple(event.get(column) for column in self.COLUMNS))
+        except queue.Full:
+            self._count("dropped")
+            return
+        self._count("enqueued")
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush everything still queued, then stop the writer and close its connection"""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass  # the writer is busy draining and sees _stopping on its next wait
+        self._thread.join(timeout if timeout is not None else AuditConfig.SHUTDOWN_TIMEOUT_SECONDS)
+        if self._thread.is_alive():
+            logger.warning(f"Audit log shutdown timed out, {self._queue.qsize()} events not written")
+        else:
+            logger.info(f"Audit log closed: {self.stats}")
+
+    def _count(self, stat: str, value: int = 1):
+        with self._stats_lock:
+            self.stats[stat] += value
+        metrics.increment(f"audit.{stat}", value)
+
+    def _run(self):
+        batch = []
+        batch_started = 0.0
+        while not self._stopping.is_set():
+            wait = self.flush_interval - (time.monotonic() - batch_started) if batch else self.flush_interval
+            try:
+                event = self._queue.get(timeout=max(0.0, wait))
+            except queue.Empty:
+                event = None
+            if event is not None and event is not _STOP:
+                if not batch:
+                    batch_started = time.monotonic()
+                batch.append(event)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() - batch_started >= self.flush_interval):
+                self._flush(batch)
+                batch = []
+
+        # Shutdown: drain the queue in full batches, then the remainder
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not _STOP:
+                batch.append(event)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        self._disconnect()
+
+    def _flush(self, batch: List[tuple]):
+        # One retry on a fresh connection covers a connection dropped while idle
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                with conn.cursor() as cursor:
+                    execute_values(
+                        cursor, self._insert, batch,
+                        template="(to_timestamp(%s), %s, %s, %s, %s, %s, %s, %s, %s)",
+                        page_size=len(batch)
+                    )
+                conn.commit()
+                self._count("written", len(batch))
+                self._count("flushes")
+                return
+            except Exception as e:
+                self._disconnect()
+                if attempt:
+                    logger.error(f"Error writing {len(batch)} audit events: {str(e)}")
+        self._count("failed", len(batch))
+
+    def _connection(self):
+        if self._conn is None:
+            if AuditConfig.DATABASE_URL:
+                self._conn = psycopg2.connect(AuditConfig.DATABASE_URL)
+            else:
+                self._conn = self.database_service.get_connection()
+        if not self._table_ready:
+            self._create_table(self._conn)
+            self._table_ready = True
+        return self._conn
+
+    def _create_table(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("""
+                CREATE TABLE IF NOT EXISTS {} (
+                    id BIGSERIAL PRIMARY KEY,
+                    detected_at TIMESTAMPTZ NOT NULL,
+                    camera_id TEXT,
+                    plate TEXT,
+                    engine TEXT,
+                    method TEXT,
+                    confidence REAL,
+                    is_on_database SMALLINT,
+                    latency_ms REAL,
+                    coalesced BOOLEAN
+                )
+            """).format(sql.Identifier(self.table)))
+            cursor.execute(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} (detected_at)").format(
+                sql.Identifier(f"idx_{self.table}_detected_at"), sql.Identifier(self.table)
+            ))
+        conn.commit()
+
+    def _disconnect(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
@@ -0,0 +1,258 @@
+import csv
+import glob
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..config.settings import AdaptiveScheduleConfig, ROIConfig
+from ..models.license_plate_model import LicensePlateResult
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .admission_control_service import AdmissionControlService
+
+logger = get_logger(__name__)
+
+# Parquet output is optional: CSV works without pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+LOCAL = AdmissionControlService.OPENCV
+GCP_VISION = AdmissionControlService.GCP_VISION
+
+COLUMNS = [
+    "path", "camera_id", "plate", "confidence", "method", "engine", "error", "rejection_reasons",
+    "read_ms", "quality_gate_ms", "santifiorino_ms", "contour_ms", "total_ms", "processed_at"
+]
+
+# Per worker process: the engine and its options
+_worker_engine = None
+_worker_name = None
+_worker_profile = None
+
+
+def _init_worker(engine: str, profile: Optional[str]):
+    global _worker_engine, _worker_name, _worker_profile
+    # Ctrl+C is handled by the parent, which stops submitting and keeps what was written
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if engine == GCP_VISION:
+        from .gcp_vision_service import GCPVisionService
+        _worker_engine = GCPVisionService()
+    else:
+        from .license_plate_service import LicensePlateService
+        # The learned threshold schedule and camera ROIs belong to the live
+        # service: an offline run must neither be steered by them nor write to them
+        AdaptiveScheduleConfig.ENABLED = False
+        ROIConfig.ENABLED = False
+        _worker_engine = LicensePlateService()
+    _worker_name = engine
+    _worker_profile = profile
+
+
+def _recognize_item(item: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    path, camera_id = item
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, camera_id=camera_id, engine=_worker_name)
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            image_bytes = f.read()
+        row["read_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result = _run_engine(image_bytes, camera_id)
+        row.update(
+            plate=result.plate,
+            confidence=result.confidence,
+            method=result.processing_method,
+            error=None if result.plate else result.error,
+            rejection_reasons=','.join(result.rejection_reasons) if result.rejection_reasons else None
+        )
+        for stage, ms in (result.timings or {}).items():
+            if f"{stage}_ms" in row:
+                row[f"{stage}_ms"] = ms
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    row["processed_at"] = time.time()
+    return row
+
+
+def _run_engine(image_bytes: bytes, camera_id: Optional[str]) -> LicensePlateResult:
+    if _worker_name == GCP_VISION:
+        plate = _worker_engine.extract_license_plate_from_image(image_bytes, raise_on_error=True)
+        if plate:
+            return LicensePlateResult(plate, 0.95, GCP_VISION, None, GCP_VISION)
+        return LicensePlateResult(None, 0.0, GCP_VISION, "No valid license plate found", GCP_VISION)
+    return _worker_engine.recognize(image_bytes, camera_id, _worker_profile)
+
+
+class CsvResultWriter:
+    """Appends rows to a CSV file; rows already in the file count as done on resume"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._truncate_partial_row()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if new_file:
+            self._writer.writeheader()
+
+    def completed_paths(self) -> Set[str]:
+        with open(self.path, newline='') as f:
+            return {row["path"] for row in csv.DictReader(f) if row.get("path")}
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def _truncate_partial_row(self):
+        # A run killed mid-write can leave half a row; drop it so the file parses
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            if content and not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+
+
+class ParquetResultWriter:
+    """
+    Writes each batch as its own part file in a directory (a Parquet dataset
+    readable with pandas.read_parquet(dir)). Parts are renamed into place
+    once complete, so an interrupted run never leaves a corrupt file.
+    """
+
+    FLOAT_COLUMNS = {"confidence", "processed_at"}
+
+    def __init__(self, path: str):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._next_part = len(self._parts())
+        self._schema = pa.schema([
+            (column, pa.float64() if column.endswith('_ms') or column in self.FLOAT_COLUMNS else pa.string())
+            for column in COLUMNS
+        ])
+
+    def completed_paths(self) -> Set[str]:
+        done = set()
+        for part in self._parts():
+            done.update(pq.read_table(part, columns=["path"]).column("path").to_pylist())
+        return done
+
+    def write(self, rows: List[Dict[str, Any]]):
+        table = pa.Table.from_pylist(rows, schema=self._schema)
+        part = os.path.join(self.path, f"part-{self._next_part:06d}.parquet")
+        pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        self._next_part += 1
+
+    def close(self):
+        pass
+
+    def _parts(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+
+class BulkRecognitionService:
+    """
+    Runs many stored images through one engine on a pool of worker
+    processes and streams the rows to a result writer in batches.
+
+    Every worker builds its own engine and reads its image files itself, so
+    only paths go out and small result rows come back. Paths already in the
+    output are skipped, which makes an interrupted run resumable: the
+    committed batches are the checkpoint.
+    """
+
+    def __init__(self, writer, engine: str = LOCAL, workers: Optional[int] = None,
+                 profile: Optional[str] = None, batch_size: int = 500):
+        self.writer = writer
+        self.engine = engine
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.profile = profile
+        self.batch_size = max(1, batch_size)
+        self.stats = {"skipped": 0, "processed": 0, "plates": 0, "failures": 0}
+
+    def run(self, items: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+        done = self.writer.completed_paths()
+        if done:
+            logger.info(f"Resuming: skipping the {len(done)} images already in the output")
+
+        started = time.perf_counter()
+        batch = []
+        in_flight = set()
+        max_in_flight = self.workers * 4
+        queue = self._pending(items, done)
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.engine, self.profile)
+        )
+        try:
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    item = next(queue, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    in_flight.add(executor.submit(_recognize_item, item))
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch.append(self._record(future.result()))
+                if len(batch) >= self.batch_size:
+                    self._commit(batch, started)
+                    batch = []
+        except KeyboardInterrupt:
+            logger.warning("Interrupted: keeping finished rows, rerun the same command to resume")
+            for future in in_flight:
+                future.cancel()
+        finally:
+            if batch:
+                self._commit(batch, started)
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.writer.close()
+
+        elapsed = time.perf_counter() - started
+        return {**self.stats, "seconds": round(elapsed, 1),
+                "images_per_second": round(self.stats["processed"] / elapsed, 2) if elapsed else None}
+
+    def _pending(self, items: Iterable[Tuple[str, Optional[str]]],
+                 done: Set[str]) -> Iterator[Tuple[str, Optional[str]]]:
+        # Lazy, so a large source is never held in memory and work starts right away
+        for item in items:
+            if item[0] in done:
+                self.stats["skipped"] += 1
+            else:
+                yield item
+
+    def _record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["processed"] += 1
+        if row["plate"]:
+            self.stats["plates"] += 1
+            metrics.increment("bulk.plates")
+        if row["method"] is None:
+            # Unreadable file or engine exception, as opposed to "no plate found"
+            self.stats["failures"] += 1
+            metrics.increment("bulk.failures")
+        metrics.increment("bulk.processed")
+        return row
+
+    def _commit(self, batch: List[Dict[str, Any]], started: float):
+        self.writer.write(batch)
+        elapsed = time.perf_counter() - started
+        logger.info(f"{self.stats['processed']} images, {self.stats['skipped']} skipped "
+                    f"({self.stats['processed'] / elapsed:.1f}/s, {self.stats['plates']} plates)")
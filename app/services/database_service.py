@@ -1,6 +1,6 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -63,6 +63,48 @@ class DatabaseService:
                 'error': str(e)
             }
     
+    def check_license_plates_exist(self, plates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check several license plates against the vehiculos table in one query
+        
+        Args:
+            plates: License plates to check
+            
+        Returns:
+            Dictionary mapping each plate to the same result check_license_plate_exists returns
+        """
+        plates = list(dict.fromkeys(plates))
+        if not plates:
+            return {}
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    query = "SELECT * FROM vehiculos WHERE placa = ANY(%s)"
+                    cursor.execute(query, (plates,))
+                    found = {}
+                    for row in cursor.fetchall():
+                        found.setdefault(row['placa'], dict(row))
+                    
+                    logger.info(f"{len(found)} of {len(plates)} license plates found in database")
+                    return {
+                        plate: {
+                            'exists': plate in found,
+                            'vehicle_data': found.get(plate)
+                        }
+                        for plate in plates
+                    }
+                    
+        except Exception as e:
+            logger.error(f"Error checking license plates in database: {str(e)}")
+            return {
+                plate: {
+                    'exists': False,
+                    'vehicle_data': None,
+                    'error': str(e)
+                }
+                for plate in plates
+            }
+    
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
@@ -0,0 +1,278 @@
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from typing import Optional
+from ..config.settings import Config, GCPVisionConfig, RouterConfig
+from ..models.license_plate_model import LicensePlateResult
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics, LatencyTracker
+from .admission_control_service import AdmissionControlService, AdmissionRejectedError
+from .gcp_vision_service import GCPVisionError
+
+logger = get_logger(__name__)
+
+
+class EngineRouter:
+    """
+    Chooses between the local OpenCV/Tesseract pipeline and GCP Vision.
+
+    Policies (RouterConfig.POLICY):
+        legacy       engine chosen by route, v1 forced onto GCP Vision on Heroku
+        local_first  local engine first, escalate to GCP Vision when its
+                     confidence is below RouterConfig.ESCALATION_CONFIDENCE
+        latency      engine with the lowest observed p95 latency, skipping
+                     GCP Vision once the daily quota is used up
+
+    GCP Vision is guarded by a circuit breaker in every policy: consecutive
+    failures (errors or calls slower than GCP_SLOW_CALL_SECONDS) stop GCP
+    calls for a while and the local engine is used instead.
+
+    With GCPVisionConfig.HEDGE_ENABLED, a Vision call that hasn't answered
+    after the hedge delay (fixed, or the observed Vision p90) is raced
+    against the local engine or a second Vision request.
+    """
+
+    LOCAL = AdmissionControlService.OPENCV
+    GCP_VISION = AdmissionControlService.GCP_VISION
+
+    POLICY_LEGACY = "legacy"
+    POLICY_LOCAL_FIRST = "local_first"
+    POLICY_LATENCY = "latency"
+
+    # TEXT_DETECTION does not report a confidence; a grammar-valid match is trusted
+    GCP_VISION_CONFIDENCE = 0.95
+
+    def __init__(self, license_plate_service, gcp_vision_service,
+                 admission_control: AdmissionControlService, policy: Optional[str] = None):
+        self.license_plate_service = license_plate_service
+        self.gcp_vision_service = gcp_vision_service
+        self.admission_control = admission_control
+        self.policy = policy or RouterConfig.POLICY
+
+        self.latency = {
+            self.LOCAL: LatencyTracker(RouterConfig.LATENCY_WINDOW),
+            self.GCP_VISION: LatencyTracker(RouterConfig.LATENCY_WINDOW),
+        }
+        self.gcp_breaker = CircuitBreaker(
+            RouterConfig.BREAKER_FAILURE_THRESHOLD,
+            RouterConfig.BREAKER_RESET_SECONDS
+        )
+
+        self._hedge_executor = None
+        if GCPVisionConfig.HEDGE_ENABLED:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=GCPVisionConfig.HEDGE_MAX_WORKERS,
+                thread_name_prefix="gcp-hedge"
+            )
+        
+        self._quota_lock = threading.Lock()
+        self._quota_day = None
+        self._quota_used = 0
+
+        for engine, tracker in self.latency.items():
+            metrics.register_gauge(f"router.{engine}.latency_p50", lambda t=tracker: t.percentile(50))
+            metrics.register_gauge(f"router.{engine}.latency_p95", lambda t=tracker: t.percentile(95))
+            metrics.register_gauge(f"router.{engine}.samples", tracker.count)
+        metrics.register_gauge("router.gcp_vision.breaker_state", lambda: self.gcp_breaker.state)
+        metrics.register_gauge("router.gcp_vision.quota_used", lambda: self._quota_used)
+        metrics.register_gauge("router.policy", lambda: self.policy)
+
+    @property
+    def local_available(self) -> bool:
+        return self.license_plate_service is not None
+
+    def recognize(self, image_bytes: bytes, requested_engine: str, camera_id: Optional[str] = None,
+                  profile: Optional[str] = None) -> LicensePlateResult:
+        if self.policy == self.POLICY_LOCAL_FIRST and self.local_available:
+            return self._recognize_local_first(image_bytes, camera_id, profile)
+        
+        if self.policy == self.POLICY_LATENCY:
+            engine = self._pick_by_latency(requested_engine)
+        else:
+            engine = self._pick_legacy(requested_engine)
+        
+        self._record_decision(engine)
+        if engine == self.LOCAL:
+            return self._run_local(image_bytes, camera_id, profile)
+        return self._run_gcp_vision_with_fallback(image_bytes, camera_id, profile)
+
+    def _recognize_local_first(self, image_bytes: bytes, camera_id: Optional[str] = None,
+                               profile: Optional[str] = None) -> LicensePlateResult:
+        local_result = self._run_local(image_bytes, camera_id, profile)
+        if local_result.plate and local_result.confidence >= RouterConfig.ESCALATION_CONFIDENCE:
+            self._record_decision("local")
+            return local_result
+        if local_result.rejection_reasons:
+            # Unreadable frame (blur, exposure, no structure): Vision won't do better
+            self._record_decision("local_unreadable")
+            return local_result
+        
+        self._record_decision("escalated")
+        gcp_result = self._run_gcp_vision(image_bytes)
+        if gcp_result is not None and gcp_result.plate:
+            return gcp_result
+        return local_result
+
+    def _pick_legacy(self, requested_engine: str) -> str:
+        if requested_engine == self.LOCAL and (Config.IS_HEROKU or not self.local_available):
+            return self.GCP_VISION
+        return requested_engine
+
+    def _pick_by_latency(self, requested_engine: str) -> str:
+        if not self.local_available:
+            return self.GCP_VISION
+        if not self._gcp_quota_available():
+            return self.LOCAL
+        
+        local_p95 = self._observed_p95(self.LOCAL)
+        gcp_p95 = self._observed_p95(self.GCP_VISION)
+        if local_p95 is None or gcp_p95 is None:
+            # Not enough samples yet: honour the route so both engines get measured
+            return requested_engine
+        return self.LOCAL if local_p95 <= gcp_p95 else self.GCP_VISION
+
+    def _observed_p95(self, engine: str) -> Optional[float]:
+        return self._observed_percentile(engine, 95)
+
+    def _observed_percentile(self, engine: str, p: float) -> Optional[float]:
+        tracker = self.latency[engine]
+        if tracker.count() < RouterConfig.LATENCY_MIN_SAMPLES:
+            return None
+        return tracker.percentile(p)
+
+    def _run_local(self, image_bytes: bytes, camera_id: Optional[str] = None,
+                   profile: Optional[str] = None) -> LicensePlateResult:
+        started = time.perf_counter()
+        with self.admission_control.slot(self.LOCAL):
+            result = self.license_plate_service.recognize(image_bytes, camera_id, profile)
+        self.latency[self.LOCAL].observe(time.perf_counter() - started)
+        result.engine = self.LOCAL
+        return result
+
+    def _run_gcp_vision_with_fallback(self, image_bytes: bytes, camera_id: Optional[str] = None,
+                                      profile: Optional[str] = None) -> LicensePlateResult:
+        if self._hedge_executor is not None:
+            result = self._run_gcp_vision_hedged(image_bytes, camera_id, profile)
+        else:
+            result = self._run_gcp_vision(image_bytes)
+        if result is not None:
+            return result
+        
+        if self.local_available:
+            self._record_decision("gcp_fallback_local")
+            return self._run_local(image_bytes, camera_id, profile)
+        return LicensePlateResult(None, 0.0, self.GCP_VISION, "GCP Vision unavailable", self.GCP_VISION)
+
+    def _run_gcp_vision(self, image_bytes: bytes) -> Optional[LicensePlateResult]:
+        """Returns None when GCP Vision was skipped or failed, so callers can fall back"""
+        if not self.gcp_breaker.allow_request():
+            self._record_decision("gcp_skipped_breaker_open")
+            return None
+        if not self._consume_gcp_quota():
+            self._record_decision("gcp_skipped_quota")
+            return None
+        
+        started = time.perf_counter()
+        try:
+            with self.admission_control.slot(self.GCP_VISION):
+                plate = self.gcp_vision_service.extract_license_plate_from_image(
+                    bytes(image_bytes), raise_on_error=True
+                )
+        except GCPVisionError as e:
+            self.gcp_breaker.record_failure()
+            metrics.increment("router.gcp_vision.failures")
+            logger.warning(f"GCP Vision call failed, breaker state {self.gcp_breaker.state}: {e}")
+            return None
+        
+        elapsed = time.perf_counter() - started
+        self.latency[self.GCP_VISION].observe(elapsed)
+        if elapsed > RouterConfig.GCP_SLOW_CALL_SECONDS:
+            self.gcp_breaker.record_failure()
+            metrics.increment("router.gcp_vision.slow_calls")
+        else:
+            self.gcp_breaker.record_success()
+        
+        if plate:
+            return LicensePlateResult(plate, self.GCP_VISION_CONFIDENCE, self.GCP_VISION, None, self.GCP_VISION)
+        return LicensePlateResult(None, 0.0, self.GCP_VISION, "No valid license plate found", self.GCP_VISION)
+
+    def _run_gcp_vision_hedged(self, image_bytes: bytes, camera_id: Optional[str] = None,
+                               profile: Optional[str] = None) -> Optional[LicensePlateResult]:
+        # Legs may outlive the request, so they must not share a reusable request buffer
+        image_bytes = bytes(image_bytes)
+        primary = self._hedge_executor.submit(self._run_gcp_vision, image_bytes)
+        try:
+            return primary.result(timeout=self._hedge_delay())
+        except FutureTimeoutError:
+            pass
+        
+        hedge_target = GCPVisionConfig.HEDGE_TARGET
+        if hedge_target == self.LOCAL and not self.local_available:
+            hedge_target = self.GCP_VISION
+        self._record_decision(f"hedged_{hedge_target}")
+        
+        if hedge_target == self.LOCAL:
+            runner = functools.partial(self._run_local, camera_id=camera_id, profile=profile)
+        else:
+            runner = self._run_gcp_vision
+        hedge = self._hedge_executor.submit(runner, image_bytes)
+        
+        # First leg with a plate wins; the loser finishes in the background
+        fallback = None
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = self._hedge_leg_result(future)
+                if result is not None and result.plate:
+                    metrics.increment(f"router.hedge.won_by_{'hedge' if future is hedge else 'primary'}")
+                    return result
+                if result is not None and fallback is None:
+                    fallback = result
+        return fallback
+
+    def _hedge_delay(self) -> float:
+        if GCPVisionConfig.HEDGE_DELAY_SECONDS:
+            return float(GCPVisionConfig.HEDGE_DELAY_SECONDS)
+        observed = self._observed_percentile(self.GCP_VISION, 90)
+        return observed if observed is not None else GCPVisionConfig.HEDGE_DEFAULT_DELAY_SECONDS
+
+    @staticmethod
+    def _hedge_leg_result(future: Future) -> Optional[LicensePlateResult]:
+        # A failed leg never decides the result: the other leg or the local fallback does
+        try:
+            return future.result()
+        except AdmissionRejectedError:
+            return None
+        except Exception as e:
+            metrics.increment("router.hedge.leg_errors")
+            logger.warning(f"Hedged call leg failed: {e}")
+            return None
+
+    def _gcp_quota_available(self) -> bool:
+        if RouterConfig.GCP_DAILY_QUOTA <= 0:
+            return True
+        with self._quota_lock:
+            self._roll_quota_day()
+            return self._quota_used < RouterConfig.GCP_DAILY_QUOTA
+
+    def _consume_gcp_quota(self) -> bool:
+        with self._quota_lock:
+            self._roll_quota_day()
+            if 0 < RouterConfig.GCP_DAILY_QUOTA <= self._quota_used:
+                return False
+            self._quota_used += 1
+            return True
+
+    def _roll_quota_day(self):
+        today = datetime.now(timezone.utc).date()
+        if self._quota_day != today:
+            self._quota_day = today
+            self._quota_used = 0
+
+    def _record_decision(self, decision: str):
+        metrics.increment(f"router.decision.{self.policy}.{decision}")
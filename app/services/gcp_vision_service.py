@@ -1,47 +1,113 @@
 import base64
-import re
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+import grpc
+from google.api_core import retry as api_retry
 from google.cloud import vision
+from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcTransport
 from google.oauth2 import service_account
 import json
 import os
+from app.config.settings import GCPVisionConfig
 from app.utils.logger import get_logger
+from app.utils.plate_grammar import PlateGrammar
 
 logger = get_logger(__name__)
 
+
+class GCPVisionError(Exception):
+    """Raised when the Vision API call itself fails (as opposed to finding no text)"""
+
+
 class GCPVisionService:
+    # One client (and therefore one gRPC channel) per endpoint and credentials,
+    # shared by every service instance in the process
+    _shared_clients: Dict[Tuple[str, str], vision.ImageAnnotatorClient] = {}
+    _shared_clients_lock = threading.Lock()
+    
     def __init__(self):
         self.credentials_path = "app/config/credentials/copec-462414-cad89218ad0f.json"
-        self.client = self._initialize_client()
+        self.client = self._get_shared_client()
+        self.retry_policy = api_retry.Retry(
+            predicate=api_retry.if_transient_error,
+            initial=GCPVisionConfig.RETRY_INITIAL_BACKOFF_SECONDS,
+            maximum=GCPVisionConfig.RETRY_MAX_BACKOFF_SECONDS,
+            multiplier=2.0,
+            timeout=GCPVisionConfig.DEADLINE_SECONDS
+        )
+    
+    def _get_shared_client(self) -> vision.ImageAnnotatorClient:
+        key = (GCPVisionConfig.ENDPOINT, self.credentials_path)
+        with self._shared_clients_lock:
+            client = self._shared_clients.get(key)
+            if client is None:
+                client = self._initialize_client()
+                self._shared_clients[key] = client
+            return client
     
     def _initialize_client(self) -> vision.ImageAnnotatorClient:
         """Initialize Google Cloud Vision client with service account"""
         try:
+            options = self._channel_options()
+            
+            if GCPVisionConfig.INSECURE_ENDPOINT:
+                # Plain-text channel, used to point the service at a local fake Vision server
+                channel = grpc.insecure_channel(GCPVisionConfig.ENDPOINT, options=options)
+                logger.info(f"GCP Vision client initialized against insecure endpoint {GCPVisionConfig.ENDPOINT}")
             # Check if credentials file exists
-            if os.path.exists(self.credentials_path):
+            elif os.path.exists(self.credentials_path):
                 # Initialize client with service account credentials file
                 credentials = service_account.Credentials.from_service_account_file(
                     self.credentials_path
                 )
-                client = vision.ImageAnnotatorClient(credentials=credentials)
+                channel = ImageAnnotatorGrpcTransport.create_channel(
+                    GCPVisionConfig.ENDPOINT, credentials=credentials, options=options
+                )
                 logger.info("GCP Vision client initialized successfully with service account file")
             else:
                 # Fallback to environment variables or default credentials
                 # Set GOOGLE_APPLICATION_CREDENTIALS environment variable
-                client = vision.ImageAnnotatorClient()
+                channel = ImageAnnotatorGrpcTransport.create_channel(
+                    GCPVisionConfig.ENDPOINT, options=options
+                )
                 logger.info("GCP Vision client initialized with default credentials")
             
-            return client
+            transport = ImageAnnotatorGrpcTransport(channel=channel)
+            return vision.ImageAnnotatorClient(transport=transport)
         except Exception as e:
             logger.error(f"Failed to initialize GCP Vision client: {str(e)}")
             raise
     
-    def extract_text_from_image(self, image_data: bytes) -> Optional[str]:
+    @staticmethod
+    def _channel_options() -> List[Tuple[str, int]]:
+        # The channel keeps its connection through idle periods instead of
+        # dropping it after gRPC's 30 min default. No keepalive pings: calls
+        # end within DEADLINE_SECONDS, well under any ping interval the Google
+        # front end accepts, and it answers pings on idle connections more
+        # often than every 2 hours with GOAWAY too_many_pings. A connection
+        # the server closes while idle is re-established on the next call,
+        # and a call that hits it half-closed is covered by the retry policy.
+        return [
+            ("grpc.max_send_message_length", -1),
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.client_idle_timeout_ms", GCPVisionConfig.CLIENT_IDLE_TIMEOUT_MS),
+        ]
+    
+    def _text_detection(self, image: vision.Image):
+        # Explicit deadline covering all retry attempts
+        return self.client.text_detection(
+            image=image,
+            retry=self.retry_policy,
+            timeout=GCPVisionConfig.DEADLINE_SECONDS
+        )
+    
+    def extract_text_from_image(self, image_data: bytes, raise_on_error: bool = False) -> Optional[str]:
         """
         Extract text from image using Google Cloud Vision API
         
         Args:
             image_data: Image data as bytes
+            raise_on_error: Raise GCPVisionError on API failures instead of returning None
             
         Returns:
             Extracted text or None if extraction fails
@@ -51,11 +117,13 @@ class GCPVisionService:
             image = vision.Image(content=image_data)
             
             # Perform text detection
-            response = self.client.text_detection(image=image)
+            response = self._text_detection(image)
             texts = response.text_annotations
             
             if response.error.message:
                 logger.error(f"GCP Vision API error: {response.error.message}")
+                if raise_on_error:
+                    raise GCPVisionError(response.error.message)
                 return None
             
             if not texts:
@@ -68,22 +136,27 @@ class GCPVisionService:
             
             return extracted_text
             
+        except GCPVisionError:
+            raise
         except Exception as e:
             logger.error(f"Error extracting text from image: {str(e)}")
+            if raise_on_error:
+                raise GCPVisionError(str(e)) from e
             return None
     
-    def extract_license_plate_from_image(self, image_data: bytes) -> Optional[str]:
+    def extract_license_plate_from_image(self, image_data: bytes, raise_on_error: bool = False) -> Optional[str]:
         """
         Extract Chilean license plate from image using GCP Vision
         
         Args:
             image_data: Image data as bytes
+            raise_on_error: Raise GCPVisionError on API failures instead of returning None
             
         Returns:
             License plate text or None if not found
         """
         try:
-            extracted_text = self.extract_text_from_image(image_data)
+            extracted_text = self.extract_text_from_image(image_data, raise_on_error)
             
             if not extracted_text:
                 return None
@@ -98,63 +171,30 @@ class GCPVisionService:
                 logger.warning("No valid Chilean license plate pattern found in extracted text")
                 return None
                 
+        except GCPVisionError:
+            raise
         except Exception as e:
             logger.error(f"Error extracting license plate: {str(e)}")
             return None
     
     def _extract_chilean_license_plate(self, text: str) -> Optional[str]:
         """
-        Extract Chilean license plate from text using regex patterns
+        Extract Chilean license plate from text using the shared plate grammar
         
         Args:
             text: Text extracted from image
             
         Returns:
-            License plate string or None if not found
+            Normalized license plate string or None if not found
         """
         try:
-            # Clean text: remove extra spaces and newlines
-            cleaned_text = re.sub(r'\s+', ' ', text.strip())
-            
-            # Chilean license plate patterns
-            patterns = [
-                # Current format with spaces: LL DD-NN (like "JG DJ-66")
-                r'[A-Z]{2}\s+[A-Z]{2}-\d{2}',
-                # Current format: LL-NN-NN (2 letters + hyphen + 2 numbers + hyphen + 2 numbers)
-                r'[A-Z]{2}-\d{2}-\d{2}',
-                # New format: LLLL·NN (4 letters + dot + 2 numbers)
-                r'[A-Z]{4}[·•.]\d{2}',
-                # Old format: LL·NNNN (2 letters + dot + 4 numbers)  
-                r'[A-Z]{2}[·•.]\d{4}',
-                # Alternative formats without separators
-                r'[A-Z]{4}\s*\d{2}',
-                r'[A-Z]{2}\s*\d{4}',
-                # With spaces between characters
-                r'[A-Z]\s*[A-Z]\s*[A-Z]\s*[A-Z]\s*[·•.]?\s*\d\s*\d',
-                r'[A-Z]\s*[A-Z]\s*[·•.]?\s*\d\s*\d\s*\d\s*\d',
-                # With hyphens and spaces (flexible)
-                r'[A-Z]\s*[A-Z]\s*-?\s*\d\s*\d\s*-?\s*\d\s*\d',
-                # More flexible pattern for spaced format
-                r'[A-Z]{2}\s+[A-Z]{2}\s*-\s*\d{2}'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, cleaned_text, re.IGNORECASE)
-                if matches:
-                    # Clean the match: remove extra spaces and normalize
-                    license_plate = matches[0].upper()
-                    license_plate = re.sub(r'\s+', '', license_plate)
-                    
-                    # Normalize dot/bullet characters
-                    license_plate = re.sub(r'[·•]', '.', license_plate)
-                    
-                    # Validate format
-                    if self._validate_chilean_license_plate(license_plate):
-                        # Remove hyphens and spaces from final result
-                        license_plate = license_plate.replace('-', '').replace(' ', '')
-                        return license_plate
-            
-            return None
+            match = PlateGrammar.search(text)
+            if match is None:
+                return None
+            if match.corrections:
+                logger.info(f"Corrected {match.corrections} OCR confusions: "
+                            f"{text[match.span[0]:match.span[1]]!r} -> {match.plate}")
+            return match.plate
             
         except Exception as e:
             logger.error(f"Error processing license plate text: {str(e)}")
@@ -165,36 +205,12 @@ class GCPVisionService:
         Validate Chilean license plate format
         
         Args:
-            plate: License plate string
+            plate: License plate string (separators allowed)
             
         Returns:
             True if valid Chilean format, False otherwise
         """
-        try:
-            # Current format with spaces: LL DD-NN (like "JG DJ-66")
-            if re.match(r'^[A-Z]{2}\s+[A-Z]{2}-\d{2}$', plate):
-                return True
-            
-            # Current format: LL-NN-NN (2 letters + hyphen + 2 numbers + hyphen + 2 numbers)
-            if re.match(r'^[A-Z]{2}-\d{2}-\d{2}$', plate):
-                return True
-            
-            # Remove dots, hyphens and spaces for other validations
-            clean_plate = plate.replace('.', '').replace('-', '').replace(' ', '')
-            
-            # New format: 4 letters + 2 numbers
-            if len(clean_plate) == 6 and clean_plate[:4].isalpha() and clean_plate[4:].isdigit():
-                return True
-            
-            # Old format: 2 letters + 4 numbers
-            if len(clean_plate) == 6 and clean_plate[:2].isalpha() and clean_plate[2:].isdigit():
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error validating license plate: {str(e)}")
-            return False
+        return PlateGrammar.parse(plate) is not None
     
     def get_detailed_text_analysis(self, image_data: bytes) -> Dict[str, Any]:
         """
@@ -208,7 +224,7 @@ class GCPVisionService:
         """
         try:
             image = vision.Image(content=image_data)
-            response = self.client.text_detection(image=image)
+            response = self._text_detection(image)
             texts = response.text_annotations
             
             if response.error.message:
@@ -1,29 +1,226 @@
+import struct
+import time
 import cv2
 import numpy as np
 from typing import List, Tuple, Optional
-from skimage.segmentation import clear_border
+from ..config.settings import ColorLocalizationConfig, ImageConfig, QualityGateConfig
+from ..models.license_plate_model import (
+    QualityAssessment, PlateCandidate, ImageProcessingParams, CharacterSegmentation
+)
+from ..utils.metrics import metrics
+
+
+class ImageTooLargeError(ValueError):
+    """Raised before decoding when the image exceeds ImageConfig.MAX_MEGAPIXELS"""
 
 
 class ImageProcessingService:
     
+    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    # JPEG start-of-frame markers carry the image dimensions (C4, C8 and CC are not SOF)
+    JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+    
+    REDUCED_GRAYSCALE_FLAGS = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+                               4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+    REDUCED_COLOR_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                           4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+    
+    # Contour-method crops are warped to this (width, height): 36:13 like a Chilean plate
+    RECTIFIED_PLATE_SIZE = (360, 130)
+    
+    # Crops are resized to this height before character segmentation
+    SEGMENTATION_HEIGHT = 60
+    
     @staticmethod
-    def decode_image(img_bytes: bytes) -> Optional[np.ndarray]:
+    def decode_image(img_bytes: bytes, grayscale: bool = False,
+                     target_width: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Decode an encoded image, optionally straight to grayscale and at reduced resolution
+        
+        Args:
+            img_bytes: Encoded image (bytes or any buffer)
+            grayscale: Decode directly to a single channel
+            target_width: Smallest width the consumer needs; JPEGs are DCT-scaled
+                by 1/2, 1/4 or 1/8 as long as the result stays at least this wide
+            
+        Returns:
+            Decoded image, or None if decoding fails or the bytes are not a
+            PNG/JPEG whose header gives its size
+            
+        Raises:
+            ImageTooLargeError: Header dimensions exceed ImageConfig.MAX_MEGAPIXELS
+        """
+        size = ImageProcessingService.read_image_size(img_bytes)
+        if size is None:
+            # Other formats (WebP, BMP, TIFF, ...) would be decoded at full size
+            # before their dimensions could be checked, so they are not decoded
+            metrics.increment("decode.rejected_unknown_format")
+            print("Error decoding image: not a PNG or JPEG with a readable size header")
+            return None
+        ImageProcessingService._check_pixel_count(*size)
+        
+        factor = ImageProcessingService._reduction_factor(size, target_width)
+        flags = (ImageProcessingService.REDUCED_GRAYSCALE_FLAGS if grayscale
+                 else ImageProcessingService.REDUCED_COLOR_FLAGS)[factor]
+        
         try:
+            started = time.perf_counter()
             img_array = np.frombuffer(img_bytes, np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            return img
+            img = cv2.imdecode(img_array, flags)
         except Exception as e:
             print(f"Error decoding image: {e}")
             return None
+        
+        if img is None:
+            return None
+        
+        ImageProcessingService._record_decode(size, img, time.perf_counter() - started)
+        return img
+    
+    @staticmethod
+    def read_image_size(img_bytes: bytes) -> Optional[Tuple[int, int]]:
+        """(width, height) read from the PNG IHDR or JPEG SOF header without decoding"""
+        data = memoryview(img_bytes)
+        if len(data) >= 24 and data[:8] == ImageProcessingService.PNG_SIGNATURE:
+            width, height = struct.unpack('>II', data[16:24])
+            return width, height
+        
+        if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+            return None
+        
+        offset = 2
+        while offset + 9 <= len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            if marker == 0xFF:
+                # Fill byte before a marker
+                offset += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                # Standalone markers without a length field
+                offset += 2
+                continue
+            if marker in ImageProcessingService.JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+            offset += 2 + segment_length
+        return None
+    
+    @staticmethod
+    def _check_pixel_count(width: int, height: int):
+        megapixels = width * height / 1_000_000
+        if megapixels > ImageConfig.MAX_MEGAPIXELS:
+            metrics.increment("decode.rejected_too_large")
+            raise ImageTooLargeError(
+                f"Image is {megapixels:.1f} MP, limit is {ImageConfig.MAX_MEGAPIXELS} MP"
+            )
+    
+    @staticmethod
+    def _reduction_factor(size: Optional[Tuple[int, int]], target_width: Optional[int]) -> int:
+        if size is None or not target_width:
+            return 1
+        width = size[0]
+        for factor in (8, 4, 2):
+            if width // factor >= target_width:
+                return factor
+        return 1
+    
+    @staticmethod
+    def _record_decode(size: Tuple[int, int], img: np.ndarray, seconds: float):
+        # Savings are measured against a full-size 3-channel BGR decode
+        full_bytes = size[0] * size[1] * 3
+        metrics.increment("decode.count")
+        metrics.increment("decode.seconds", seconds)
+        metrics.increment("decode.bytes_allocated", img.nbytes)
+        metrics.increment("decode.bytes_saved", max(0, full_bytes - img.nbytes))
     
     @staticmethod
     def grayscale(img: np.ndarray) -> np.ndarray:
+        if img.ndim == 2:
+            return img
         return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
+    @staticmethod
+    def assess_quality(gray: np.ndarray) -> QualityAssessment:
+        """
+        Cheap readability check on a thumbnail: blur, exposure and edge density
+        
+        Args:
+            gray: Grayscale frame (ideally already decoded near thumbnail size)
+            
+        Returns:
+            QualityAssessment with the measured scores and the reasons it failed, if any
+        """
+        config = QualityGateConfig
+        height, width = gray.shape[:2]
+        if width > config.THUMBNAIL_WIDTH:
+            scale = config.THUMBNAIL_WIDTH / width
+            gray = cv2.resize(gray, (config.THUMBNAIL_WIDTH, max(1, int(height * scale))),
+                              interpolation=cv2.INTER_AREA)
+        
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        
+        histogram = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        cumulative = np.cumsum(histogram) / histogram.sum()
+        brightness = float(np.dot(np.arange(256), histogram) / histogram.sum())
+        contrast = float(np.searchsorted(cumulative, 0.95) - np.searchsorted(cumulative, 0.05))
+        clipped_fraction = float((histogram[:16].sum() + histogram[240:].sum()) / histogram.sum())
+        
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = float(np.count_nonzero(edges)) / edges.size
+        
+        reasons = []
+        if sharpness < config.MIN_SHARPNESS:
+            reasons.append("blurry")
+        if brightness < config.MIN_BRIGHTNESS:
+            reasons.append("too_dark")
+        if brightness > config.MAX_BRIGHTNESS:
+            reasons.append("overexposed")
+        if contrast < config.MIN_CONTRAST:
+            reasons.append("low_contrast")
+        if clipped_fraction > config.MAX_CLIPPED_FRACTION:
+            reasons.append("clipped_exposure")
+        if edge_density < config.MIN_EDGE_DENSITY:
+            reasons.append("no_structure")
+        
+        return QualityAssessment(
+            readable=not reasons,
+            reasons=reasons,
+            sharpness=sharpness,
+            brightness=brightness,
+            contrast=contrast,
+            clipped_fraction=clipped_fraction,
+            edge_density=edge_density
+        )
+    
     @staticmethod
     def apply_threshold(img: np.ndarray, threshold_value: int = 170) -> np.ndarray:
         return cv2.threshold(img, threshold_value, 255, cv2.THRESH_BINARY_INV)[1]
-    
+
+    @staticmethod
+    def binarize(img: np.ndarray, method: str, block_size: int = 31, offset: int = 10) -> np.ndarray:
+        """
+        Single-pass binarization with the same polarity as apply_threshold
+
+        Args:
+            img: Grayscale image
+            method: 'otsu' (global, histogram-derived threshold) or 'adaptive'
+                (local Gaussian mean minus offset over block_size neighbourhoods)
+        """
+        if method == 'otsu':
+            return cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        if method == 'adaptive':
+            return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                         cv2.THRESH_BINARY_INV, block_size | 1, offset)
+        raise ValueError(f"Unknown binarization method: {method}")
+
+    @staticmethod
+    def close_binary(img: np.ndarray, kernel_size: int) -> np.ndarray:
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
+        return cv2.morphologyEx(img, cv2.MORPH_CLOSE, kernel)
+
     @staticmethod
     def find_contours(img: np.ndarray) -> List:
         contours, _ = cv2.findContours(img, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
@@ -43,59 +240,367 @@ class ImageProcessingService:
         x, y, w, h = cv2.boundingRect(contour)
         return img[y:y+h, x:x+w]
     
+    @staticmethod
+    def crop_box(img: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = box
+        return img[y:y+h, x:x+w]
+    
+    @staticmethod
+    def select_plate_candidates(gray: np.ndarray, contours: List,
+                                params: ImageProcessingParams) -> List[PlateCandidate]:
+        """
+        Filter contours with is_license_plate and rank them by score
+        
+        Args:
+            gray: Grayscale frame the contours were found on
+            contours: Contours from find_contours
+            params: Size filters, scoring weights and top-K budget
+            
+        Returns:
+            Candidates in descending score order, at most params.max_ocr_candidates
+            (all of them, in contour order, when ranking is disabled)
+        """
+        candidates = []
+        for contour in contours:
+            if not ImageProcessingService.is_license_plate(
+                contour,
+                params.min_aspect_ratio,
+                params.max_aspect_ratio,
+                params.min_width,
+                params.min_height
+            ):
+                continue
+            box = cv2.boundingRect(contour)
+            score = (ImageProcessingService.score_plate_candidate(gray, contour, box, params)
+                     if params.rank_candidates else 0.0)
+            candidates.append(PlateCandidate(box, score, contour))
+        
+        if not params.rank_candidates:
+            return candidates
+        
+        candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+        if params.max_ocr_candidates:
+            candidates = candidates[:params.max_ocr_candidates]
+        return candidates
+    
+    @staticmethod
+    def locate_by_color(bgr: np.ndarray, gray: np.ndarray,
+                        params: ImageProcessingParams) -> List[PlateCandidate]:
+        """
+        Plate candidates from color alone: low-saturation, bright, neutral
+        pixels (HSV and Lab on a downscaled copy) grouped into rectangles that
+        are edge-dense inside, the way black characters on a white plate are
+        
+        Args:
+            bgr: Color frame
+            gray: Grayscale of the same frame, used to score the candidates
+            params: Size and aspect filters (full-resolution pixels) and scoring weights
+            
+        Returns:
+            Candidates in full-resolution coordinates, best score first, at most
+            ColorLocalizationConfig.MAX_CANDIDATES
+        """
+        config = ColorLocalizationConfig
+        height, width = bgr.shape[:2]
+        scale = min(1.0, config.WIDTH / width)
+        small = bgr if scale == 1.0 else cv2.resize(
+            bgr, (config.WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA
+        )
+        
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        lab = cv2.cvtColor(small, cv2.COLOR_BGR2LAB).astype(np.int16)
+        chroma = np.abs(lab[:, :, 1] - 128) + np.abs(lab[:, :, 2] - 128)
+        mask = ((hsv[:, :, 1] <= config.MAX_SATURATION) & (hsv[:, :, 2] >= config.MIN_VALUE)
+                & (chroma <= config.MAX_CHROMA)).astype(np.uint8) * 255
+        # Join plate background split by characters or colored stripes, drop speckle
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (5, 3)))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+        edges = cv2.Canny(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), 50, 150)
+        
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        candidates = []
+        for contour in contours:
+            sx, sy, sw, sh = cv2.boundingRect(contour)
+            if sw < 2 or sh < 2:
+                continue
+            box = (int(sx / scale), int(sy / scale), int(round(sw / scale)), int(round(sh / scale)))
+            if not (params.min_aspect_ratio <= box[2] / box[3] <= params.max_aspect_ratio
+                    and box[2] >= params.min_width and box[3] >= params.min_height):
+                continue
+            if cv2.contourArea(contour) < config.MIN_FILL * sw * sh:
+                continue
+            # Interior only: the outline of any bright rectangle is an edge too
+            ix, iy = max(1, sw // 8), max(1, sh // 6)
+            interior = edges[sy + iy:sy + sh - iy, sx + ix:sx + sw - ix]
+            if interior.size == 0 or np.count_nonzero(interior) / float(interior.size) < config.MIN_EDGE_DENSITY:
+                continue
+            full_contour = (contour / scale).astype(np.int32)
+            score = ImageProcessingService.score_plate_candidate(gray, full_contour, box, params)
+            candidates.append(PlateCandidate(box, score, full_contour))
+        
+        candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+        return candidates[:config.MAX_CANDIDATES]
+    
+    @staticmethod
+    def score_plate_candidate(gray: np.ndarray, contour, box: Tuple[int, int, int, int],
+                              params: ImageProcessingParams) -> float:
+        """Weighted sum of cheap plate-likeness features, each in [0, 1]"""
+        x, y, w, h = box
+        crop = gray[y:y+h, x:x+w]
+        if crop.size == 0:
+            return 0.0
+        
+        aspect_error = abs(w / h - params.target_aspect_ratio) / params.target_aspect_ratio
+        features = {
+            'aspect': max(0.0, 1.0 - aspect_error),
+            # Characters produce strong vertical strokes: mean horizontal gradient
+            'edge_density': min(1.0, float(np.mean(np.abs(cv2.Sobel(crop, cv2.CV_16S, 1, 0, ksize=3)))) / 128.0),
+            'contrast': min(1.0, float(crop.std()) / 64.0),
+            'fill': min(1.0, cv2.contourArea(contour) / float(w * h)),
+            'position': ImageProcessingService._center_closeness(gray.shape, box)
+        }
+        
+        return sum(params.candidate_score_weights.get(name, 0.0) * value
+                   for name, value in features.items())
+    
+    @staticmethod
+    def _center_closeness(shape: Tuple[int, ...], box: Tuple[int, int, int, int]) -> float:
+        height, width = shape[:2]
+        x, y, w, h = box
+        dx = (x + w / 2) / width - 0.5
+        dy = (y + h / 2) / height - 0.5
+        return max(0.0, 1.0 - float(np.hypot(dx, dy)) / 0.7072)
+    
+    @staticmethod
+    def box_iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+        inter_h = min(ay + ah, by + bh) - max(ay, by)
+        if inter_w <= 0 or inter_h <= 0:
+            return 0.0
+        intersection = inter_w * inter_h
+        return intersection / float(aw * ah + bw * bh - intersection)
+    
+    @staticmethod
+    def box_overlap_of_smaller(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+        """Share of the smaller box covered by the other: 1.0 when one box contains the other"""
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+        inter_h = min(ay + ah, by + bh) - max(ay, by)
+        if inter_w <= 0 or inter_h <= 0:
+            return 0.0
+        return inter_w * inter_h / float(min(aw * ah, bw * bh))
+    
+    @staticmethod
+    def segment_characters(crop: np.ndarray, min_characters: int = 6) -> CharacterSegmentation:
+        """
+        Count character-shaped blobs sharing a baseline, without any OCR
+        
+        Args:
+            crop: Grayscale plate candidate
+            min_characters: Aligned blobs needed for the crop to be plausible
+            
+        Returns:
+            CharacterSegmentation with the aligned character boxes in crop coordinates
+        """
+        if crop.size == 0 or crop.shape[0] < 8:
+            return CharacterSegmentation(False, [])
+        
+        # Normalise height so the geometry limits are resolution independent
+        scale = ImageProcessingService.SEGMENTATION_HEIGHT / crop.shape[0]
+        resized = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), ImageProcessingService.SEGMENTATION_HEIGHT),
+                             interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        
+        best = []
+        # Dark characters on a light plate first, then the inverse polarity
+        for mode in (cv2.THRESH_BINARY_INV, cv2.THRESH_BINARY):
+            binary = cv2.threshold(resized, 0, 255, mode | cv2.THRESH_OTSU)[1]
+            aligned = ImageProcessingService._aligned_character_blobs(binary)
+            if len(aligned) > len(best):
+                best = aligned
+            if len(best) >= min_characters:
+                break
+        
+        boxes = [(int(x / scale), int(y / scale), max(1, int(w / scale)), max(1, int(h / scale)))
+                 for x, y, w, h in best]
+        return CharacterSegmentation(len(boxes) >= min_characters, boxes)
+    
+    @staticmethod
+    def _aligned_character_blobs(binary: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        height, width = binary.shape[:2]
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        
+        blobs = []
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            if not (0.25 * height <= h <= 0.95 * height):
+                continue
+            if not (1.0 <= h / w <= 8.0):
+                continue
+            if area < 0.15 * w * h:
+                continue
+            blobs.append((int(x), int(y), int(w), int(h)))
+        
+        if not blobs:
+            return []
+        
+        # Largest group of similar-height blobs whose bottoms sit on a common baseline
+        best = []
+        for _, _, _, ref_h in blobs:
+            group = [b for b in blobs if abs(b[3] - ref_h) <= 0.2 * ref_h]
+            if len(group) <= len(best):
+                continue
+            baseline = float(np.median([b[1] + b[3] for b in group]))
+            group = [b for b in group if abs(b[1] + b[3] - baseline) <= 0.15 * ref_h]
+            if len(group) > len(best):
+                best = group
+        
+        return sorted(best, key=lambda b: b[0])
+    
+    @staticmethod
+    def clear_border(img: np.ndarray) -> np.ndarray:
+        """
+        Zero every region touching the image border, like
+        skimage.segmentation.clear_border with its defaults
+
+        A region is an 8-connected set of pixels sharing the same value, so
+        grayscale crops are handled exactly as skimage labels them. Regions
+        that continue past the border ring are flood-filled from one of their
+        border pixels; the ring itself is then zeroed in one go.
+        """
+        height, width = img.shape[:2]
+        if height <= 2 or width <= 2:
+            # Every pixel lies on the border
+            return np.zeros_like(img)
+        
+        cleared = img.copy()
+        seeds = []
+        for edge, inner, to_point in (
+            (img[0], img[1], lambda i: (i, 0)),
+            (img[-1], img[-2], lambda i: (i, height - 1)),
+            (img[:, 0], img[:, 1], lambda i: (0, i)),
+            (img[:, -1], img[:, -2], lambda i: (width - 1, i)),
+        ):
+            seeds.extend(to_point(i) for i in
+                         np.flatnonzero(ImageProcessingService._continues_inward(edge, inner)).tolist())
+        
+        flags = 8 | cv2.FLOODFILL_FIXED_RANGE
+        for x, y in seeds:
+            if cleared[y, x]:
+                cv2.floodFill(cleared, None, (x, y), 0, 0, 0, flags)
+        
+        cleared[0, :] = 0
+        cleared[-1, :] = 0
+        cleared[:, 0] = 0
+        cleared[:, -1] = 0
+        return cleared
+    
+    @staticmethod
+    def _continues_inward(edge: np.ndarray, inner: np.ndarray) -> np.ndarray:
+        """Nonzero border pixels with a same-valued 8-neighbour in the adjacent inner line"""
+        match = edge == inner
+        match[1:] |= edge[1:] == inner[:-1]
+        match[:-1] |= edge[:-1] == inner[1:]
+        return match & (edge != 0)
+    
     @staticmethod
     def process_license_plate(license_plate_img: np.ndarray) -> np.ndarray:
-        cleared = clear_border(license_plate_img)
+        cleared = ImageProcessingService.clear_border(license_plate_img)
         inverted = cv2.bitwise_not(cleared)
         return inverted
     
     @staticmethod
     def bilateral_filter_preprocessing(img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = ImageProcessingService.grayscale(img)
         bilateral = cv2.bilateralFilter(gray, 11, 17, 17)
         edges = cv2.Canny(bilateral, 30, 200)
         return gray, edges
     
     @staticmethod
     def find_rectangular_contours(edges: np.ndarray, original_image: np.ndarray):
+        quads = ImageProcessingService.find_all_rectangular_contours(edges, max_contours=10, limit=1)
+        return quads[0] if quads else None
+    
+    @staticmethod
+    def find_all_rectangular_contours(edges: np.ndarray, max_contours: int = 10,
+                                      limit: Optional[int] = None) -> List:
+        """4-point approximations among the max_contours largest contours, largest first"""
         contours, _ = cv2.findContours(edges.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=cv2.contourArea, reverse=True)[:10]
+        contours = sorted(contours, key=cv2.contourArea, reverse=True)[:max_contours]
         
+        quads = []
         for contour in contours:
             perimeter = cv2.arcLength(contour, True)
             approx = cv2.approxPolyDP(contour, 0.018 * perimeter, True)
             
             if len(approx) == 4:
-                return approx
-        return None
+                quads.append(approx)
+                if limit and len(quads) >= limit:
+                    break
+        return quads
     
     @staticmethod
-    def extract_contour_region(image: np.ndarray, contour) -> Optional[np.ndarray]:
-        if contour is None:
-            return None
+    def stack_crops(crops: List[np.ndarray], height: int, gap: int = 16,
+                    background: int = 255) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """
+        Scale crops to a common height and stack them on one canvas, so a
+        single OCR call can read them all
         
-        mask = np.zeros(image.shape, np.uint8)
-        cv2.drawContours(mask, [contour], 0, 255, -1)
+        Returns:
+            (canvas, band per crop) where a band is the (top, bottom) row range
+            that text read inside it belongs to
+        """
+        scaled = [cv2.resize(crop, (max(1, round(crop.shape[1] * height / crop.shape[0])), height),
+                             interpolation=cv2.INTER_CUBIC if crop.shape[0] < height else cv2.INTER_AREA)
+                  for crop in crops]
+        width = max(crop.shape[1] for crop in scaled) + 2 * gap
+        canvas = np.full((len(scaled) * (height + gap) + gap, width), background, dtype=np.uint8)
+        bands = []
+        for i, crop in enumerate(scaled):
+            top = gap + i * (height + gap)
+            canvas[top:top + height, gap:gap + crop.shape[1]] = crop
+            bands.append((top - gap // 2, top + height + gap // 2))
+        return canvas, bands
+    
+    @staticmethod
+    def extract_contour_region(image: np.ndarray, contour) -> Optional[np.ndarray]:
+        """
+        Perspective-rectify a 4-point plate contour to RECTIFIED_PLATE_SIZE
         
-        (x, y) = np.where(mask == 255)
-        if len(x) == 0 or len(y) == 0:
-            return None
+        Args:
+            image: Image the contour was found in
+            contour: Quadrilateral from find_rectangular_contours
             
-        (topx, topy) = (np.min(x), np.min(y))
-        (bottomx, bottomy) = (np.max(x), np.max(y))
-        
-        cropped = image[topx:bottomx+1, topy:bottomy+1]
-        
-        if cropped.size == 0:
+        Returns:
+            Deskewed plate-sized crop, or None for a missing or degenerate contour
+        """
+        if contour is None:
             return None
         
-        if cropped.shape[0] < 50 or cropped.shape[1] < 150:
-            scale_factor = max(50 / cropped.shape[0], 150 / cropped.shape[1])
-            new_width = int(cropped.shape[1] * scale_factor)
-            new_height = int(cropped.shape[0] * scale_factor)
-            cropped = cv2.resize(cropped, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+        corners = ImageProcessingService.order_quad_points(contour)
+        if cv2.contourArea(corners) < 1:
+            return None
         
-        return cropped
+        width, height = ImageProcessingService.RECTIFIED_PLATE_SIZE
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], np.float32)
+        transform = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(image, transform, (width, height), flags=cv2.INTER_CUBIC,
+                                   borderMode=cv2.BORDER_REPLICATE)
+    
+    @staticmethod
+    def order_quad_points(contour) -> np.ndarray:
+        """Corners of a quadrilateral as float32 top-left, top-right, bottom-right, bottom-left"""
+        points = np.asarray(contour, np.float32).reshape(4, 2)
+        sums = points.sum(axis=1)
+        diffs = points[:, 1] - points[:, 0]
+        return np.array([
+            points[np.argmin(sums)],
+            points[np.argmin(diffs)],
+            points[np.argmax(sums)],
+            points[np.argmax(diffs)]
+        ], np.float32)
     
     @staticmethod
     def enhance_image(img: np.ndarray) -> np.ndarray:
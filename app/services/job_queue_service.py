@@ -0,0 +1,219 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+import requests
+from ..config.settings import JobConfig
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.validators import CallbackUrlValidator
+from .admission_control_service import AdmissionRejectedError
+
+logger = get_logger(__name__)
+
+
+class JobStore:
+    """
+    SQLite-backed job table.
+
+    Jobs (including the uploaded image) live on local disk, so queued work
+    survives worker restarts without an external broker.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                image BLOB,
+                callback_url TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+
+    def create(self, image_bytes: bytes, engine: str, callback_url: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, engine, image, callback_url, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, self.QUEUED, engine, sqlite3.Binary(image_bytes), callback_url, now, now)
+            )
+        return job_id
+
+    def claim_next(self, lease_seconds: float) -> Optional[sqlite3.Row]:
+        """Atomically move the oldest queued (or lease-expired running) job to running"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, engine, image, callback_url, attempts FROM jobs "
+                    "WHERE status = ? OR (status = ? AND updated_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (self.QUEUED, self.RUNNING, now - lease_seconds)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (self.RUNNING, now, row['id'])
+                    )
+                self._conn.execute("COMMIT")
+                return row
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def requeue(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, updated_at = ? WHERE id = ?",
+                (self.QUEUED, time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None):
+        # The image is no longer needed once the job reaches a final state
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, image = NULL, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, engine, result, error, attempts, created_at, updated_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row['id'],
+            "status": row['status'],
+            "engine": row['engine'],
+            "result": json.loads(row['result']) if row['result'] else None,
+            "error": row['error'],
+            "attempts": row['attempts'],
+            "created_at": row['created_at'],
+            "updated_at": row['updated_at']
+        }
+
+    def count_by_status(self, status: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+
+class JobQueueService:
+    """
+    In-process work queue for asynchronous recognition.
+
+    A pool of daemon worker threads claims jobs from the JobStore, runs them
+    through the given processor (the same engine path as the synchronous
+    endpoints) and optionally POSTs the final job to a webhook.
+    """
+
+    def __init__(self, processor: Callable[[bytes, str], Dict[str, Any]],
+                 store: Optional[JobStore] = None, workers: Optional[int] = None):
+        self.processor = processor
+        self.store = store or JobStore(JobConfig.DB_PATH)
+        self._wakeup = threading.Event()
+        self._workers = []
+
+        metrics.register_gauge("jobs.queued", lambda: self.store.count_by_status(JobStore.QUEUED))
+        metrics.register_gauge("jobs.running", lambda: self.store.count_by_status(JobStore.RUNNING))
+
+        for i in range(workers if workers is not None else JobConfig.WORKERS):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, image_bytes: bytes, engine: str, callback_url: Optional[str] = None) -> str:
+        job_id = self.store.create(image_bytes, engine, callback_url)
+        metrics.increment("jobs.submitted")
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _worker_loop(self):
+        while True:
+            try:
+                job = self.store.claim_next(JobConfig.LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(JobConfig.POLL_INTERVAL_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            self._process(job)
+
+    def _process(self, job: sqlite3.Row):
+        job_id = job['id']
+        if job['attempts'] >= JobConfig.MAX_ATTEMPTS:
+            self.store.finish(job_id, JobStore.FAILED, error="Maximum attempts exceeded")
+            metrics.increment("jobs.failed")
+            self._notify(job_id, job['callback_url'])
+            return
+
+        try:
+            result = self.processor(bytes(job['image']), job['engine'])
+        except AdmissionRejectedError as e:
+            # Engine saturated by synchronous traffic: put the job back and retry later
+            self.store.requeue(job_id)
+            metrics.increment("jobs.deferred")
+            time.sleep(e.retry_after)
+            return
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.finish(job_id, JobStore.FAILED, error=str(e))
+            metrics.increment("jobs.failed")
+            self._notify(job_id, job['callback_url'])
+            return
+
+        self.store.finish(job_id, JobStore.DONE, result=result)
+        metrics.increment("jobs.completed")
+        self._notify(job_id, job['callback_url'])
+
+    def _notify(self, job_id: str, callback_url: Optional[str]):
+        if not callback_url:
+            return
+        # Jobs queued before the allow-list changed are checked again at delivery
+        if not CallbackUrlValidator.validate(callback_url)['valid']:
+            logger.warning(f"Not delivering webhook for job {job_id}: callback_url rejected")
+            metrics.increment("jobs.webhook_rejected")
+            return
+        try:
+            response = requests.post(
+                callback_url,
+                json=self.store.get(job_id),
+                timeout=JobConfig.WEBHOOK_TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            metrics.increment("jobs.webhook_delivered")
+        except Exception as e:
+            logger.warning(f"Webhook delivery failed for job {job_id}: {str(e)}")
+            metrics.increment("jobs.webhook_failed")
@@ -1,77 +1,439 @@
 import cv2
-from typing import Optional
-from ..models.license_plate_model import LicensePlateResult, ImageProcessingParams, ChileanLicensePlateValidator
-from .image_processing_service import ImageProcessingService
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+from ..models.license_plate_model import (
+    LicensePlateResult, ImageProcessingParams, ChileanLicensePlateValidator, PlateCandidate, MultiPlateResult
+)
+from .image_processing_service import ImageProcessingService, ImageTooLargeError
 from .ocr_service import OCRService
+from .threshold_schedule_service import AdaptiveThresholdScheduler
+from .roi_service import CameraROIService
+from ..config.settings import (
+    AdaptiveScheduleConfig, ColorLocalizationConfig, MultiPlateConfig, PipelineConfig, QualityGateConfig, ROIConfig
+)
+from ..utils.metrics import metrics
 
 
 class LicensePlateService:
     
+    # Working width of the contour method; decoding is DCT-scaled down towards it
+    CONTOUR_MAX_WIDTH = 800
+    
+    # OCR variants of a candidate crop: confidence and method reported when accepted
+    OCR_VARIANTS = {
+        'processed': (0.9, "santifiorino"),
+        'inverted': (0.8, "santifiorino_alt"),
+        'original': (0.7, "santifiorino_orig"),
+    }
+    
+    # Pass of the santifiorino pipeline whose candidates come from locate_by_color
+    COLOR_PASS = 'color'
+    
     def __init__(self):
-        self.processing_params = ImageProcessingParams.default()
+        self.processing_params = self.default_params()
         self.image_processor = ImageProcessingService()
         self.ocr_service = OCRService()
+        self.threshold_scheduler = AdaptiveThresholdScheduler() if AdaptiveScheduleConfig.ENABLED else None
+        self.roi_service = CameraROIService() if ROIConfig.ENABLED else None
+    
+    @staticmethod
+    def default_params() -> ImageProcessingParams:
+        return replace(
+            ImageProcessingParams.default(),
+            color_localization=ColorLocalizationConfig.MODE or None
+        )
+    
+    def params_for_profile(self, profile: Optional[str] = None) -> ImageProcessingParams:
+        """Processing params of a pipeline profile (see PipelineConfig), derived from processing_params"""
+        return self.profile_params(self.processing_params, profile)
     
-    def recognize_santifiorino_method(self, img_bytes: bytes) -> LicensePlateResult:
+    @staticmethod
+    def profile_params(base: ImageProcessingParams, profile: Optional[str] = None) -> ImageProcessingParams:
+        profile = profile or PipelineConfig.DEFAULT_PROFILE
+        if profile not in PipelineConfig.PROFILES:
+            raise ValueError(f"Unknown pipeline profile: {profile}")
+        if profile == 'thorough':
+            return base
+        
+        close_kernel = PipelineConfig.FAST_CLOSE_KERNEL or None
+        if profile == 'fast':
+            return replace(
+                base,
+                binarization=PipelineConfig.FAST_BINARIZATION,
+                close_kernel_size=close_kernel,
+                max_threshold_passes=0,
+                contour_fallback=False
+            )
+        return replace(
+            base,
+            binarization=PipelineConfig.FAST_BINARIZATION,
+            close_kernel_size=close_kernel,
+            max_threshold_passes=PipelineConfig.BALANCED_SWEEP_PASSES
+        )
+    
+    def recognize_santifiorino_method(self, img_bytes: bytes, camera_id: Optional[str] = None,
+                                      params: Optional[ImageProcessingParams] = None) -> LicensePlateResult:
+        params = params or self.processing_params
         try:
-            img = self.image_processor.decode_image(img_bytes)
+            # The color localizer needs the color frame; otherwise decode straight to grayscale
+            img = self.image_processor.decode_image(
+                img_bytes,
+                grayscale=not params.color_localization,
+                target_width=params.decode_target_width
+            )
             if img is None:
                 return LicensePlateResult(None, 0.0, "santifiorino", "Failed to decode image")
             
             print(f"Processing image of size: {img.shape}")
-            gray_img = self.image_processor.grayscale(img)
+            color_img = img if img.ndim == 3 else None
+            return self.recognize_santifiorino_image(self.image_processor.grayscale(img), camera_id, params, color_img)
             
-            for threshold in self.processing_params.threshold_values:
-                print(f"Trying threshold: {threshold}")
-                binary_img = self.image_processor.apply_threshold(gray_img, threshold)
+        except ImageTooLargeError:
+            # Rejected before decoding: reported as such, not as a recognition miss
+            raise
+        except Exception as e:
+            return LicensePlateResult(None, 0.0, "santifiorino", f"Error in recognition: {e}")
+    
+    def recognize_santifiorino_image(self, gray_img, camera_id: Optional[str] = None,
+                                     params: Optional[ImageProcessingParams] = None,
+                                     color_img=None) -> LicensePlateResult:
+        params = params or self.processing_params
+        try:
+            if self.roi_service is None or not camera_id:
+                return self._santifiorino_pipeline(gray_img, camera_id, params, color_img)
+            return self._search_with_roi(gray_img, camera_id, params, color_img)
+        except Exception as e:
+            return LicensePlateResult(None, 0.0, "santifiorino", f"Error in recognition: {e}")
+    
+    def _search_with_roi(self, gray_img, camera_id: str, params: ImageProcessingParams,
+                         color_img=None) -> LicensePlateResult:
+        """Search the camera's ROI first and widen to the full frame only on a miss"""
+        started = time.perf_counter()
+        full_pixels = gray_img.shape[0] * gray_img.shape[1]
+        roi = self.roi_service.get_roi(camera_id, gray_img.shape)
+        
+        processed_pixels = 0
+        result = None
+        if roi is not None:
+            x, y, w, h = roi
+            processed_pixels += w * h
+            color_roi = color_img[y:y + h, x:x + w] if color_img is not None else None
+            result = self._santifiorino_pipeline(gray_img[y:y + h, x:x + w], camera_id, params, color_roi)
+            if result.plate:
+                bx, by, bw, bh = result.bounding_box
+                result.bounding_box = (bx + x, by + y, bw, bh)
+                metrics.increment("roi.hits")
+            else:
+                metrics.increment("roi.misses")
+        
+        roi_hit = result is not None and result.plate is not None
+        if not roi_hit:
+            processed_pixels += full_pixels
+            result = self._santifiorino_pipeline(gray_img, camera_id, params, color_img)
+        
+        if result.plate:
+            self.roi_service.record_detection(camera_id, result.bounding_box, gray_img.shape)
+        self.roi_service.record_search(
+            camera_id, roi is not None, roi_hit, processed_pixels, full_pixels,
+            time.perf_counter() - started
+        )
+        return result
+    
+    def _santifiorino_pipeline(self, gray_img, camera_id: Optional[str] = None,
+                               params: Optional[ImageProcessingParams] = None,
+                               color_img=None) -> LicensePlateResult:
+        params = params or self.processing_params
+        context = None
+        threshold_values = params.threshold_values
+        variants = list(self.OCR_VARIANTS)
+        if self.threshold_scheduler is not None:
+            context = self.threshold_scheduler.context_key(camera_id)
+            threshold_values = self.threshold_scheduler.order_thresholds(context, threshold_values)
+            variants = self.threshold_scheduler.order_variants(context, variants)
+        if params.max_threshold_passes is not None:
+            threshold_values = threshold_values[:params.max_threshold_passes]
+        
+        # A single-pass binarization (Otsu/adaptive) runs ahead of the fixed thresholds
+        binarization_passes = ([params.binarization] if params.binarization else []) + list(threshold_values)
+        
+        # White-plate color mask: its candidates go first ('seed') or instead of the sweep ('replace')
+        color_candidates = []
+        if params.color_localization and color_img is not None:
+            color_candidates = self.image_processor.locate_by_color(color_img, gray_img, params)
+            metrics.increment("color_localization.frames")
+            metrics.increment("color_localization.candidates", len(color_candidates))
+            if color_candidates:
+                if params.color_localization == 'replace':
+                    binarization_passes = []
+                binarization_passes = [self.COLOR_PASS] + binarization_passes
+        
+        ocr_boxes = []
+        for passes, threshold in enumerate(binarization_passes, start=1):
+            print(f"Trying threshold: {threshold}")
+            if threshold == self.COLOR_PASS:
+                candidates = color_candidates
+            else:
+                binary_img = self._binarize(gray_img, threshold, params)
                 contours = self.image_processor.find_contours(binary_img)
                 
-                license_plates = []
-                for contour in contours:
-                    if self.image_processor.is_license_plate(
-                        contour, 
-                        self.processing_params.min_aspect_ratio,
-                        self.processing_params.max_aspect_ratio,
-                        self.processing_params.min_width,
-                        self.processing_params.min_height
-                    ):
-                        license_plates.append(contour)
+                candidates = self.image_processor.select_plate_candidates(
+                    gray_img, contours, params
+                )
+            
+            for candidate in candidates:
+                # Neighbouring thresholds often find the same plate outline again
+                if any(self.image_processor.box_iou(candidate.box, seen) >= params.duplicate_iou
+                       for seen in ocr_boxes):
+                    metrics.increment("candidates.skipped_duplicate")
+                    continue
+                ocr_boxes.append(candidate.box)
+                
+                license_plate_img = self.image_processor.crop_box(gray_img, candidate.box)
                 
-                for i, plate_contour in enumerate(license_plates):
-                    license_plate_img = self.image_processor.crop_license_plate(gray_img, plate_contour)
-                    
-                    if license_plate_img.size == 0:
+                if license_plate_img.size == 0:
+                    continue
+                
+                if params.segmentation_gate:
+                    segmentation = self.image_processor.segment_characters(
+                        license_plate_img, params.min_plate_characters
+                    )
+                    if not segmentation.plausible:
+                        metrics.increment("candidates.rejected_segmentation")
                         continue
-                    
-                    processed_img = self.image_processor.process_license_plate(license_plate_img)
-                    extracted_text = self.ocr_service.extract_text(processed_img)
-                    
-                    if ChileanLicensePlateValidator.validate(extracted_text):
-                        return LicensePlateResult(extracted_text, 0.9, "santifiorino", None)
-                    
-                    inverted_only = cv2.bitwise_not(license_plate_img)
-                    text2 = self.ocr_service.extract_text(inverted_only)
-                    
-                    if ChileanLicensePlateValidator.validate(text2):
-                        return LicensePlateResult(text2, 0.8, "santifiorino_alt", None)
-                    
-                    text3 = self.ocr_service.extract_text(license_plate_img)
-                    
-                    if ChileanLicensePlateValidator.validate(text3):
-                        return LicensePlateResult(text3, 0.7, "santifiorino_orig", None)
+                    candidate.character_boxes = segmentation.boxes
+                
+                text, variant, _ = self._read_variants(license_plate_img, variants, context)
+                if text is not None:
+                    if threshold == self.COLOR_PASS:
+                        metrics.increment("color_localization.hits")
+                    self._record_threshold(context, threshold, True)
+                    metrics.increment("schedule.passes_to_success", passes)
+                    metrics.increment("schedule.successes")
+                    confidence, method = self.OCR_VARIANTS[variant]
+                    return LicensePlateResult(ChileanLicensePlateValidator.normalize(text), confidence,
+                                              method, None, bounding_box=candidate.box)
             
-            return LicensePlateResult(None, 0.0, "santifiorino", "No valid license plate found")
+            self._record_threshold(context, threshold, False)
+        
+        return LicensePlateResult(None, 0.0, "santifiorino", "No valid license plate found")
+    
+    def locate_plate_candidates(self, gray_img, params: Optional[ImageProcessingParams] = None) -> List[PlateCandidate]:
+        """
+        Plate-shaped boxes of the santifiorino pipeline without any OCR: the
+        binarization passes run in order until one yields candidates that pass
+        the segmentation gate. Used by the video tracker, which reads a vehicle
+        only once its track closes.
+        """
+        params = params or self.processing_params
+        threshold_values = params.threshold_values
+        if params.max_threshold_passes is not None:
+            threshold_values = threshold_values[:params.max_threshold_passes]
+        binarization_passes = ([params.binarization] if params.binarization else []) + list(threshold_values)
+        
+        for threshold in binarization_passes:
+            binary_img = self._binarize(gray_img, threshold, params)
+            contours = self.image_processor.find_contours(binary_img)
+            located = []
+            for candidate in self.image_processor.select_plate_candidates(gray_img, contours, params):
+                self._add_candidate(gray_img, candidate, located, params)
+            if located:
+                return located
+        return []
+    
+    def locate_all_plate_candidates(self, gray_img,
+                                    params: Optional[ImageProcessingParams] = None) -> List[PlateCandidate]:
+        """
+        Every distinct plate-shaped box in the frame, best score first: the
+        candidates of all binarization passes plus the quadrilaterals of the
+        contour method's edge map, passed through the segmentation gate, with
+        overlapping and nested boxes collapsed. No OCR.
+        """
+        params = replace(params or self.processing_params, max_ocr_candidates=MultiPlateConfig.MAX_CANDIDATES)
+        threshold_values = params.threshold_values
+        if params.max_threshold_passes is not None:
+            threshold_values = threshold_values[:params.max_threshold_passes]
+        binarization_passes = ([params.binarization] if params.binarization else []) + list(threshold_values)
+        
+        located = []
+        for threshold in binarization_passes:
+            binary_img = self._binarize(gray_img, threshold, params)
+            contours = self.image_processor.find_contours(binary_img)
+            for candidate in self.image_processor.select_plate_candidates(gray_img, contours, params):
+                self._add_candidate(gray_img, candidate, located, params)
+        
+        # Perspective-skewed plates the thresholds miss often still close a quadrilateral
+        _, edges = self.image_processor.bilateral_filter_preprocessing(gray_img)
+        quads = self.image_processor.find_all_rectangular_contours(edges, max_contours=MultiPlateConfig.MAX_CANDIDATES)
+        for quad in self.image_processor.select_plate_candidates(gray_img, quads, params):
+            self._add_candidate(gray_img, quad, located, params)
+        
+        # A plate's outer frame and its inner border are both plate-shaped: keep the better-scored box
+        located.sort(key=lambda candidate: candidate.score, reverse=True)
+        distinct = []
+        for candidate in located:
+            if not any(self.image_processor.box_overlap_of_smaller(candidate.box, kept.box) >= params.duplicate_iou
+                       for kept in distinct):
+                distinct.append(candidate)
+        return distinct
+    
+    def _add_candidate(self, gray_img, candidate: PlateCandidate, located: List[PlateCandidate],
+                       params: ImageProcessingParams) -> bool:
+        """Append candidate unless it duplicates a located box or fails the segmentation gate"""
+        if any(self.image_processor.box_iou(candidate.box, seen.box) >= params.duplicate_iou
+               for seen in located):
+            return False
+        if params.segmentation_gate:
+            segmentation = self.image_processor.segment_characters(
+                self.image_processor.crop_box(gray_img, candidate.box), params.min_plate_characters
+            )
+            if not segmentation.plausible:
+                return False
+            candidate.character_boxes = segmentation.boxes
+        located.append(candidate)
+        return True
+    
+    def read_plate_crop(self, license_plate_img, camera_id: Optional[str] = None) -> Tuple[Optional[str], float, int]:
+        """
+        OCR one plate crop with the variants in scheduled order
+        
+        Returns:
+            (normalized plate or None, confidence of the accepted variant, OCR calls made)
+        """
+        context = self.threshold_scheduler.context_key(camera_id) if self.threshold_scheduler is not None else None
+        variants = list(self.OCR_VARIANTS)
+        if self.threshold_scheduler is not None:
+            variants = self.threshold_scheduler.order_variants(context, variants)
+        
+        text, variant, calls = self._read_variants(license_plate_img, variants, context)
+        if text is None:
+            return None, 0.0, calls
+        return ChileanLicensePlateValidator.normalize(text), self.OCR_VARIANTS[variant][0], calls
+    
+    def _read_variants(self, license_plate_img, variants: List[str],
+                       context: Optional[str]) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        OCR a crop with the variants in the given order until one reads as a plate
+        
+        When the accepted variant ranks below others in OCR_VARIANTS that the
+        schedule skipped, those are tried too and the best-ranked accepted one
+        wins, so the read (and its confidence and method) doesn't depend on
+        the order the schedule chose.
+        
+        Returns:
+            (raw text or None, accepted variant or None, OCR calls made)
+        """
+        calls = 0
+        for tried, variant in enumerate(variants, start=1):
+            calls += 1
+            text = self._ocr_variant(variant, license_plate_img)
+            accepted = ChileanLicensePlateValidator.validate(text)
+            self._record_schedule(context, AdaptiveThresholdScheduler.VARIANTS, variant, accepted)
+            if not accepted:
+                continue
             
-        except Exception as e:
-            return LicensePlateResult(None, 0.0, "santifiorino", f"Error in recognition: {e}")
+            ranking = list(self.OCR_VARIANTS)
+            for better in ranking[:ranking.index(variant)]:
+                if better in variants[:tried]:
+                    continue  # already rejected
+                calls += 1
+                better_text = self._ocr_variant(better, license_plate_img)
+                better_accepted = ChileanLicensePlateValidator.validate(better_text)
+                self._record_schedule(context, AdaptiveThresholdScheduler.VARIANTS, better, better_accepted)
+                if better_accepted:
+                    metrics.increment("schedule.variant_upgraded")
+                    return better_text, better, calls
+            return text, variant, calls
+        return None, None, calls
+    
+    def read_plate_crops(self, gray_img, candidates: List[PlateCandidate],
+                         camera_id: Optional[str] = None) -> List[LicensePlateResult]:
+        """
+        OCR every candidate box of a frame. With MultiPlateConfig.BATCH_OCR the
+        processed crops are stacked into one image and read by a single
+        tesseract call; crops whose text doesn't validate there are read one
+        by one with read_plate_crop.
+        
+        Returns:
+            One result per box that read as a plate
+        """
+        crops = [self.image_processor.crop_box(gray_img, candidate.box) for candidate in candidates]
+        batch_texts = [None] * len(crops)
+        if MultiPlateConfig.BATCH_OCR and len(crops) > 1:
+            batch_texts = self._batch_ocr(crops)
+        
+        results = []
+        for candidate, crop, text in zip(candidates, crops, batch_texts):
+            if text and ChileanLicensePlateValidator.validate(text):
+                metrics.increment("multi_plate.batch_reads")
+                confidence, method = self.OCR_VARIANTS['processed']
+                plate = ChileanLicensePlateValidator.normalize(text)
+            else:
+                plate, confidence, _ = self.read_plate_crop(crop, camera_id)
+                method = self.OCR_VARIANTS['processed'][1]
+            if plate:
+                results.append(LicensePlateResult(plate, confidence, method, None, bounding_box=candidate.box))
+        return results
+    
+    def _batch_ocr(self, crops) -> List[str]:
+        """Text of each crop, read with one OCR call over all of them stacked"""
+        processed = [self.image_processor.process_license_plate(crop) for crop in crops]
+        sheet, bands = self.image_processor.stack_crops(processed, MultiPlateConfig.BATCH_OCR_HEIGHT)
+        texts = [''] * len(crops)
+        for text, center_y, _ in sorted(self.ocr_service.extract_words(sheet), key=lambda word: word[2]):
+            for i, (top, bottom) in enumerate(bands):
+                if top <= center_y < bottom:
+                    texts[i] += ChileanLicensePlateValidator.clean_text(text)
+                    break
+        return texts
+    
+    def _binarize(self, gray_img, threshold, params: ImageProcessingParams):
+        if isinstance(threshold, str):
+            binary_img = self.image_processor.binarize(
+                gray_img, threshold, params.adaptive_block_size, params.adaptive_offset
+            )
+        else:
+            binary_img = self.image_processor.apply_threshold(gray_img, threshold)
+        if params.close_kernel_size:
+            binary_img = self.image_processor.close_binary(binary_img, params.close_kernel_size)
+        return binary_img
+    
+    def _ocr_variant(self, variant: str, license_plate_img) -> str:
+        if variant == 'processed':
+            return self.ocr_service.extract_text(self.image_processor.process_license_plate(license_plate_img))
+        if variant == 'inverted':
+            return self.ocr_service.extract_text(cv2.bitwise_not(license_plate_img))
+        return self.ocr_service.extract_text(license_plate_img)
+    
+    def _record_schedule(self, context: Optional[str], kind: str, arm, success: bool):
+        if self.threshold_scheduler is not None:
+            self.threshold_scheduler.record(context, kind, arm, success)
+    
+    def _record_threshold(self, context: Optional[str], threshold, success: bool):
+        # Only fixed thresholds are scheduled; the single-pass binarization always runs first
+        if not isinstance(threshold, str):
+            self._record_schedule(context, AdaptiveThresholdScheduler.THRESHOLDS, threshold, success)
     
     def recognize_contour_method(self, img_bytes: bytes) -> LicensePlateResult:
         try:
-            img = self.image_processor.decode_image(img_bytes)
+            img = self.image_processor.decode_image(
+                img_bytes,
+                grayscale=True,
+                target_width=self.CONTOUR_MAX_WIDTH
+            )
             if img is None:
                 return LicensePlateResult(None, 0.0, "contour", "Failed to decode image")
             
-            img = self.image_processor.resize_if_large(img)
+            return self.recognize_contour_image(img)
+            
+        except ImageTooLargeError:
+            raise
+        except Exception as e:
+            return LicensePlateResult(None, 0.0, "contour", f"Error in recognition: {e}")
+    
+    def recognize_contour_image(self, img) -> LicensePlateResult:
+        try:
+            img = self.image_processor.resize_if_large(img, self.CONTOUR_MAX_WIDTH)
             gray, edges = self.image_processor.bilateral_filter_preprocessing(img)
             plate_contour = self.image_processor.find_rectangular_contours(edges, img)
             
@@ -93,15 +455,131 @@ class LicensePlateService:
         except Exception as e:
             return LicensePlateResult(None, 0.0, "contour", f"Error in recognition: {e}")
     
-    def recognize(self, img_bytes: bytes) -> LicensePlateResult:
-        santifiorino_result = self.recognize_santifiorino_method(img_bytes)
+    def check_frame_quality(self, img_bytes: bytes) -> Optional[LicensePlateResult]:
+        """Returns an 'unreadable' result when the frame can't contain a readable plate"""
+        thumbnail = self.image_processor.decode_image(
+            img_bytes,
+            grayscale=True,
+            target_width=QualityGateConfig.THUMBNAIL_WIDTH
+        )
+        if thumbnail is None:
+            return None
+        return self.check_image_quality(thumbnail)
+    
+    def check_image_quality(self, gray_img) -> Optional[LicensePlateResult]:
+        assessment = self.image_processor.assess_quality(gray_img)
+        if assessment.readable:
+            metrics.increment("quality_gate.passed")
+            return None
+        
+        metrics.increment("quality_gate.rejected")
+        for reason in assessment.reasons:
+            metrics.increment(f"quality_gate.reason.{reason}")
+        print(f"Frame rejected by quality gate: {', '.join(assessment.reasons)} "
+              f"(sharpness={assessment.sharpness:.1f}, brightness={assessment.brightness:.1f}, "
+              f"contrast={assessment.contrast:.0f}, edges={assessment.edge_density:.4f})")
+        return LicensePlateResult(
+            None, 0.0, "quality_gate",
+            f"Unreadable frame: {', '.join(assessment.reasons)}",
+            rejection_reasons=assessment.reasons
+        )
+    
+    def recognize(self, img_bytes: bytes, camera_id: Optional[str] = None,
+                  profile: Optional[str] = None) -> LicensePlateResult:
+        return self._recognize_cascade(
+            lambda: self.check_frame_quality(img_bytes),
+            lambda params: self.recognize_santifiorino_method(img_bytes, camera_id, params),
+            lambda: self.recognize_contour_method(img_bytes),
+            profile
+        )
+    
+    def recognize_image(self, img, camera_id: Optional[str] = None,
+                        profile: Optional[str] = None) -> LicensePlateResult:
+        """Same cascade as recognize() for an already decoded BGR or grayscale frame (e.g. video)"""
+        gray_img = self.image_processor.grayscale(img)
+        return self._recognize_cascade(
+            lambda: self.check_image_quality(gray_img),
+            lambda params: self.recognize_santifiorino_image(
+                gray_img, camera_id, params, img if img.ndim == 3 else None
+            ),
+            lambda: self.recognize_contour_image(gray_img),
+            profile
+        )
+    
+    def recognize_all(self, img_bytes: bytes, camera_id: Optional[str] = None,
+                      profile: Optional[str] = None) -> MultiPlateResult:
+        """
+        Multi-plate mode: locate every plate candidate in one pass over the
+        frame, OCR them together and return each distinct plate with its box
+        """
+        params = self.params_for_profile(profile)
+        timings = {}
+        try:
+            if QualityGateConfig.ENABLED:
+                rejected = self._timed(timings, "quality_gate", lambda: self.check_frame_quality(img_bytes))
+                if rejected is not None:
+                    return MultiPlateResult([], rejected.error, rejected.rejection_reasons, timings)
+            
+            img = self.image_processor.decode_image(img_bytes, grayscale=True, target_width=params.decode_target_width)
+            if img is None:
+                return MultiPlateResult([], "Failed to decode image", timings=timings)
+            gray_img = self.image_processor.grayscale(img)
+            
+            candidates = self._timed(timings, "locate", lambda: self.locate_all_plate_candidates(gray_img, params))
+            reads = self._timed(timings, "ocr", lambda: self.read_plate_crops(gray_img, candidates, camera_id))
+        except ImageTooLargeError:
+            raise
+        except Exception as e:
+            return MultiPlateResult([], f"Error in recognition: {e}", timings=timings)
+        
+        # Nested or neighbouring boxes can read the same plate: keep its most confident read
+        best = {}
+        for result in reads:
+            if result.plate not in best or result.confidence > best[result.plate].confidence:
+                best[result.plate] = result
+        plates = sorted(best.values(), key=lambda result: result.confidence, reverse=True)[:MultiPlateConfig.MAX_PLATES]
+        plates.sort(key=lambda result: (result.bounding_box[1], result.bounding_box[0]))
+        
+        metrics.increment("multi_plate.frames")
+        metrics.increment("multi_plate.candidates", len(candidates))
+        metrics.increment("multi_plate.plates", len(plates))
+        return MultiPlateResult(plates, None if plates else "No valid license plate found", timings=timings)
+    
+    def _recognize_cascade(self, check_quality, recognize_santifiorino, recognize_contour,
+                           profile: Optional[str]) -> LicensePlateResult:
+        params = self.params_for_profile(profile)
+        timings = {}
+        if QualityGateConfig.ENABLED:
+            try:
+                rejected = self._timed(timings, "quality_gate", check_quality)
+            except ImageTooLargeError:
+                raise
+            except Exception as e:
+                return LicensePlateResult(None, 0.0, "quality_gate", f"Error in recognition: {e}", timings=timings)
+            if rejected is not None:
+                rejected.timings = timings
+                return rejected
+        
+        santifiorino_result = self._timed(timings, "santifiorino", lambda: recognize_santifiorino(params))
+        santifiorino_result.timings = timings
         
         if santifiorino_result.plate and santifiorino_result.confidence > 0.7:
             return santifiorino_result
+        if not params.contour_fallback:
+            return santifiorino_result
         
-        contour_result = self.recognize_contour_method(img_bytes)
+        contour_result = self._timed(timings, "contour", recognize_contour)
+        contour_result.timings = timings
         
         if contour_result.plate and contour_result.confidence > santifiorino_result.confidence:
             return contour_result
         
-        return santifiorino_result if santifiorino_result.plate else contour_result
\ No newline at end of file
+        return santifiorino_result if santifiorino_result.plate else contour_result
+    
+    @staticmethod
+    def _timed(timings: Dict[str, float], stage: str, fn):
+        started = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            timings[stage] = round((time.perf_counter() - started) * 1000, 2)
@@ -1,7 +1,8 @@
 import pytesseract
 import numpy as np
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from ..models.license_plate_model import ChileanLicensePlateValidator
+from ..utils.metrics import metrics
 
 
 class OCRService:
@@ -16,6 +17,7 @@ class OCRService:
     def extract_text(cls, img: np.ndarray, config_key: str = 'standard') -> str:
         try:
             config = cls.OCR_CONFIGS.get(config_key, cls.OCR_CONFIGS['standard'])
+            metrics.increment("ocr.tesseract_calls")
             text = pytesseract.image_to_string(img, config=config)
             return ChileanLicensePlateValidator.clean_text(text)
         except Exception as e:
@@ -27,7 +29,7 @@ class OCRService:
         for config_name in ['standard', 'alternative']:
             text = cls.extract_text(img, config_name)
             if text and ChileanLicensePlateValidator.validate(text):
-                return text
+                return ChileanLicensePlateValidator.normalize(text)
         return None
     
     @classmethod
@@ -39,12 +41,28 @@ class OCRService:
             for word in words:
                 cleaned = ChileanLicensePlateValidator.clean_text(word)
                 if ChileanLicensePlateValidator.validate(cleaned):
-                    return cleaned
+                    return ChileanLicensePlateValidator.normalize(cleaned)
             return None
         except Exception as e:
             print(f"Error in full image OCR: {e}")
             return None
     
+    @classmethod
+    def extract_words(cls, img: np.ndarray, config_key: str = 'full_page') -> List[Tuple[str, float, int]]:
+        """Recognized words as (text, vertical centre, left edge), to map text back to regions of img"""
+        try:
+            config = cls.OCR_CONFIGS.get(config_key, cls.OCR_CONFIGS['full_page'])
+            metrics.increment("ocr.tesseract_calls")
+            data = pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
+            return [
+                (text.strip(), top + height / 2.0, left)
+                for text, top, height, left in zip(data['text'], data['top'], data['height'], data['left'])
+                if text.strip()
+            ]
+        except Exception as e:
+            print(f"Error in word extraction: {e}")
+            return []
+    
     @staticmethod
     def check_tesseract_availability() -> bool:
         try:
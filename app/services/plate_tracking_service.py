@@ -0,0 +1,247 @@
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from ..config.settings import TrackingConfig
+from ..models.license_plate_model import PlateCandidate, PlateTrack, TrackObservation
+from ..utils.metrics import metrics
+from ..utils.plate_grammar import PlateGrammar
+
+
+class PlateTracker:
+    """
+    Follows plate candidate boxes across the sampled frames of one camera and
+    reads each vehicle once.
+
+    Every frame only runs plate localization (no OCR). Candidates are matched
+    to open tracks by IoU with the track's predicted box, or by centroid
+    distance when a fast vehicle's boxes no longer overlap. Each track keeps
+    its best-quality crops; when the track times out they are OCR'd and the
+    reads are combined by per-character weighted voting into one plate.
+    """
+
+    def __init__(self, license_plate_service, camera_id: Optional[str] = None, profile: Optional[str] = None):
+        self.license_plate_service = license_plate_service
+        self.camera_id = camera_id
+        self.params = license_plate_service.params_for_profile(profile)
+        self.tracks: List[PlateTrack] = []
+        self._next_track_id = 1
+        self._frame_shape = None
+        self.stats = {
+            "tracks_opened": 0,
+            "tracks_closed": 0,
+            "vehicles_read": 0,
+            "frames_tracked": 0,
+            "ocr_calls": 0,
+            "ocr_calls_saved": 0
+        }
+
+    def update(self, frame: np.ndarray, position_ms: float, frame_index: int) -> List[Dict[str, Any]]:
+        """
+        Add one sampled frame
+
+        Returns:
+            Events of the tracks that timed out by this frame (see _close)
+        """
+        # Expire first: a new vehicle must not continue a track that already timed out
+        events = self.expire(position_ms)
+        gray = self.license_plate_service.image_processor.grayscale(frame)
+        self._frame_shape = gray.shape
+        candidates = self._locate(gray)
+        matches = self._associate(candidates)
+
+        for index, candidate in enumerate(candidates):
+            track = matches.get(index)
+            if track is None:
+                track = PlateTrack(self._next_track_id, candidate.box, (0.0, 0.0), position_ms, position_ms, 0)
+                self._next_track_id += 1
+                self.tracks.append(track)
+                self._count("tracks_opened")
+            self._observe(track, candidate, gray, position_ms, frame_index)
+        return events
+
+    def expire(self, position_ms: float) -> List[Dict[str, Any]]:
+        """Close tracks unmatched for TIMEOUT_SECONDS or older than MAX_TRACK_SECONDS"""
+        timeout_ms = TrackingConfig.TIMEOUT_SECONDS * 1000
+        max_age_ms = TrackingConfig.MAX_TRACK_SECONDS * 1000
+        expired = [track for track in self.tracks
+                   if position_ms - track.last_seen_ms > timeout_ms or position_ms - track.first_seen_ms > max_age_ms]
+        return self._close_all(expired)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close every open track, e.g. at the end of a video"""
+        return self._close_all(list(self.tracks))
+
+    def _close_all(self, tracks: List[PlateTrack]) -> List[Dict[str, Any]]:
+        events = []
+        for track in tracks:
+            self.tracks.remove(track)
+            event = self._close(track)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _locate(self, gray: np.ndarray) -> List[PlateCandidate]:
+        roi_service = self.license_plate_service.roi_service
+        roi = roi_service.get_roi(self.camera_id, gray.shape) if roi_service is not None and self.camera_id else None
+        if roi is not None:
+            x, y, w, h = roi
+            candidates = self.license_plate_service.locate_plate_candidates(gray[y:y + h, x:x + w], self.params)
+            if candidates:
+                for candidate in candidates:
+                    bx, by, bw, bh = candidate.box
+                    candidate.box = (bx + x, by + y, bw, bh)
+                return candidates
+        return self.license_plate_service.locate_plate_candidates(gray, self.params)
+
+    def _associate(self, candidates: List[PlateCandidate]) -> Dict[int, PlateTrack]:
+        """Greedy one-to-one matching, best IoU first, then smallest centroid shift"""
+        pairs = []
+        for index, candidate in enumerate(candidates):
+            for track in self.tracks:
+                predicted = self._predicted_box(track)
+                iou = self.license_plate_service.image_processor.box_iou(candidate.box, predicted)
+                shift = self._centroid_shift(candidate.box, predicted)
+                if iou >= TrackingConfig.MIN_IOU or shift <= TrackingConfig.MAX_CENTROID_SHIFT:
+                    pairs.append((-iou, shift, index, track))
+
+        matches = {}
+        matched_tracks = set()
+        for _, _, index, track in sorted(pairs, key=lambda pair: pair[:2]):
+            if index in matches or track.track_id in matched_tracks:
+                continue
+            matches[index] = track
+            matched_tracks.add(track.track_id)
+        return matches
+
+    @staticmethod
+    def _predicted_box(track: PlateTrack) -> Tuple[int, int, int, int]:
+        x, y, w, h = track.box
+        dx, dy = track.velocity
+        return int(round(x + dx)), int(round(y + dy)), w, h
+
+    @staticmethod
+    def _centroid_shift(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+        """Distance between box centres in plate widths"""
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        distance = np.hypot((ax + aw / 2) - (bx + bw / 2), (ay + ah / 2) - (by + bh / 2))
+        return float(distance) / max(1.0, (aw + bw) / 2)
+
+    def _observe(self, track: PlateTrack, candidate: PlateCandidate, gray: np.ndarray,
+                 position_ms: float, frame_index: int):
+        if track.frames_observed:
+            (x, y, w, h), (px, py, pw, ph) = candidate.box, track.box
+            track.velocity = ((x + w / 2) - (px + pw / 2), (y + h / 2) - (py + ph / 2))
+        track.box = candidate.box
+        track.last_seen_ms = position_ms
+        track.frames_observed += 1
+        self._count("frames_tracked")
+
+        crop = self.license_plate_service.image_processor.crop_box(gray, candidate.box)
+        if crop.size == 0:
+            return
+        quality = self._quality(crop, candidate)
+        observations = track.best_observations
+        if len(observations) >= TrackingConfig.OCR_FRAMES and quality <= observations[-1].quality:
+            return
+        # Copy: the crop is a view into a frame buffer the capture reuses
+        observations.append(TrackObservation(quality, crop.copy(), candidate.box, frame_index, position_ms))
+        observations.sort(key=lambda observation: observation.quality, reverse=True)
+        del observations[TrackingConfig.OCR_FRAMES:]
+
+    def _quality(self, crop: np.ndarray, candidate: PlateCandidate) -> float:
+        weights = sum(self.params.candidate_score_weights.values()) or 1.0
+        sharpness = float(cv2.Laplacian(crop, cv2.CV_64F).var())
+        return (candidate.score / weights
+                + min(1.0, sharpness / TrackingConfig.SHARPNESS_SCALE)
+                + min(1.0, crop.shape[0] / TrackingConfig.READABLE_HEIGHT))
+
+    def _close(self, track: PlateTrack) -> Optional[Dict[str, Any]]:
+        """OCR the track's best crops and vote; None when nothing readable was seen"""
+        self._count("tracks_closed")
+        reads = []
+        ocr_calls = 0
+        for observation in track.best_observations:
+            plate, confidence, calls = self.license_plate_service.read_plate_crop(observation.crop, self.camera_id)
+            ocr_calls += calls
+            if plate:
+                # Sharper, larger crops weigh more in the vote (quality is at most 3)
+                reads.append((plate, confidence, confidence * (0.5 + observation.quality / 6.0)))
+        self._count("ocr_calls", ocr_calls)
+
+        # Reading every observed frame would have cost about as many calls per frame as these did
+        frames_read = len(track.best_observations)
+        ocr_calls_saved = int(round((track.frames_observed - frames_read) * ocr_calls / frames_read)) if frames_read else 0
+        self._count("ocr_calls_saved", ocr_calls_saved)
+
+        plate, agreement = self.vote([read for read, _, _ in reads], [weight for _, _, weight in reads])
+        if plate is None:
+            return None
+        self._count("vehicles_read")
+
+        confidences = [confidence for read, confidence, _ in reads if read == plate] or \
+            [confidence for _, confidence, _ in reads]
+        best = track.best_observations[0]
+        if self.license_plate_service.roi_service is not None:
+            self.license_plate_service.roi_service.record_detection(self.camera_id, best.box, self._frame_shape)
+        return {
+            "camera_id": self.camera_id,
+            "plate": plate,
+            "confidence": round(agreement * max(confidences), 3),
+            "method": "tracked",
+            "bounding_box": list(best.box),
+            "frame_index": best.frame_index,
+            "position_ms": round(best.position_ms, 1),
+            "track_id": track.track_id,
+            "first_seen_ms": round(track.first_seen_ms, 1),
+            "last_seen_ms": round(track.last_seen_ms, 1),
+            "frames_observed": track.frames_observed,
+            "frames_read": frames_read,
+            "ocr_calls": ocr_calls,
+            "ocr_calls_saved": ocr_calls_saved,
+            "reads": [read for read, _, _ in reads],
+            "timestamp": time.time()
+        }
+
+    @staticmethod
+    def vote(reads: List[str], weights: Optional[List[float]] = None) -> Tuple[Optional[str], float]:
+        """
+        Combine several reads of one plate by weighted per-character voting
+
+        Reads are grouped by grammar layout and the heaviest layout wins; each
+        character slot then takes its heaviest character, so "HCJH72",
+        "HCJH12" and "HCJM72" vote "HCJH72". Reads outside the grammar only
+        count when no read parses.
+
+        Returns:
+            (plate, agreement), agreement being the mean winning weight share per slot
+        """
+        weights = weights or [1.0] * len(reads)
+        by_layout = defaultdict(list)
+        for read, weight in zip(reads, weights):
+            match = PlateGrammar.parse(read)
+            if match is not None:
+                by_layout[match.layout].append((match.plate, weight * match.score))
+        if not by_layout:
+            if not reads:
+                return None, 0.0
+            best_weight, best_read = max(zip(weights, reads))
+            return best_read, best_weight / sum(weights)
+
+        layout_reads = max(by_layout.values(), key=lambda group: sum(weight for _, weight in group))
+        total = sum(weight for _, weight in layout_reads)
+        plate, shares = [], []
+        for slot in range(len(layout_reads[0][0])):
+            votes = defaultdict(float)
+            for read, weight in layout_reads:
+                votes[read[slot]] += weight
+            character, character_weight = max(votes.items(), key=lambda vote: vote[1])
+            plate.append(character)
+            shares.append(character_weight / total)
+        return ''.join(plate), float(np.mean(shares))
+
+    def _count(self, name: str, value: float = 1):
+        self.stats[name] += value
+        metrics.increment(f"tracking.{name}", value)
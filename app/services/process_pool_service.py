@@ -0,0 +1,213 @@
+import atexit
+import multiprocessing
+import multiprocessing.util
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+from ..config.settings import ProcessPoolConfig
+from ..models.license_plate_model import LicensePlateResult
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .image_processing_service import ImageProcessingService, ImageTooLargeError
+from .license_plate_service import LicensePlateService
+
+logger = get_logger(__name__)
+
+# Per worker process: its own pipeline and the shared-memory blocks it has attached
+_worker_service = None
+_worker_blocks: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+
+
+def _init_worker():
+    global _worker_service
+    _worker_service = LicensePlateService()
+    # Pool workers exit without running atexit hooks; finalizers still run, so learned state is saved
+    for state in (_worker_service.threshold_scheduler, _worker_service.roi_service):
+        if state is not None:
+            multiprocessing.util.Finalize(state, state.close, exitpriority=10)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    block = _worker_blocks.get(name)
+    if block is not None:
+        _worker_blocks.move_to_end(name)
+        return block
+    # Workers share the parent's resource tracker, so attaching doesn't transfer
+    # ownership: the parent alone unlinks the block
+    block = shared_memory.SharedMemory(name=name)
+    _worker_blocks[name] = block
+    # Blocks the parent has since unlinked stay mapped until closed here
+    while len(_worker_blocks) > 2 * ProcessPoolConfig.MAX_IDLE_BLOCKS:
+        _worker_blocks.popitem(last=False)[1].close()
+    return block
+
+
+def _recognize_shared(name: str, shape: Tuple[int, ...], dtype: str,
+                      camera_id: Optional[str], profile: Optional[str]) -> LicensePlateResult:
+    block = _attach(name)
+    img = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return _worker_service.recognize_image(img, camera_id, profile)
+
+
+class SharedFrameBuffers:
+    """
+    Shared-memory blocks for decoded frames, reused across requests so the
+    common case is a memcpy into an existing mapping rather than a new
+    segment per request.
+    """
+
+    def __init__(self, max_idle: Optional[int] = None):
+        self.max_idle = ProcessPoolConfig.MAX_IDLE_BLOCKS if max_idle is None else max_idle
+        self._lock = threading.Lock()
+        self._idle: List[shared_memory.SharedMemory] = []
+        self._in_use = 0
+
+    def acquire(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            fitting = [block for block in self._idle if block.size >= nbytes]
+            if fitting:
+                block = min(fitting, key=lambda candidate: candidate.size)
+                self._idle.remove(block)
+                self._in_use += 1
+                return block
+            self._in_use += 1
+        metrics.increment("process_pool.blocks_created")
+        return shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+
+    def release(self, block: shared_memory.SharedMemory):
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(block)
+                return
+        self._destroy(block)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for block in idle:
+            self._destroy(block)
+
+    @staticmethod
+    def _destroy(block: shared_memory.SharedMemory):
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+
+class PipelinePoolService:
+    """
+    Runs the local pipeline in a persistent pool of worker processes, so its
+    Python-level parts (contour loops, validation, bookkeeping) don't compete
+    for one GIL under gunicorn threads.
+
+    The calling thread decodes the upload (cv2 releases the GIL) and copies
+    the pixels once into a reused shared-memory block; the worker maps the
+    block as a numpy array without copying and only the small
+    LicensePlateResult is pickled back.
+    Drop-in for LicensePlateService.recognize() in the engine router.
+
+    Each worker has its own LicensePlateService. Threshold schedules and
+    ROI heatmaps are learned per worker and merged into the shared state
+    files on each periodic save, so workers pick up each other's updates;
+    pipeline counters stay in the worker, outside /metrics.
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: Optional[str] = None,
+                 fallback_service: Optional[LicensePlateService] = None):
+        self.workers = max(1, workers or ProcessPoolConfig.WORKERS)
+        self.start_method = start_method or ProcessPoolConfig.START_METHOD
+        self.image_processor = ImageProcessingService()
+        self.processing_params = LicensePlateService.default_params()
+        self.buffers = SharedFrameBuffers()
+        # Runs requests in-process while a broken pool is being replaced
+        self.fallback_service = fallback_service
+        self._executor_lock = threading.Lock()
+        self._executor = self._create_executor()
+        atexit.register(self.shutdown)
+
+        metrics.register_gauge("process_pool.workers", lambda: self.workers)
+        metrics.register_gauge("process_pool.blocks_in_use", lambda: self.buffers.in_use)
+        metrics.register_gauge("process_pool.blocks_idle", lambda: self.buffers.idle)
+
+    def recognize(self, img_bytes: bytes, camera_id: Optional[str] = None,
+                  profile: Optional[str] = None) -> LicensePlateResult:
+        # Decode like LicensePlateService.recognize_santifiorino_method(): at the profile's
+        # working resolution, in color when the color localizer needs it
+        params = LicensePlateService.profile_params(self.processing_params, profile)
+        try:
+            img = self.image_processor.decode_image(
+                img_bytes,
+                grayscale=not params.color_localization,
+                target_width=params.decode_target_width
+            )
+        except ImageTooLargeError:
+            raise
+        except Exception as e:
+            return LicensePlateResult(None, 0.0, "santifiorino", f"Error in recognition: {e}")
+        if img is None:
+            return LicensePlateResult(None, 0.0, "santifiorino", "Failed to decode image")
+
+        # nbytes covers every channel, so color frames get blocks three times as large
+        block = self.buffers.acquire(img.nbytes)
+        executor = self._executor
+        try:
+            np.ndarray(img.shape, dtype=img.dtype, buffer=block.buf)[...] = img
+            metrics.increment("process_pool.tasks")
+            metrics.increment("process_pool.bytes_shared", img.nbytes)
+            future = executor.submit(
+                _recognize_shared, block.name, img.shape, img.dtype.str, camera_id, profile
+            )
+            return future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): replace the pool and serve this request in-process
+            metrics.increment("process_pool.broken")
+            logger.error("Pipeline process pool broken, restarting it")
+            self._replace_executor(executor)
+            return self._fallback().recognize_image(img, camera_id, profile)
+        finally:
+            self.buffers.release(block)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        with self._executor_lock:
+            # Concurrent requests see the same broken pool; only the first replaces it
+            if self._executor is not broken:
+                return
+            self._executor = self._create_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _fallback(self) -> LicensePlateService:
+        with self._executor_lock:
+            if self.fallback_service is None:
+                self.fallback_service = LicensePlateService()
+            return self.fallback_service
+
+    def warm_up(self):
+        """Start every worker now instead of on the first requests"""
+        for future in [self._executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.buffers.close()
@@ -0,0 +1,157 @@
+import glob
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+from ..config.settings import ProfilingConfig
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.sampling_profiler import SamplingProfiler
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ProfileSession:
+    profile_id: str
+    client_request_id: Optional[str]
+    profiler: SamplingProfiler
+    memory_before: tracemalloc.Snapshot
+    started: float
+
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling: a sampling profiler on the request thread
+    plus tracemalloc while the request runs.
+
+    Each profiled request leaves three files in ProfilingConfig.OUTPUT_DIR,
+    named by a server-generated profile id: <id>.folded (collapsed stacks
+    for a flame graph), <id>.allocations.txt (peak traced memory and the top
+    allocation sites still alive at the end of the request) and <id>.json
+    (metadata, including the client's X-Request-Id). Existing files are
+    never overwritten.
+
+    tracemalloc is process-wide: it runs while at least one profiled
+    request is in flight, and concurrent requests show up in each other's
+    allocation report.
+    """
+
+    KINDS = {'folded': '.folded', 'allocations': '.allocations.txt', 'meta': '.json'}
+    PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir or ProfilingConfig.OUTPUT_DIR
+        self._lock = threading.Lock()
+        self._tracing_sessions = 0
+
+    @staticmethod
+    def is_admin(headers: Mapping[str, str]) -> bool:
+        token = ProfilingConfig.ADMIN_TOKEN
+        return bool(token) and hmac.compare_digest(headers.get('X-Admin-Token', ''), token)
+
+    @staticmethod
+    def should_profile(headers: Mapping[str, str]) -> bool:
+        token = ProfilingConfig.ADMIN_TOKEN
+        if token and hmac.compare_digest(headers.get('X-Profile-Request', ''), token):
+            return True
+        return ProfilingConfig.SAMPLE_RATE > 0 and random.random() < ProfilingConfig.SAMPLE_RATE
+
+    def start(self, client_request_id: Optional[str] = None) -> ProfileSession:
+        # The client's id only goes into the metadata: file names must not be caller-chosen
+        if client_request_id and not self.PROFILE_ID_PATTERN.match(client_request_id):
+            client_request_id = None
+        with self._lock:
+            if self._tracing_sessions == 0:
+                tracemalloc.start(ProfilingConfig.TRACEMALLOC_FRAMES)
+            else:
+                tracemalloc.reset_peak()
+            self._tracing_sessions += 1
+        memory_before = tracemalloc.take_snapshot()
+
+        profiler = SamplingProfiler(interval=ProfilingConfig.SAMPLE_INTERVAL_SECONDS)
+        profiler.start()
+        return ProfileSession(uuid.uuid4().hex, client_request_id, profiler, memory_before, time.perf_counter())
+
+    def finish(self, session: ProfileSession, meta: Optional[Dict[str, Any]] = None):
+        """Stop profiling and write the session's files; never raises"""
+        session.profiler.stop()
+        elapsed = time.perf_counter() - session.started
+        try:
+            memory_after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            with self._lock:
+                self._tracing_sessions -= 1
+                if self._tracing_sessions == 0:
+                    tracemalloc.stop()
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, session.profile_id)
+            # 'x' mode: refuse to replace a file that is already there
+            with open(base + self.KINDS['folded'], 'x') as f:
+                f.write('\n'.join(session.profiler.collapsed()) + '\n')
+            with open(base + self.KINDS['allocations'], 'x') as f:
+                f.write(self._allocation_report(session.memory_before, memory_after, peak))
+            with open(base + self.KINDS['meta'], 'x') as f:
+                json.dump({
+                    **(meta or {}),
+                    "profile_id": session.profile_id,
+                    "client_request_id": session.client_request_id,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "samples": session.profiler.samples,
+                    "peak_traced_bytes": peak,
+                    "created_at": time.time()
+                }, f)
+            metrics.increment("profiling.profiles_written")
+            self._prune()
+        except Exception as e:
+            logger.warning(f"Could not write profile {session.profile_id}: {e}")
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in glob.glob(os.path.join(self.output_dir, '*' + self.KINDS['meta'])):
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(profiles, key=lambda profile: profile.get('created_at', 0), reverse=True)
+
+    def profile_path(self, profile_id: str, kind: str) -> Optional[str]:
+        if kind not in self.KINDS or not self.PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.abspath(os.path.join(self.output_dir, profile_id + self.KINDS[kind]))
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def _allocation_report(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int) -> str:
+        # Allocations made by the profiler itself are noise
+        exclude = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        before, after = before.filter_traces(exclude), after.filter_traces(exclude)
+        lines = [f"Peak traced memory during request: {peak / 1024:.1f} KiB", "",
+                 f"Top {ProfilingConfig.TOP_ALLOCATIONS} allocation sites still alive at the end of the request:"]
+        for stat in after.compare_to(before, 'traceback')[:ProfilingConfig.TOP_ALLOCATIONS]:
+            if stat.size_diff <= 0:
+                break
+            lines.append(f"{stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+        return '\n'.join(lines) + '\n'
+
+    def _prune(self):
+        metas = sorted(glob.glob(os.path.join(self.output_dir, '*' + self.KINDS['meta'])), key=os.path.getmtime)
+        for meta_path in metas[:max(0, len(metas) - ProfilingConfig.MAX_PROFILES)]:
+            base = meta_path[:-len(self.KINDS['meta'])]
+            for suffix in self.KINDS.values():
+                try:
+                    os.remove(base + suffix)
+                except OSError:
+                    pass
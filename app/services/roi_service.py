@@ -0,0 +1,238 @@
+import atexit
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from ..config.settings import ROIConfig
+from ..utils.json_state import BackgroundSaver, locked_state, read_json, write_json_atomic
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class CameraROIService:
+    """
+    Per-camera region-of-interest priors for the plate search.
+
+    A camera's ROI is either configured by hand (ROIConfig.MANUAL_ROIS, as
+    normalised [x0, y0, x1, y1]) or learned from a decaying heatmap of the
+    boxes of its recent successful detections. Learned heatmaps persist to a
+    local JSON file. Per-camera pixel and latency savings are kept for /metrics.
+
+    Heatmaps are saved on a background thread. A save merges the detections
+    recorded since the previous one into the file under a file lock (the
+    stored heatmap decayed once per local detection, plus the local heat),
+    so processes sharing the file learn from each other's detections.
+    """
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path or ROIConfig.STATE_PATH
+        self.manual_rois: Dict[str, Tuple[float, float, float, float]] = self._parse_manual_rois()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._heatmaps: Dict[str, np.ndarray] = {}
+        self._detections: Dict[str, int] = {}
+        # Per camera since the last save: heat added (decayed like the heatmap) and detections
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._report: Dict[str, Dict[str, float]] = {}
+        self._updates_since_save = 0
+        self._load()
+        self._saver = BackgroundSaver(self.save, ROIConfig.SAVE_INTERVAL_SECONDS, "roi-saver")
+        atexit.register(self.close)
+        metrics.register_gauge("roi.per_camera", self.report)
+
+    def get_roi(self, camera_id: Optional[str], shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """ROI as (x, y, w, h) in pixels of a frame with the given shape, or None"""
+        if not camera_id:
+            return None
+
+        normalized = self.manual_rois.get(camera_id) or self._learned_roi(camera_id)
+        if normalized is None:
+            return None
+
+        height, width = shape[:2]
+        x0, y0, x1, y1 = normalized
+        x, y = int(x0 * width), int(y0 * height)
+        w, h = int(x1 * width) - x, int(y1 * height) - y
+        if w <= 0 or h <= 0 or w * h >= width * height:
+            return None
+        return x, y, w, h
+
+    def record_detection(self, camera_id: Optional[str], box: Optional[Tuple[int, int, int, int]],
+                         shape: Tuple[int, ...]):
+        if not camera_id or box is None:
+            return
+
+        grid = ROIConfig.HEATMAP_GRID
+        height, width = shape[:2]
+        x, y, w, h = box
+        col0, row0 = int(x / width * grid), int(y / height * grid)
+        col1 = min(grid, int(np.ceil((x + w) / width * grid)))
+        row1 = min(grid, int(np.ceil((y + h) / height * grid)))
+
+        with self._lock:
+            heatmap = self._heatmaps.get(camera_id)
+            if heatmap is None:
+                heatmap = self._heatmaps[camera_id] = np.zeros((grid, grid), np.float32)
+            pending = self._pending.get(camera_id)
+            if pending is None:
+                pending = self._pending[camera_id] = {"heat": np.zeros((grid, grid), np.float32), "detections": 0}
+            # Exponential decay keeps the prior tracking recent detections
+            for heat in (heatmap, pending["heat"]):
+                heat *= ROIConfig.HEATMAP_DECAY
+                heat[row0:row1, col0:col1] += 1.0
+            pending["detections"] += 1
+            self._detections[camera_id] = self._detections.get(camera_id, 0) + 1
+            self._updates_since_save += 1
+            should_save = self._updates_since_save >= ROIConfig.SAVE_EVERY_UPDATES
+
+        if should_save:
+            self._saver.request()
+
+    def record_search(self, camera_id: str, used_roi: bool, roi_hit: bool, pixels_processed: int,
+                      pixels_full: int, seconds: float):
+        with self._lock:
+            report = self._report.setdefault(camera_id, {
+                "requests": 0, "roi_hits": 0, "roi_misses": 0,
+                "pixels_processed": 0, "pixels_full": 0,
+                "seconds_roi_hits": 0.0, "seconds_full_search": 0.0, "full_searches": 0
+            })
+            report["requests"] += 1
+            report["pixels_processed"] += pixels_processed
+            report["pixels_full"] += pixels_full
+            if used_roi and roi_hit:
+                report["roi_hits"] += 1
+                report["seconds_roi_hits"] += seconds
+            else:
+                if used_roi:
+                    report["roi_misses"] += 1
+                report["full_searches"] += 1
+                report["seconds_full_search"] += seconds
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per camera: ROI hit rate, share of pixels saved and mean latency of ROI hits vs full searches"""
+        with self._lock:
+            reports = {camera: dict(values) for camera, values in self._report.items()}
+
+        for values in reports.values():
+            values["pixels_saved_ratio"] = (1 - values["pixels_processed"] / values["pixels_full"]
+                                            if values["pixels_full"] else 0.0)
+            values["mean_ms_roi_hit"] = (1000 * values["seconds_roi_hits"] / values["roi_hits"]
+                                         if values["roi_hits"] else None)
+            values["mean_ms_full_search"] = (1000 * values["seconds_full_search"] / values["full_searches"]
+                                             if values["full_searches"] else None)
+        return reports
+
+    def save(self):
+        """Merge the detections recorded since the last save into the state file and reload the merged heatmaps"""
+        with self._save_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                heatmaps = {camera_id: heatmap.copy() for camera_id, heatmap in self._heatmaps.items()}
+                detections = dict(self._detections)
+                self._updates_since_save = 0
+            try:
+                with locked_state(self.state_path):
+                    try:
+                        stored = read_json(self.state_path)
+                    except ValueError as e:
+                        logger.warning(f"Replacing unreadable ROI state {self.state_path}: {str(e)}")
+                        stored = None
+                    if stored is not None:
+                        heatmaps, detections = self._parse_state(stored)
+                        self._merge(heatmaps, detections, pending)
+                    write_json_atomic(self.state_path, {
+                        camera_id: {
+                            "detections": detections.get(camera_id, 0),
+                            "heatmap": heatmap.tolist()
+                        }
+                        for camera_id, heatmap in heatmaps.items()
+                    })
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not persist ROI heatmaps to {self.state_path}: {str(e)}")
+                with self._lock:
+                    for camera_id, entry in pending.items():
+                        self._merge_pending(camera_id, entry)
+                return
+
+            with self._lock:
+                # The file now also holds other processes' detections; keep what was recorded meanwhile
+                self._merge(heatmaps, detections, self._pending)
+                self._heatmaps, self._detections = heatmaps, detections
+
+    def _merge_pending(self, camera_id: str, entry: Dict[str, Any]):
+        """Put back detections whose save failed, ahead of any recorded since"""
+        newer = self._pending.get(camera_id)
+        if newer is not None:
+            entry["heat"] = entry["heat"] * ROIConfig.HEATMAP_DECAY ** newer["detections"] + newer["heat"]
+            entry["detections"] += newer["detections"]
+        self._pending[camera_id] = entry
+
+    @staticmethod
+    def _merge(heatmaps: Dict[str, np.ndarray], detections: Dict[str, int], pending: Dict[str, Dict[str, Any]]):
+        """Apply pending detections on top of heatmaps (decay once per detection, then add their heat)"""
+        for camera_id, entry in pending.items():
+            heatmap = heatmaps.get(camera_id)
+            if heatmap is None:
+                heatmaps[camera_id] = entry["heat"].copy()
+            else:
+                decay = np.float32(ROIConfig.HEATMAP_DECAY ** entry["detections"])
+                heatmaps[camera_id] = heatmap * decay + entry["heat"]
+            detections[camera_id] = detections.get(camera_id, 0) + entry["detections"]
+
+    def close(self):
+        """Save pending detections and stop the background saver"""
+        self._saver.stop()
+
+    def _learned_roi(self, camera_id: str) -> Optional[Tuple[float, float, float, float]]:
+        with self._lock:
+            heatmap = self._heatmaps.get(camera_id)
+            if heatmap is None or self._detections.get(camera_id, 0) < ROIConfig.MIN_DETECTIONS:
+                return None
+            hot = heatmap >= heatmap.max() * ROIConfig.HEAT_FRACTION
+
+        rows = np.flatnonzero(hot.any(axis=1))
+        cols = np.flatnonzero(hot.any(axis=0))
+        grid = float(ROIConfig.HEATMAP_GRID)
+        margin = ROIConfig.MARGIN
+        return (
+            max(0.0, cols[0] / grid - margin),
+            max(0.0, rows[0] / grid - margin),
+            min(1.0, (cols[-1] + 1) / grid + margin),
+            min(1.0, (rows[-1] + 1) / grid + margin)
+        )
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                self._heatmaps, self._detections = self._parse_state(json.load(f))
+            logger.info(f"Loaded ROI heatmaps for {len(self._heatmaps)} cameras")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable ROI state {self.state_path}: {str(e)}")
+
+    @staticmethod
+    def _parse_state(state: Dict[str, Any]) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+        heatmaps, detections = {}, {}
+        for camera_id, entry in state.items():
+            heatmap = np.array(entry["heatmap"], np.float32)
+            if heatmap.shape == (ROIConfig.HEATMAP_GRID, ROIConfig.HEATMAP_GRID):
+                heatmaps[camera_id] = heatmap
+                detections[camera_id] = int(entry.get("detections", 0))
+        return heatmaps, detections
+
+    @staticmethod
+    def _parse_manual_rois() -> Dict[str, Tuple[float, float, float, float]]:
+        if not ROIConfig.MANUAL_ROIS:
+            return {}
+        try:
+            return {camera_id: tuple(float(v) for v in roi)
+                    for camera_id, roi in json.loads(ROIConfig.MANUAL_ROIS).items()}
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid CAMERA_ROIS configuration, ignoring it: {str(e)}")
+            return {}
@@ -0,0 +1,208 @@
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from ..config.settings import ShadowConfig
+from ..models.license_plate_model import LicensePlateResult
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics, LatencyTracker
+from .admission_control_service import AdmissionControlService
+
+logger = get_logger(__name__)
+
+# (image_bytes, camera_id, profile) -> result
+Engine = Callable[[bytes, Optional[str], Optional[str]], LicensePlateResult]
+
+
+def _lower_priority():
+    try:
+        # On Linux niceness is per thread, and inherited by the tesseract processes it starts
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), ShadowConfig.NICE)
+    except (AttributeError, OSError):
+        pass
+
+
+class ShadowEvaluator:
+    """
+    Shadow-mode comparison of recognition engines on live traffic.
+
+    For a ShadowConfig.SAMPLE_RATE fraction of requests, the image is run
+    through every other configured engine on a small low-priority thread
+    pool once the response has been sent, and each shadow result is
+    compared with the one that was served:
+
+        agree         same plate
+        disagree      different plates
+        primary_only  only the served engine found a plate
+        shadow_only   only the shadow engine found a plate
+        both_missed   neither found one
+
+    Counters (shadow.<engine>.<outcome>, calls, errors, busy_seconds,
+    cost_usd) and latency gauges show up in /metrics. With
+    ShadowConfig.DISAGREEMENT_DIR set, images the engines read differently
+    are saved there with a JSON sidecar for review.
+
+    Shadow calls bypass the router and admission control, so they never
+    take a request's slot, quota or circuit-breaker budget.
+    """
+
+    OUTCOMES = ("agree", "disagree", "primary_only", "shadow_only", "both_missed")
+
+    def __init__(self, engines: Dict[str, Engine], sample_rate: Optional[float] = None):
+        wanted = [name.strip() for name in ShadowConfig.ENGINES.split(',') if name.strip()]
+        self.engines = {name: engine for name, engine in engines.items() if name in wanted}
+        self.sample_rate = sample_rate if sample_rate is not None else ShadowConfig.SAMPLE_RATE
+        self.cost_per_call = json.loads(ShadowConfig.COST_PER_CALL) if ShadowConfig.COST_PER_CALL else {}
+        self.latency = {name: LatencyTracker() for name in self.engines}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._outcomes = {name: dict.fromkeys(self.OUTCOMES, 0) for name in self.engines}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, ShadowConfig.WORKERS),
+            thread_name_prefix="shadow",
+            initializer=_lower_priority
+        )
+
+        metrics.register_gauge("shadow.pending", lambda: self._pending)
+        for name, tracker in self.latency.items():
+            metrics.register_gauge(f"shadow.{name}.latency_p50", lambda t=tracker: t.percentile(50))
+            metrics.register_gauge(f"shadow.{name}.latency_p95", lambda t=tracker: t.percentile(95))
+            metrics.register_gauge(f"shadow.{name}.agreement_rate", lambda n=name: self.agreement_rate(n))
+
+    def register_engine(self, name: str, engine: Engine):
+        """Add an engine (e.g. a candidate model) to compare against the served results"""
+        with self._lock:
+            self.engines[name] = engine
+            self.latency.setdefault(name, LatencyTracker())
+            self._outcomes.setdefault(name, dict.fromkeys(self.OUTCOMES, 0))
+        tracker = self.latency[name]
+        metrics.register_gauge(f"shadow.{name}.latency_p50", lambda: tracker.percentile(50))
+        metrics.register_gauge(f"shadow.{name}.latency_p95", lambda: tracker.percentile(95))
+        metrics.register_gauge(f"shadow.{name}.agreement_rate", lambda: self.agreement_rate(name))
+
+    @staticmethod
+    def vision_engine(gcp_vision_service) -> Engine:
+        """Adapt GCPVisionService to the engine signature"""
+        def recognize(image_bytes: bytes, camera_id: Optional[str] = None,
+                      profile: Optional[str] = None) -> LicensePlateResult:
+            plate = gcp_vision_service.extract_license_plate_from_image(image_bytes, raise_on_error=True)
+            if plate:
+                return LicensePlateResult(plate, 0.95, AdmissionControlService.GCP_VISION, None,
+                                          AdmissionControlService.GCP_VISION)
+            return LicensePlateResult(None, 0.0, AdmissionControlService.GCP_VISION,
+                                      "No valid license plate found", AdmissionControlService.GCP_VISION)
+        return recognize
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def submit(self, image_bytes: bytes, primary: LicensePlateResult, camera_id: Optional[str] = None,
+               profile: Optional[str] = None) -> bool:
+        """
+        Queue a shadow comparison of an already-served result
+
+        image_bytes must not be a view of a buffer that is reused later.
+        Returns False when the pool is saturated and the sample was dropped.
+        """
+        with self._lock:
+            if self._pending >= ShadowConfig.MAX_PENDING:
+                metrics.increment("shadow.dropped")
+                return False
+            self._pending += 1
+        metrics.increment("shadow.sampled")
+        self._executor.submit(self._evaluate, image_bytes, primary, camera_id, profile)
+        return True
+
+    def agreement_rate(self, engine: str) -> Optional[float]:
+        with self._lock:
+            outcomes = self._outcomes.get(engine, {})
+            compared = sum(count for outcome, count in outcomes.items() if outcome != "both_missed")
+            return round(outcomes["agree"] / compared, 4) if compared else None
+
+    def _evaluate(self, image_bytes: bytes, primary: LicensePlateResult, camera_id: Optional[str],
+                  profile: Optional[str]):
+        try:
+            shadow_results = {}
+            for name, engine in list(self.engines.items()):
+                if name == primary.engine:
+                    continue
+                result = self._run(name, engine, image_bytes, camera_id, profile)
+                if result is not None:
+                    shadow_results[name] = result
+                    outcome = self._compare(primary.plate, result.plate)
+                    with self._lock:
+                        self._outcomes[name][outcome] += 1
+                    metrics.increment(f"shadow.{name}.{outcome}")
+
+            if ShadowConfig.DISAGREEMENT_DIR and any(
+                    result.plate != primary.plate for result in shadow_results.values()):
+                self._save_disagreement(image_bytes, primary, shadow_results, camera_id)
+        except Exception as e:
+            logger.warning(f"Shadow evaluation failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _run(self, name: str, engine: Engine, image_bytes: bytes, camera_id: Optional[str],
+             profile: Optional[str]) -> Optional[LicensePlateResult]:
+        started = time.perf_counter()
+        try:
+            result = engine(image_bytes, camera_id, profile)
+        except Exception as e:
+            metrics.increment(f"shadow.{name}.errors")
+            logger.warning(f"Shadow engine {name} failed: {e}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.increment(f"shadow.{name}.calls")
+            metrics.increment(f"shadow.{name}.busy_seconds", elapsed)
+            metrics.increment(f"shadow.{name}.cost_usd", self.cost_per_call.get(name, 0.0))
+        self.latency[name].observe(elapsed)
+        return result
+
+    @staticmethod
+    def _compare(primary_plate: Optional[str], shadow_plate: Optional[str]) -> str:
+        if primary_plate and shadow_plate:
+            return "agree" if primary_plate == shadow_plate else "disagree"
+        if primary_plate:
+            return "primary_only"
+        if shadow_plate:
+            return "shadow_only"
+        return "both_missed"
+
+    def _save_disagreement(self, image_bytes: bytes, primary: LicensePlateResult,
+                           shadow_results: Dict[str, LicensePlateResult], camera_id: Optional[str]):
+        directory = ShadowConfig.DISAGREEMENT_DIR
+        os.makedirs(directory, exist_ok=True)
+        if len(glob.glob(os.path.join(directory, '*.json'))) >= ShadowConfig.MAX_SAVED_DISAGREEMENTS:
+            metrics.increment("shadow.disagreements_not_saved")
+            return
+
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}")
+        extension = '.png' if bytes(image_bytes[:8]) == b'\x89PNG\r\n\x1a\n' else '.jpg'
+        with open(base + extension, 'wb') as f:
+            f.write(image_bytes)
+        with open(base + '.json', 'w') as f:
+            json.dump({
+                "image": os.path.basename(base + extension),
+                "camera_id": camera_id,
+                "served": self._describe(primary),
+                "shadow": {name: self._describe(result) for name, result in shadow_results.items()},
+                "created_at": time.time()
+            }, f, indent=2)
+        metrics.increment("shadow.disagreements_saved")
+
+    @staticmethod
+    def _describe(result: LicensePlateResult) -> Dict[str, object]:
+        return {
+            "engine": result.engine,
+            "plate": result.plate,
+            "confidence": result.confidence,
+            "method": result.processing_method,
+            "error": result.error
+        }
@@ -0,0 +1,175 @@
+import atexit
+import json
+import os
+import random
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from ..config.settings import AdaptiveScheduleConfig
+from ..utils.json_state import BackgroundSaver, locked_state, read_json, write_json_atomic
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class AdaptiveThresholdScheduler:
+    """
+    Learns which thresholds and OCR variants produce accepted plates and
+    orders them so the expected number of passes before success goes down.
+
+    Each arm (a threshold value or a variant name) keeps success/trial counts
+    per context (global, and optionally per camera id and hour of day). The
+    schedule is drawn by Thompson sampling from Beta(1 + successes, 1 + failures),
+    which keeps exploring arms that have rarely been tried. Until every arm
+    has AdaptiveScheduleConfig.MIN_ARM_TRIALS trials the configured order is
+    kept as is, so a cold schedule behaves like the fixed pipeline. With
+    PRUNE_ENABLED, arms with enough trials and a very low success rate are
+    pruned, but are still explored with probability PRUNED_EXPLORATION_RATE.
+
+    Stats persist to a local JSON file so they survive restarts. Saves run
+    on a background thread; each one merges the counts recorded since the
+    previous save into the file under a file lock, so several processes
+    (gunicorn workers, pipeline pool workers) can share one state file
+    without overwriting each other, and each picks up the others' counts.
+    """
+
+    GLOBAL_CONTEXT = "*"
+    THRESHOLDS = "thresholds"
+    VARIANTS = "variants"
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path or AdaptiveScheduleConfig.STATE_PATH
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._random = random.Random()
+        self._stats: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        # Counts recorded since the last save, merged into the state file on the next one
+        self._pending: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        self._dirty_updates = 0
+        self._load()
+        self._saver = BackgroundSaver(self.save, AdaptiveScheduleConfig.SAVE_INTERVAL_SECONDS,
+                                      "threshold-schedule-saver")
+        atexit.register(self.close)
+
+    def context_key(self, camera_id: Optional[str] = None, hour: Optional[int] = None) -> str:
+        parts = []
+        if AdaptiveScheduleConfig.CONTEXT_BY_CAMERA and camera_id:
+            parts.append(f"camera={camera_id}")
+        if AdaptiveScheduleConfig.CONTEXT_BY_HOUR:
+            parts.append(f"hour={datetime.now().hour if hour is None else hour}")
+        return "|".join(parts) or self.GLOBAL_CONTEXT
+
+    def order_thresholds(self, context: str, thresholds: Sequence[int]) -> List[int]:
+        return [int(arm) for arm in self._order(context, self.THRESHOLDS, [str(t) for t in thresholds])]
+
+    def order_variants(self, context: str, variants: Sequence[str]) -> List[str]:
+        return self._order(context, self.VARIANTS, list(variants))
+
+    def record(self, context: str, kind: str, arm, success: bool):
+        """Record one trial of a threshold pass or OCR variant"""
+        trial = {key: {kind: {str(arm): [int(success), 1]}} for key in {context, self.GLOBAL_CONTEXT}}
+        with self._lock:
+            self._add_counts(self._stats, trial)
+            self._add_counts(self._pending, trial)
+            self._dirty_updates += 1
+            should_save = self._dirty_updates >= AdaptiveScheduleConfig.SAVE_EVERY_UPDATES
+        if should_save:
+            self._saver.request()
+
+    def close(self):
+        """Stop the background saver after a final save"""
+        self._saver.stop()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, List[int]]]]:
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def save(self):
+        """Merge the counts recorded since the last save into the state file and reload the merged stats"""
+        with self._save_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                local = json.loads(json.dumps(self._stats))
+                self._dirty_updates = 0
+            try:
+                with locked_state(self.state_path):
+                    try:
+                        stored = read_json(self.state_path)
+                    except ValueError as e:
+                        logger.warning(f"Replacing unreadable threshold schedule state {self.state_path}: {str(e)}")
+                        stored = None
+                    if stored is None:
+                        stored = local
+                    else:
+                        self._add_counts(stored, pending)
+                    write_json_atomic(self.state_path, stored)
+            except OSError as e:
+                logger.warning(f"Could not persist threshold schedule to {self.state_path}: {str(e)}")
+                with self._lock:
+                    self._add_counts(self._pending, pending)
+                return
+            
+            with self._lock:
+                # The file now also holds other processes' counts; keep what was recorded meanwhile
+                self._stats = stored
+                self._add_counts(self._stats, self._pending)
+    
+    @staticmethod
+    def _add_counts(target: Dict[str, Dict[str, Dict[str, List[int]]]],
+                    delta: Dict[str, Dict[str, Dict[str, List[int]]]]):
+        for context, kinds in delta.items():
+            for kind, arms in kinds.items():
+                for arm, (successes, trials) in arms.items():
+                    counts = target.setdefault(context, {}).setdefault(kind, {}).setdefault(arm, [0, 0])
+                    counts[0] += successes
+                    counts[1] += trials
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                self._stats = json.load(f)
+            logger.info(f"Loaded threshold schedule stats for {len(self._stats)} contexts")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable threshold schedule state {self.state_path}: {str(e)}")
+
+    def _order(self, context: str, kind: str, arms: List[str]) -> List[str]:
+        with self._lock:
+            stats = self._context_stats(context, kind)
+            if any(stats.get(arm, [0, 0])[1] < AdaptiveScheduleConfig.MIN_ARM_TRIALS for arm in arms):
+                stats = None
+            else:
+                samples = {}
+                pruned = []
+                for arm in arms:
+                    successes, trials = stats.get(arm, [0, 0])
+                    if (AdaptiveScheduleConfig.PRUNE_ENABLED and
+                            trials >= AdaptiveScheduleConfig.PRUNE_MIN_TRIALS and
+                            (successes + 1) / (trials + 2) < AdaptiveScheduleConfig.PRUNE_MAX_SUCCESS_RATE):
+                        pruned.append(arm)
+                        continue
+                    samples[arm] = self._random.betavariate(1 + successes, 1 + trials - successes)
+                explore_pruned = self._random.random() < AdaptiveScheduleConfig.PRUNED_EXPLORATION_RATE
+
+        if stats is None:
+            # Too few trials to rank on: keep the configured order
+            metrics.increment(f"schedule.{kind}.warming_up")
+            return list(arms)
+
+        ordered = sorted(samples, key=samples.get, reverse=True)
+        if not ordered or explore_pruned:
+            # Pruned arms go last, so they only cost time when everything else missed
+            ordered += pruned
+        metrics.increment(f"schedule.{kind}.pruned", len(pruned) if not explore_pruned else 0)
+        return ordered
+
+    def _context_stats(self, context: str, kind: str) -> Dict[str, List[int]]:
+        # Fall back to global stats until a context has seen enough trials
+        stats = self._stats.get(context, {}).get(kind, {})
+        if sum(trials for _, trials in stats.values()) >= AdaptiveScheduleConfig.MIN_CONTEXT_TRIALS:
+            return stats
+        return self._stats.get(self.GLOBAL_CONTEXT, {}).get(kind, {})
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+import cv2
+import numpy as np
+from ..config.settings import TrackingConfig, VideoIngestConfig
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .plate_tracking_service import PlateTracker
+
+logger = get_logger(__name__)
+
+
+class MotionGate:
+    """
+    Cheap frame-difference check on a small blurred grayscale copy of the
+    region of interest. A frame counts as changed when enough pixels moved
+    since the previous sampled frame.
+    """
+
+    def __init__(self, width: Optional[int] = None, pixel_threshold: Optional[int] = None,
+                 min_changed_fraction: Optional[float] = None):
+        self.width = width or VideoIngestConfig.MOTION_WIDTH
+        self.pixel_threshold = pixel_threshold or VideoIngestConfig.MOTION_PIXEL_THRESHOLD
+        self.min_changed_fraction = (min_changed_fraction if min_changed_fraction is not None
+                                     else VideoIngestConfig.MOTION_MIN_CHANGED_FRACTION)
+        self._previous = None
+
+    def has_motion(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]] = None) -> bool:
+        if roi is not None:
+            x, y, w, h = roi
+            frame = frame[y:y + h, x:x + w]
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape[:2]
+        if width > self.width:
+            gray = cv2.resize(gray, (self.width, max(1, int(height * self.width / width))),
+                              interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return True
+        changed = np.count_nonzero(cv2.absdiff(gray, previous) > self.pixel_threshold)
+        return changed / gray.size >= self.min_changed_fraction
+
+
+class VideoIngestService:
+    """
+    Reads a video file or any stream cv2.VideoCapture can open (RTSP, HTTP,
+    a local file in tests) and runs the local plate pipeline on it.
+
+    Frames are sampled at VideoIngestConfig.SAMPLE_FPS of video time; skipped
+    frames are only grabbed, never decoded. Sampled frames without motion in
+    the camera's ROI are dropped before recognition.
+
+    With tracking (TrackingConfig.ENABLED) frames only feed a PlateTracker and
+    each vehicle is read once, when its track closes; otherwise every frame
+    runs the full pipeline. Each plate read produces an event passed to
+    on_event, unless the same plate was already reported within
+    EVENT_COOLDOWN_SECONDS.
+    """
+
+    def __init__(self, license_plate_service, on_event: Callable[[Dict[str, Any]], None],
+                 camera_id: Optional[str] = None, profile: Optional[str] = None,
+                 sample_fps: Optional[float] = None, motion_gate: Optional[MotionGate] = None,
+                 tracking: Optional[bool] = None):
+        self.license_plate_service = license_plate_service
+        self.on_event = on_event
+        self.camera_id = camera_id
+        self.profile = profile
+        self.sample_fps = VideoIngestConfig.SAMPLE_FPS if sample_fps is None else sample_fps
+        self.motion_gate = motion_gate or MotionGate()
+        tracking = TrackingConfig.ENABLED if tracking is None else tracking
+        self.tracker = PlateTracker(license_plate_service, camera_id, profile) if tracking else None
+        self._stop = threading.Event()
+        self._last_event_ms: Dict[str, float] = {}
+        self._fps = 0.0
+        self._opened_at = time.monotonic()
+        self._frames_since_open = 0
+        self.stats = {
+            "frames_read": 0,
+            "frames_sampled": 0,
+            "frames_without_motion": 0,
+            "frames_recognized": 0,
+            "events": 0,
+            "reconnects": 0
+        }
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, source: str, max_frames: Optional[int] = None) -> Dict[str, int]:
+        """
+        Ingest source until it ends, stop() is called or max_frames frames were read
+
+        Returns:
+            Frame and event counters of the run
+        """
+        is_stream = not os.path.exists(source)
+        capture = self._open(source)
+        last_sample_ms = None
+        reconnects = 0
+
+        try:
+            while not self._stop.is_set():
+                if max_frames is not None and self.stats["frames_read"] >= max_frames:
+                    break
+                if not capture.grab():
+                    if not is_stream or reconnects >= VideoIngestConfig.MAX_RECONNECTS:
+                        break
+                    reconnects += 1
+                    self._count("reconnects")
+                    logger.warning(f"Lost video source {source}, reconnecting ({reconnects})")
+                    capture.release()
+                    time.sleep(VideoIngestConfig.RECONNECT_DELAY_SECONDS)
+                    capture = self._open(source)
+                    last_sample_ms = None
+                    continue
+
+                self._count("frames_read")
+                position_ms = self._position_ms(capture)
+                if last_sample_ms is not None and round(position_ms - last_sample_ms, 3) < self._sample_interval_ms():
+                    continue
+                last_sample_ms = position_ms
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    continue
+                self._count("frames_sampled")
+                self._process_frame(frame, position_ms)
+            if self.tracker is not None:
+                self._emit_tracks(self.tracker.flush())
+        finally:
+            capture.release()
+
+        if self.tracker is not None:
+            return {**self.stats, **self.tracker.stats}
+        return dict(self.stats)
+
+    def _process_frame(self, frame: np.ndarray, position_ms: float):
+        roi = None
+        roi_service = getattr(self.license_plate_service, 'roi_service', None)
+        if roi_service is not None and self.camera_id:
+            roi = roi_service.get_roi(self.camera_id, frame.shape)
+
+        frame_index = self.stats["frames_read"] - 1
+        if not self.motion_gate.has_motion(frame, roi):
+            self._count("frames_without_motion")
+            if self.tracker is not None:
+                # A vehicle that stopped in front of the camera is read now
+                self._emit_tracks(self.tracker.expire(position_ms))
+            return
+
+        self._count("frames_recognized")
+        if self.tracker is not None:
+            self._emit_tracks(self.tracker.update(frame, position_ms, frame_index))
+            return
+
+        result = self.license_plate_service.recognize_image(frame, self.camera_id, self.profile)
+        if not result.plate:
+            return
+        self._emit({
+            "camera_id": self.camera_id,
+            "plate": result.plate,
+            "confidence": result.confidence,
+            "method": result.processing_method,
+            "bounding_box": list(result.bounding_box) if result.bounding_box else None,
+            "frame_index": frame_index,
+            "position_ms": round(position_ms, 1),
+            "timestamp": time.time()
+        })
+
+    def _emit_tracks(self, events):
+        for event in events:
+            self._emit(event)
+
+    def _emit(self, event: Dict[str, Any]):
+        last_ms = self._last_event_ms.get(event["plate"])
+        if last_ms is not None and abs(event["position_ms"] - last_ms) < VideoIngestConfig.EVENT_COOLDOWN_SECONDS * 1000:
+            return
+        self._last_event_ms[event["plate"]] = event["position_ms"]
+
+        self._count("events")
+        self.on_event(event)
+
+    def _open(self, source: str) -> cv2.VideoCapture:
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise IOError(f"Could not open video source: {source}")
+        self._fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self._opened_at = time.monotonic()
+        self._frames_since_open = 0
+        return capture
+
+    def _position_ms(self, capture: cv2.VideoCapture) -> float:
+        # Live streams often report no position: fall back to frame count, then wall clock
+        self._frames_since_open += 1
+        position_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+        if position_ms > 0:
+            return position_ms
+        if self._fps > 0:
+            return (self._frames_since_open - 1) * 1000.0 / self._fps
+        return (time.monotonic() - self._opened_at) * 1000.0
+
+    def _sample_interval_ms(self) -> float:
+        return 1000.0 / self.sample_fps if self.sample_fps > 0 else 0.0
+
+    def _count(self, name: str):
+        self.stats[name] += 1
+        metrics.increment(f"video.{name}")
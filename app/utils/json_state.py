@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+# Cross-process lock on POSIX; elsewhere saves are only serialized within the process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def locked_state(path: str):
+    """
+    Exclusive lock on a state file (held on a sidecar "<path>.lock"), so
+    processes sharing the file can read-merge-write it without losing
+    each other's updates
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: str) -> Optional[Any]:
+    """Parsed content of path, None when it doesn't exist; raises ValueError when unreadable"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json_atomic(path: str, state: Any):
+    """Write state to a unique temp file next to path, then rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, prefix=f"{os.path.basename(path)}.",
+                                     suffix='.tmp', delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+class BackgroundSaver:
+    """
+    Runs a save function on a daemon thread, every interval seconds or
+    sooner when request() is called, so persistence never runs on the
+    thread that recorded the update. stop() runs one final save.
+    """
+
+    def __init__(self, save: Callable[[], None], interval: float, name: str):
+        self._save = save
+        self._interval = interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def request(self):
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0):
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            if not self._stopping.is_set():
+                self._save()
+        self._save()
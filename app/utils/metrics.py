@@ -0,0 +1,80 @@
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Dict, Optional
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (counters and callable gauges).
+
+    Exposed as JSON through the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(int)
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def register_gauge(self, name: str, fn: Callable[[], float]):
+        with self._lock:
+            self._gauges[name] = fn
+
+    def get_counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        gauge_values = {}
+        for name, fn in gauges.items():
+            try:
+                gauge_values[name] = fn()
+            except Exception:
+                gauge_values[name] = None
+
+        return {
+            "counters": counters,
+            "gauges": gauge_values
+        }
+
+
+metrics = MetricsRegistry()
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies (seconds) with percentile queries"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95)
+        }
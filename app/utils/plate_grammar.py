@@ -0,0 +1,137 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass
+class PlateMatch:
+    plate: str  # normalized: uppercase, no separators, confusions corrected
+    layout: str  # e.g. "LLLLNN" (L = letter slot, N = digit slot)
+    score: float
+    corrections: int
+    span: Tuple[int, int]  # position of the match in the scanned text
+
+
+class PlateGrammar:
+    """
+    Precompiled grammar for Chilean plates (LLLL·NN, LL·NNNN, LLL·NNN),
+    tolerant of spaces, dots, bullets and hyphens between characters.
+
+    Each slot also accepts the characters OCR commonly confuses with it
+    (0/O, 1/I, 2/Z, 5/S, 8/B); they are corrected to the kind the slot
+    expects and lower the score. A single compiled pattern tries every
+    layout at every position of the text in one scan.
+    """
+
+    LAYOUTS = ('LLLLNN', 'LLNNNN', 'LLLNNN')
+    LAYOUT_PRIOR = {'LLLLNN': 1.0, 'LLNNNN': 1.0, 'LLLNNN': 0.9}
+    MAX_SCORE = max(LAYOUT_PRIOR.values())
+
+    LETTER_FOR_DIGIT = {'0': 'O', '1': 'I', '2': 'Z', '5': 'S', '8': 'B'}
+    DIGIT_FOR_LETTER = {letter: digit for digit, letter in LETTER_FOR_DIGIT.items()}
+    TO_LETTER = str.maketrans(LETTER_FOR_DIGIT)
+    TO_DIGIT = str.maketrans(DIGIT_FOR_LETTER)
+    LETTER_COUNT = {layout: layout.count('L') for layout in LAYOUTS}
+    SEPARATORS = ' \t·•.-'
+    DROP_SEPARATORS = str.maketrans('', '', SEPARATORS)
+
+    CORRECTION_PENALTY = 0.15
+    # Match glued to other letters/digits on one side (e.g. "XHCJH72")
+    BOUNDARY_PENALTY = 0.25
+    MAX_CORRECTIONS = 2
+
+    PATTERN = None  # compiled by _compile() once the class exists
+    # Uncorrected, separator-free plate; layouts differ in letter count, so at most one matches
+    STRICT_PATTERN = re.compile(r'(?P<LLLLNN>[A-Z]{4}\d{2})|(?P<LLNNNN>[A-Z]{2}\d{4})|(?P<LLLNNN>[A-Z]{3}\d{3})')
+
+    @classmethod
+    def parse(cls, text: str) -> Optional[PlateMatch]:
+        """Best reading of text as exactly one plate, or None"""
+        if not text:
+            return None
+        text = text.strip().upper()
+        strict = cls.STRICT_PATTERN.fullmatch(text)
+        if strict is not None:
+            # Any corrected reading scores lower than an exact one
+            return PlateMatch(text, strict.lastgroup, cls.LAYOUT_PRIOR[strict.lastgroup], 0, (0, len(text)))
+
+        match = cls.PATTERN.match(text)
+        best = None
+        if match is None:
+            return None
+        for layout in cls.LAYOUTS:
+            if match.group(layout) is not None and match.end(layout) == len(text):
+                best = cls._better(best, cls._candidate(text, match, layout))
+        return best
+
+    @classmethod
+    def search(cls, text: str) -> Optional[PlateMatch]:
+        """Best-scoring plate anywhere in free text (e.g. a full-image OCR result), or None"""
+        if not text:
+            return None
+        text = text.upper()
+        best = None
+        for match in cls.PATTERN.finditer(text):
+            for layout in cls.LAYOUTS:
+                if match.group(layout) is not None:
+                    best = cls._better(best, cls._candidate(text, match, layout))
+            if best is not None and best.score >= cls.MAX_SCORE:
+                # Nothing later can beat an exact, delimited match of the top layout
+                break
+        return best
+
+    @classmethod
+    def _candidate(cls, text: str, match: re.Match, layout: str) -> Optional[PlateMatch]:
+        start, end = match.span(layout)
+        characters = match.group(layout)
+        if not characters.isalnum():
+            characters = characters.translate(cls.DROP_SEPARATORS)
+
+        letter_count = cls.LETTER_COUNT[layout]
+        letters, digits = characters[:letter_count], characters[letter_count:]
+        plate, corrections = characters, 0
+        if not (letters.isalpha() and digits.isdigit()):
+            plate = letters.translate(cls.TO_LETTER) + digits.translate(cls.TO_DIGIT)
+            corrections = sum(original != corrected for original, corrected in zip(characters, plate))
+            if corrections > cls.MAX_CORRECTIONS:
+                return None
+
+        unbounded_sides = int(start > 0 and text[start - 1].isalnum()) + \
+            int(end < len(text) and text[end].isalnum())
+        score = (cls.LAYOUT_PRIOR[layout]
+                 - cls.CORRECTION_PENALTY * corrections
+                 - cls.BOUNDARY_PENALTY * unbounded_sides)
+        return PlateMatch(plate, layout, max(0.0, score), corrections, (start, end))
+
+    @classmethod
+    def _compile(cls) -> re.Pattern:
+        confusable_digits = ''.join(cls.LETTER_FOR_DIGIT)
+        confusable_letters = ''.join(cls.DIGIT_FOR_LETTER)
+        letter = f"[A-Z{confusable_digits}]"
+        digit = f"[0-9{confusable_letters}]"
+        # Separators never span lines: a plate is read on one line
+        separator = '[' + re.escape(cls.SEPARATORS) + ']*'
+        # Every layout is two letter slots, two slots of either kind and two digit slots.
+        # The leading pair needs one real letter and the trailing pair one real digit,
+        # so "123456" or a run of words isn't "corrected" into a plate. Positions
+        # failing this shape are skipped inside the regex engine.
+        leading = f"(?:[A-Z]{separator}{letter}|[{confusable_digits}]{separator}[A-Z])"
+        trailing = f"(?:[0-9]{separator}{digit}|[{confusable_letters}]{separator}[0-9])"
+        guard = f"(?={separator.join([leading, '[A-Z0-9]', '[A-Z0-9]', trailing])})"
+        # One optional lookahead per layout captures each layout that can start at the position
+        return re.compile(guard + ''.join(
+            f"(?:(?=(?P<{layout}>{separator.join(letter if slot == 'L' else digit for slot in layout)})))?"
+            for layout in cls.LAYOUTS
+        ))
+
+    @staticmethod
+    def _better(current: Optional[PlateMatch], candidate: Optional[PlateMatch]) -> Optional[PlateMatch]:
+        # Ties keep the earlier match
+        if candidate is None:
+            return current
+        if current is None or candidate.score > current.score:
+            return candidate
+        return current
+
+
+PlateGrammar.PATTERN = PlateGrammar._compile()
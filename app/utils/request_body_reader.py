@@ -0,0 +1,51 @@
+import threading
+from ..config.settings import ImageConfig
+
+
+class RequestBodyReader:
+    """
+    Reads raw (non-multipart) request bodies into a reusable per-thread buffer.
+
+    The body is copied once, straight from the WSGI input stream into a
+    preallocated bytearray, and returned as a memoryview that can be handed
+    to np.frombuffer / cv2.imdecode without further copies.
+
+    The returned view is only valid until the next read on the same thread:
+    copy it (bytes(view)) before handing it to background work.
+    """
+
+    RAW_MIMETYPES = {'application/octet-stream', 'image/jpeg', 'image/png'}
+    MIN_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @classmethod
+    def is_raw_upload(cls, request_obj) -> bool:
+        return request_obj.mimetype in cls.RAW_MIMETYPES
+
+    def read(self, request_obj) -> memoryview:
+        length = request_obj.content_length or 0
+        view = memoryview(self._buffer(length))[:length]
+
+        stream = request_obj.stream
+        offset = 0
+        while offset < length:
+            read = stream.readinto(view[offset:])
+            if not read:
+                break
+            offset += read
+
+        return view[:offset]
+
+    def _buffer(self, size: int) -> bytearray:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            # Grow to the next power of two so a thread reallocates only a few times;
+            # a fresh bytearray (not a resize) keeps any still-referenced view valid
+            capacity = self.MIN_BUFFER_SIZE
+            while capacity < size:
+                capacity *= 2
+            buffer = bytearray(min(capacity, max(size, ImageConfig.MAX_CONTENT_LENGTH)))
+            self._local.buffer = buffer
+        return buffer
@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+from collections import Counter
+from typing import List, Optional
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stack of one thread at a fixed interval from a
+    background thread (no tracing hooks, so the profiled code runs at full
+    speed between samples).
+
+    Stacks are aggregated in the collapsed "frame;frame;frame count" format
+    read by flamegraph.pl, speedscope and most flame graph viewers. Native
+    calls (cv2, Tesseract via subprocess) show up as time in the Python
+    frame that made the call.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.002):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> List[str]:
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
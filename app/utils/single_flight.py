@@ -0,0 +1,66 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share the same key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait on the same future and receive the
+    same result or exception. Once the call finishes the key is forgotten,
+    so later requests run again.
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers of key
+
+        Args:
+            key: Identity of the call (e.g. engine + image hash)
+            fn: Zero-argument callable producing the result
+
+        Returns:
+            Tuple of (result, shared) where shared is True when the result
+            came from another caller's in-flight execution
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result(timeout=self.wait_timeout), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+
+        self._forget(key)
+        future.set_result(result)
+        return result, False
+
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def image_key(namespace: str, image_bytes) -> str:
+        digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+        return f"{namespace}:{digest}"
@@ -1,5 +1,6 @@
+from urllib.parse import urlparse
 from flask import request
-from ..config.settings import ImageConfig
+from ..config.settings import ImageConfig, JobConfig
 
 
 class FileValidator:
@@ -35,7 +36,66 @@ class FileValidator:
             'status_code': 200
         }
     
+    @staticmethod
+    def validate_raw_upload(request_obj):
+        content_length = request_obj.content_length
+        if not content_length:
+            return {
+                'valid': False,
+                'error': 'No image provided',
+                'status_code': 400
+            }
+        
+        if content_length > ImageConfig.MAX_CONTENT_LENGTH:
+            return {
+                'valid': False,
+                'error': 'Image too large',
+                'status_code': 413
+            }
+        
+        return {
+            'valid': True,
+            'error': None,
+            'status_code': 200
+        }
+    
     @staticmethod
     def _allowed_file(filename):
         return ('.' in filename and 
-                filename.rsplit('.', 1)[1].lower() in ImageConfig.ALLOWED_EXTENSIONS)
\ No newline at end of file
+                filename.rsplit('.', 1)[1].lower() in ImageConfig.ALLOWED_EXTENSIONS)
+
+
+class CallbackUrlValidator:
+    
+    @staticmethod
+    def validate(callback_url):
+        """Job webhooks only go to https URLs, on JobConfig.CALLBACK_ALLOWED_HOSTS when it is set"""
+        try:
+            parsed = urlparse(callback_url)
+        except ValueError:
+            parsed = None
+        
+        if parsed is None or parsed.scheme != 'https' or not parsed.hostname:
+            return {
+                'valid': False,
+                'error': 'Invalid callback_url. Must be an https URL',
+                'status_code': 400
+            }
+        
+        allowed_hosts = CallbackUrlValidator._allowed_hosts()
+        if allowed_hosts and parsed.hostname not in allowed_hosts:
+            return {
+                'valid': False,
+                'error': 'callback_url host is not allowed',
+                'status_code': 400
+            }
+        
+        return {
+            'valid': True,
+            'error': None,
+            'status_code': 200
+        }
+    
+    @staticmethod
+    def _allowed_hosts():
+        return {host.strip().lower() for host in JobConfig.CALLBACK_ALLOWED_HOSTS.split(',') if host.strip()}
@@ -0,0 +1,92 @@
+"""
+Checks ImageProcessingService.clear_border against
+skimage.segmentation.clear_border and compares their per-crop latency.
+
+    python -m benchmarks.clear_border_benchmark [--images DIR] [--crops N]
+
+Crops are plate-sized grayscale, binary and few-level (large flat regions)
+arrays plus the plate crops the santifiorino pipeline selects from the
+corpus. Exits with status 1 if any output differs from scikit-image.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from skimage.segmentation import clear_border as skimage_clear_border
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.license_plate_model import ImageProcessingParams  # noqa: E402
+from app.services.image_processing_service import ImageProcessingService  # noqa: E402
+from benchmarks.corpus import load_corpus  # noqa: E402
+
+
+def random_crops(count: int, rng: np.random.Generator):
+    crops = []
+    for i in range(count):
+        h = int(rng.integers(30, 140))
+        w = int(h * rng.uniform(2.0, 4.0))
+        kind = i % 3
+        if kind == 0:
+            crop = rng.integers(0, 256, (h, w), dtype=np.uint8)
+        elif kind == 1:
+            crop = (rng.random((h, w)) > 0.5).astype(np.uint8) * 255
+        else:
+            # Blurred few-level noise: large same-valued regions that reach the border
+            levels = rng.integers(0, 4, (h // 8 + 1, w // 8 + 1)).astype(np.uint8) * 85
+            crop = cv2.resize(levels, (w, h), interpolation=cv2.INTER_NEAREST)
+        crops.append(crop)
+    return crops
+
+
+def plate_crops(corpus):
+    processor = ImageProcessingService()
+    params = ImageProcessingParams.default()
+    crops = []
+    for _, image_bytes, _ in corpus:
+        gray = processor.decode_image(image_bytes, grayscale=True)
+        for threshold in params.threshold_values:
+            contours = processor.find_contours(processor.apply_threshold(gray, threshold))
+            for candidate in processor.select_plate_candidates(gray, contours, params):
+                crops.append(processor.crop_box(gray, candidate.box))
+    return crops
+
+
+def time_per_crop(fn, crops, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for crop in crops:
+            fn(crop)
+        best = min(best, time.perf_counter() - started)
+    return best / len(crops) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', help='Corpus directory (default: synthetic frames)')
+    parser.add_argument('--crops', type=int, default=300, help='Number of random crops')
+    args = parser.parse_args()
+
+    crops = random_crops(args.crops, np.random.default_rng(7)) + plate_crops(load_corpus(args.images))
+
+    mismatches = sum(
+        not np.array_equal(ImageProcessingService.clear_border(crop), skimage_clear_border(crop))
+        for crop in crops
+    )
+    print(f"{len(crops)} crops, {mismatches} mismatches against skimage.segmentation.clear_border")
+
+    opencv_ms = time_per_crop(ImageProcessingService.clear_border, crops)
+    skimage_ms = time_per_crop(skimage_clear_border, crops)
+    print(f"{'implementation':>14} {'ms/crop':>8}")
+    print(f"{'opencv':>14} {opencv_ms:>8.3f}")
+    print(f"{'skimage':>14} {skimage_ms:>8.3f}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark corpus helpers.
+
+A corpus is a directory of JPEG/PNG frames whose filename starts with the
+expected plate (``HCJH72.jpg``, ``HCJH72_gate3.jpg``); files without a plate
+prefix count as "no plate expected". Without a directory a small synthetic
+corpus of rendered plates plus distractor rectangles is generated.
+"""
+import glob
+import os
+import re
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+PLATE_PREFIX = re.compile(r'^([A-Z]{4}\d{2}|[A-Z]{2}\d{4}|[A-Z]{3}\d{3})(?:[_\-.]|$)')
+
+SYNTHETIC_PLATES = ['HCJH72', 'BBDF41', 'KLTR19', 'CD4521', 'FZPW88', 'GHRS10', 'JJKL55', 'PX9090']
+
+
+def load_corpus(directory: Optional[str]) -> List[Tuple[str, bytes, Optional[str]]]:
+    """(name, encoded image, expected plate or None) for every frame"""
+    if not directory:
+        return synthetic_corpus()
+
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, '*'))):
+        if os.path.splitext(path)[1].lower() not in ('.jpg', '.jpeg', '.png'):
+            continue
+        name = os.path.basename(path)
+        match = PLATE_PREFIX.match(name.upper())
+        with open(path, 'rb') as f:
+            corpus.append((name, f.read(), match.group(1) if match else None))
+    return corpus
+
+
+def synthetic_corpus(count: int = 8) -> List[Tuple[str, bytes, Optional[str]]]:
+    rng = np.random.default_rng(42)
+    corpus = []
+    for i in range(count):
+        plate = SYNTHETIC_PLATES[i % len(SYNTHETIC_PLATES)]
+        frame = render_frame(plate, rng)
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        corpus.append((f"{plate}_synthetic{i}.jpg", buf.tobytes(), plate))
+    return corpus
+
+
+def render_frame(plate: str, rng: np.random.Generator, size: Tuple[int, int] = (1280, 720)) -> np.ndarray:
+    width, height = size
+    frame = np.clip(rng.normal(110, 25, (height, width, 3)), 0, 255).astype(np.uint8)
+
+    # Distractors: bright windows/signs with plate-like aspect ratios
+    for _ in range(6):
+        w = int(rng.integers(120, 400))
+        h = int(w / rng.uniform(2.0, 5.5))
+        x = int(rng.integers(0, width - w))
+        y = int(rng.integers(0, height - h))
+        shade = int(rng.integers(180, 255))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (shade, shade, shade), -1)
+
+    plate_w = int(rng.integers(260, 360))
+    plate_h = int(plate_w * 13 / 36)
+    x = int(rng.integers(width // 4, width // 2))
+    y = int(rng.integers(height // 2, height - plate_h - 20))
+    cv2.rectangle(frame, (x - 4, y - 4), (x + plate_w + 4, y + plate_h + 4), (20, 20, 20), -1)
+    cv2.rectangle(frame, (x, y), (x + plate_w, y + plate_h), (245, 245, 245), -1)
+    # Characters fill ~60% of the plate height, as on real Chilean plates
+    scale = 1.0
+    (text_w, text_h), _ = cv2.getTextSize(plate, cv2.FONT_HERSHEY_SIMPLEX, scale, 3)
+    scale = min(0.6 * plate_h / text_h, 0.9 * plate_w / text_w)
+    thickness = max(2, int(2.5 * scale))
+    (text_w, text_h), _ = cv2.getTextSize(plate, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+    cv2.putText(frame, plate, (x + (plate_w - text_w) // 2, y + (plate_h + text_h) // 2),
+                cv2.FONT_HERSHEY_SIMPLEX, scale, (10, 10, 10), thickness)
+    return frame
@@ -0,0 +1,86 @@
+"""
+Decode time and memory: full-size BGR vs grayscale-direct vs reduced decoding.
+
+For each resolution a photo-like JPEG is decoded three ways:
+  bgr+gray   IMREAD_COLOR followed by cvtColor (the old path)
+  gray       IMREAD_GRAYSCALE (santifiorino path)
+  reduced    IMREAD_REDUCED_GRAYSCALE_N for an 800 px consumer (contour path)
+
+    python -m benchmarks.decode_benchmark [--repeat 5] [--images DIR]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.image_processing_service import ImageProcessingService  # noqa: E402
+
+RESOLUTIONS = [(1920, 1080), (3264, 2448), (4000, 3000), (6000, 4000)]
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    # Smooth gradients plus noise compress like a real frame, unlike pure noise
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = (x + y) / 2
+    rng = np.random.default_rng(0)
+    img = np.clip(base[..., None] + rng.normal(0, 12, (height, width, 3)), 0, 255).astype(np.uint8)
+    ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return buf.tobytes()
+
+
+def bgr_then_gray(image_bytes: bytes):
+    # The old path holds both buffers at peak
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    return img, cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def timed(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1000, result
+
+
+def run(label: str, image_bytes: bytes, repeat: int):
+    old_ms, (bgr, gray) = timed(lambda: bgr_then_gray(image_bytes), repeat)
+    gray_ms, gray_direct = timed(
+        lambda: ImageProcessingService.decode_image(image_bytes, grayscale=True), repeat)
+    reduced_ms, reduced = timed(
+        lambda: ImageProcessingService.decode_image(image_bytes, grayscale=True, target_width=800), repeat)
+
+    mb = 1024 * 1024
+    print(f"{label:>14} {old_ms:>9.1f} {(bgr.nbytes + gray.nbytes) / mb:>7.1f} "
+          f"{gray_ms:>9.1f} {gray_direct.nbytes / mb:>7.1f} "
+          f"{reduced_ms:>11.1f} {reduced.nbytes / mb:>8.2f}  {reduced.shape[1]}x{reduced.shape[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--images', help='Directory of real JPEGs to use instead of synthetic frames')
+    args = parser.parse_args()
+
+    print(f"{'image':>14} {'bgr+gray':>9} {'MB':>7} {'gray':>9} {'MB':>7} {'reduced':>11} {'MB':>8}  reduced size")
+    print(f"{'':>14} {'ms':>9} {'':>7} {'ms':>9} {'':>7} {'ms':>11}")
+
+    if args.images:
+        for path in sorted(glob.glob(os.path.join(args.images, '*.jp*g'))):
+            with open(path, 'rb') as f:
+                run(os.path.basename(path)[:14], f.read(), args.repeat)
+    else:
+        for width, height in RESOLUTIONS:
+            run(f"{width}x{height}", make_jpeg(width, height), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Runs the santifiorino pipeline over a corpus under different configurations,
+then the full local engine under each pipeline profile (fast / balanced /
+thorough), and reports Tesseract calls, accuracy and latency per image.
+
+    python -m benchmarks.pipeline_benchmark [--images DIR]
+
+See benchmarks/corpus.py for the corpus layout. Accuracy is only meaningful
+with Tesseract installed; call counts are measured either way.
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.settings import PipelineConfig  # noqa: E402
+from app.models.license_plate_model import ImageProcessingParams  # noqa: E402
+from app.services.license_plate_service import LicensePlateService  # noqa: E402
+from app.utils.metrics import metrics  # noqa: E402
+from benchmarks.corpus import load_corpus  # noqa: E402
+
+
+def configurations():
+    default = ImageProcessingParams.default()
+    return {
+        # Every filtered contour OCR'd in findContours order (pre-ranking behaviour)
+        'unranked': replace(default, rank_candidates=False, duplicate_iou=1.01),
+        'ranked': default,
+        'ranked_top3': replace(default, max_ocr_candidates=3),
+        'ranked_top1': replace(default, max_ocr_candidates=1),
+        'ranked_top3+seg': replace(default, max_ocr_candidates=3, segmentation_gate=True),
+        # White-plate color mask ahead of the sweep, or instead of it
+        'color_seed': replace(default, color_localization='seed'),
+        'color_replace': replace(default, color_localization='replace'),
+    }
+
+
+def run_configuration(recognize, corpus):
+    calls, latencies, correct, labelled = [], [], 0, 0
+    for name, image_bytes, expected in corpus:
+        before = metrics.get_counter("ocr.tesseract_calls")
+        started = time.perf_counter()
+        result = recognize(image_bytes)
+        latencies.append(time.perf_counter() - started)
+        calls.append(metrics.get_counter("ocr.tesseract_calls") - before)
+        if expected is not None:
+            labelled += 1
+            correct += int(result.plate == expected)
+    return {
+        'calls_mean': float(np.mean(calls)),
+        'calls_max': int(np.max(calls)),
+        'accuracy': correct / labelled if labelled else None,
+        'latency_p50_ms': float(np.median(latencies)) * 1000,
+        'latency_p95_ms': float(np.percentile(latencies, 95)) * 1000,
+    }
+
+
+def print_row(label: str, stats):
+    accuracy = f"{stats['accuracy']:.2f}" if stats['accuracy'] is not None else 'n/a'
+    print(f"{label:>14} {stats['calls_mean']:>15.1f} {stats['calls_max']:>5} "
+          f"{accuracy:>9} {stats['latency_p50_ms']:>8.1f} {stats['latency_p95_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', help='Corpus directory (default: synthetic frames)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.images)
+    service = LicensePlateService()
+
+    print(f"{len(corpus)} images")
+    header = f"{'tess calls/img':>15} {'max':>5} {'accuracy':>9} {'p50 ms':>8} {'p95 ms':>8}"
+    print(f"{'configuration':>14} {header}")
+    default_params = service.processing_params
+    for label, params in configurations().items():
+        service.processing_params = params
+        print_row(label, run_configuration(service.recognize_santifiorino_method, corpus))
+    service.processing_params = default_params
+
+    # Whole local engine (quality gate, santifiorino, contour fallback) per profile
+    print(f"\n{'profile':>14} {header}")
+    for profile in PipelineConfig.PROFILES:
+        print_row(profile, run_configuration(
+            lambda image_bytes, p=profile: service.recognize(image_bytes, profile=p), corpus
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Microbenchmark of the compiled PlateGrammar against the regex chains it
+replaced: GCPVisionService._extract_chilean_license_plate (ten re.findall
+passes + _validate_chilean_license_plate) for free text, and the
+ChileanLicensePlateValidator pattern loop for cleaned OCR tokens.
+
+    python -m benchmarks.plate_grammar_benchmark [--repeats N]
+
+Also counts how often the two disagree, e.g. plates only the grammar reads
+because it corrects OCR confusions (0/O, 1/I, 2/Z, 5/S, 8/B).
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.plate_grammar import PlateGrammar  # noqa: E402
+
+FREE_TEXTS = [
+    "PATENTE\nHCJH·72\nCHILE",
+    "JG DJ-66",
+    "AB-12-34 SANTIAGO",
+    "CHILE HC JH 72",
+    "Estacionamiento privado\nno estacionar\nBB DF 41",
+    "KLTR 19 2018",
+    "HCJH7Z",
+    "8CJH72 CHILE",
+    "VENTA 569 1234 5678",
+    "no plate in this text at all, just a long sign with words",
+    "PX·9090",
+    "FZPW-88",
+]
+
+TOKENS = ['HCJH72', 'AB1234', 'ABC123', 'HCJH7Z', '8CJH72', 'KLTRI9', 'ABCD', 'A1', 'HELLO', '123456', 'GHRS10']
+
+
+def legacy_extract(text):
+    """GCPVisionService._extract_chilean_license_plate before PlateGrammar"""
+    cleaned_text = re.sub(r'\s+', ' ', text.strip())
+    patterns = [
+        r'[A-Z]{2}\s+[A-Z]{2}-\d{2}',
+        r'[A-Z]{2}-\d{2}-\d{2}',
+        r'[A-Z]{4}[·•.]\d{2}',
+        r'[A-Z]{2}[·•.]\d{4}',
+        r'[A-Z]{4}\s*\d{2}',
+        r'[A-Z]{2}\s*\d{4}',
+        r'[A-Z]\s*[A-Z]\s*[A-Z]\s*[A-Z]\s*[·•.]?\s*\d\s*\d',
+        r'[A-Z]\s*[A-Z]\s*[·•.]?\s*\d\s*\d\s*\d\s*\d',
+        r'[A-Z]\s*[A-Z]\s*-?\s*\d\s*\d\s*-?\s*\d\s*\d',
+        r'[A-Z]{2}\s+[A-Z]{2}\s*-\s*\d{2}'
+    ]
+    for pattern in patterns:
+        matches = re.findall(pattern, cleaned_text, re.IGNORECASE)
+        if matches:
+            license_plate = re.sub(r'\s+', '', matches[0].upper())
+            license_plate = re.sub(r'[·•]', '.', license_plate)
+            if legacy_validate_gcp(license_plate):
+                return license_plate.replace('-', '').replace(' ', '')
+    return None
+
+
+def legacy_validate_gcp(plate):
+    if re.match(r'^[A-Z]{2}\s+[A-Z]{2}-\d{2}$', plate):
+        return True
+    if re.match(r'^[A-Z]{2}-\d{2}-\d{2}$', plate):
+        return True
+    clean_plate = plate.replace('.', '').replace('-', '').replace(' ', '')
+    if len(clean_plate) == 6 and clean_plate[:4].isalpha() and clean_plate[4:].isdigit():
+        return True
+    if len(clean_plate) == 6 and clean_plate[:2].isalpha() and clean_plate[2:].isdigit():
+        return True
+    return False
+
+
+def legacy_token_match(text):
+    """ChileanLicensePlateValidator pattern loop before PlateGrammar"""
+    for pattern in [r'^[A-Z]{4}[0-9]{2}$', r'^[A-Z]{2}[0-9]{4}$', r'^[A-Z]{3}[0-9]{3}$']:
+        if re.match(pattern, text):
+            return True
+    return False
+
+
+def grammar_extract(text):
+    match = PlateGrammar.search(text)
+    return match.plate if match else None
+
+
+def grammar_token_match(text):
+    return PlateGrammar.parse(text) is not None
+
+
+def microseconds_per_call(fn, inputs, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - started) / (repeats * len(inputs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'case':>22} {'legacy us':>10} {'grammar us':>11}")
+    for label, legacy, grammar, inputs in (
+        ('free text (Vision)', legacy_extract, grammar_extract, FREE_TEXTS),
+        ('OCR token', legacy_token_match, grammar_token_match, TOKENS),
+    ):
+        print(f"{label:>22} {microseconds_per_call(legacy, inputs, args.repeats):>10.2f} "
+              f"{microseconds_per_call(grammar, inputs, args.repeats):>11.2f}")
+
+    print("\nDisagreements on free text:")
+    for text in FREE_TEXTS:
+        legacy, grammar = legacy_extract(text), grammar_extract(text)
+        if legacy != grammar:
+            print(f"  {text!r}: legacy={legacy} grammar={grammar}")
+
+
+if __name__ == '__main__':
+    main()
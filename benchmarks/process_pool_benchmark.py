@@ -0,0 +1,64 @@
+"""
+Throughput of the local engine under N concurrent request threads, with
+the pipeline run in those threads (the default, one GIL) versus handed to
+PipelinePoolService worker processes over shared memory.
+
+    python -m benchmarks.process_pool_benchmark [--images DIR] [--threads N]
+                                                [--workers N] [--rounds N]
+
+Threads and workers default to the machine's core count. Reports images
+per second for both modes, the speedup, and how often they disagree.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.license_plate_service import LicensePlateService  # noqa: E402
+from app.services.process_pool_service import PipelinePoolService  # noqa: E402
+from benchmarks.corpus import load_corpus  # noqa: E402
+
+
+def run_mode(recognize, images, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        plates = [result.plate for result in executor.map(recognize, images)]
+    return len(images) / (time.perf_counter() - started), plates
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', help='Corpus directory (default: synthetic frames)')
+    parser.add_argument('--threads', type=int, default=cores, help='Concurrent request threads')
+    parser.add_argument('--workers', type=int, default=cores, help='Pipeline worker processes')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per mode')
+    args = parser.parse_args()
+
+    images = [image_bytes for _, image_bytes, _ in load_corpus(args.images)] * args.rounds
+    service = LicensePlateService()
+    pool = PipelinePoolService(workers=args.workers)
+    pool.warm_up()
+
+    print(f"{len(images)} requests, {args.threads} threads, {args.workers} workers, {cores} cores")
+    # One untimed pass each so lazy imports and learned state don't favour either mode
+    run_mode(service.recognize, images[:args.threads], args.threads)
+    run_mode(pool.recognize, images[:args.threads], args.threads)
+
+    thread_rate, thread_plates = run_mode(service.recognize, images, args.threads)
+    pool_rate, pool_plates = run_mode(pool.recognize, images, args.threads)
+    pool.shutdown()
+
+    print(f"{'mode':>10} {'img/s':>8}")
+    print(f"{'threads':>10} {thread_rate:>8.1f}")
+    print(f"{'processes':>10} {pool_rate:>8.1f}")
+    print(f"speedup: {pool_rate / thread_rate:.2f}x")
+    disagreements = sum(a != b for a, b in zip(thread_plates, pool_plates))
+    print(f"disagreements: {disagreements}/{len(images)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Upload-to-decode overhead: multipart/form-data vs raw-body uploads.
+
+Builds JPEGs of roughly 1-16 MB and pushes each one through a minimal Flask
+app that mirrors the two controller read paths (request.files + file.read()
+vs RequestBodyReader), then decodes with ImageProcessingService.decode_image.
+Reported overhead is the time from entering the handler until the encoded
+bytes are ready for decoding (multipart parsing, spooling and copies).
+
+    python -m benchmarks.upload_decode_benchmark [--repeat 10]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from flask import Flask, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.image_processing_service import ImageProcessingService  # noqa: E402
+from app.utils.request_body_reader import RequestBodyReader  # noqa: E402
+
+TARGET_SIZES_MB = [1, 2, 4, 8, 15]
+
+
+def make_jpeg(target_mb: float) -> bytes:
+    # Noise barely compresses, so the pixel count drives the file size
+    side = int(np.sqrt(target_mb * 1024 * 1024 / 1.15))
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return buf.tobytes()
+
+
+def create_bench_app() -> Flask:
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024
+    reader = RequestBodyReader()
+
+    @app.route('/multipart', methods=['POST'])
+    def multipart():
+        started = time.perf_counter()
+        image_bytes = request.files['image'].read()
+        read_done = time.perf_counter()
+        img = ImageProcessingService.decode_image(image_bytes)
+        return {"read": read_done - started, "decode": time.perf_counter() - read_done, "shape": list(img.shape)}
+
+    @app.route('/raw', methods=['POST'])
+    def raw():
+        started = time.perf_counter()
+        image_bytes = reader.read(request)
+        read_done = time.perf_counter()
+        img = ImageProcessingService.decode_image(image_bytes)
+        return {"read": read_done - started, "decode": time.perf_counter() - read_done, "shape": list(img.shape)}
+
+    return app
+
+
+def measure_endpoint(client, path: str, image_bytes: bytes, repeat: int):
+    reads, decodes = [], []
+    for _ in range(repeat):
+        if path == '/multipart':
+            response = client.post(path, data={'image': (io.BytesIO(image_bytes), 'bench.jpg')},
+                                   content_type='multipart/form-data')
+        else:
+            response = client.post(path, data=image_bytes, content_type='image/jpeg')
+        timings = response.get_json()
+        reads.append(timings['read'])
+        decodes.append(timings['decode'])
+    return float(np.median(reads)), float(np.median(decodes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    client = create_bench_app().test_client()
+
+    print(f"{'size MB':>8} {'multipart read ms':>18} {'raw read ms':>12} {'decode ms':>10}")
+    for target_mb in TARGET_SIZES_MB:
+        image_bytes = make_jpeg(target_mb)
+        multipart_read, decode = measure_endpoint(client, '/multipart', image_bytes, args.repeat)
+        raw_read, _ = measure_endpoint(client, '/raw', image_bytes, args.repeat)
+        print(f"{len(image_bytes) / 1024 / 1024:>8.1f} {multipart_read * 1000:>18.2f} "
+              f"{raw_read * 1000:>12.2f} {decode * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,8 @@ from flask import Flask, request, jsonify
 import cv2
 import numpy as np
 import pytesseract
-from skimage import io
-from skimage.segmentation import clear_border
-import re
+from app.models.license_plate_model import ChileanLicensePlateValidator
+from app.services.image_processing_service import ImageProcessingService
 
 app = Flask(__name__)
 
@@ -44,7 +43,7 @@ class LicensePlateRecognizer:
     def process_license_plate(self, license_plate_img):
         """Additional processing for the license plate region"""
         # Clear border to remove edge artifacts
-        cleared = clear_border(license_plate_img)
+        cleared = ImageProcessingService.clear_border(license_plate_img)
         
         # Invert the image (make text black on white background)
         inverted = cv2.bitwise_not(cleared)
@@ -59,7 +58,7 @@ class LicensePlateRecognizer:
             text = pytesseract.image_to_string(processed_img, config=config)
             
             # Clean the extracted text
-            cleaned_text = re.sub(r'[^A-Z0-9]', '', text.upper().strip())
+            cleaned_text = ChileanLicensePlateValidator.clean_text(text)
             
             return cleaned_text
         except Exception as e:
@@ -68,25 +67,7 @@ class LicensePlateRecognizer:
     
     def validate_plate_format(self, text):
         """Validate if text matches Chilean license plate patterns"""
-        if not text or len(text) < 5:
-            return False
-        
-        # Chilean license plate patterns
-        patterns = [
-            r'^[A-Z]{4}[0-9]{2}$',  # AAAA##
-            r'^[A-Z]{2}[0-9]{4}$',  # AA####
-            r'^[A-Z]{3}[0-9]{3}$',  # AAA###
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text):
-                return True
-        
-        # Additional validation: at least 2 letters and 1 number
-        letter_count = sum(1 for c in text if c.isalpha())
-        number_count = sum(1 for c in text if c.isdigit())
-        
-        return letter_count >= 2 and number_count >= 1
+        return ChileanLicensePlateValidator.validate(text)
     
     def recognize(self, img_bytes):
         """Main recognition pipeline"""
@@ -145,7 +126,7 @@ class LicensePlateRecognizer:
                     # Validate format
                     if self.validate_plate_format(extracted_text):
                         print(f"✓ Valid plate found: {extracted_text}")
-                        return extracted_text
+                        return ChileanLicensePlateValidator.normalize(extracted_text)
                     
                     # Try different processing approaches
                     # Try without clearing border
@@ -155,7 +136,7 @@ class LicensePlateRecognizer:
                     
                     if self.validate_plate_format(text2):
                         print(f"✓ Valid plate found (alternative): {text2}")
-                        return text2
+                        return ChileanLicensePlateValidator.normalize(text2)
                     
                     # Try with original orientation
                     text3 = self.extract_text(license_plate_img)
@@ -163,7 +144,7 @@ class LicensePlateRecognizer:
                     
                     if self.validate_plate_format(text3):
                         print(f"✓ Valid plate found (original): {text3}")
-                        return text3
+                        return ChileanLicensePlateValidator.normalize(text3)
             
             print("No valid license plate found")
             return None
@@ -1,10 +1,10 @@
 from flask import Flask, request, jsonify
 import cv2
 import numpy as np
-import re
 import io
 import pytesseract
 from PIL import Image
+from app.models.license_plate_model import ChileanLicensePlateValidator
 
 app = Flask(__name__)
 
@@ -80,7 +80,7 @@ def extract_text_from_plate(image, contour):
         text = pytesseract.image_to_string(cropped, config=custom_config)
         
         # Limpiar el texto
-        cleaned_text = re.sub(r'[^A-Z0-9]', '', text.upper().strip())
+        cleaned_text = ChileanLicensePlateValidator.clean_text(text)
         
         # Validar que tenga al menos 5 caracteres
         if len(cleaned_text) >= 5:
@@ -89,7 +89,7 @@ def extract_text_from_plate(image, contour):
         # Intentar con configuración alternativa
         custom_config2 = r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
         text2 = pytesseract.image_to_string(cropped, config=custom_config2)
-        cleaned_text2 = re.sub(r'[^A-Z0-9]', '', text2.upper().strip())
+        cleaned_text2 = ChileanLicensePlateValidator.clean_text(text2)
         
         if len(cleaned_text2) >= 5:
             return cleaned_text2
@@ -102,25 +102,7 @@ def extract_text_from_plate(image, contour):
 
 def validate_chilean_plate(plate_text):
     """Valida si el texto parece una placa chilena"""
-    if not plate_text or len(plate_text) < 5:
-        return False
-    
-    # Patrones típicos chilenos
-    patterns = [
-        r'^[A-Z]{4}[0-9]{2}$',  # AAAA##
-        r'^[A-Z]{2}[0-9]{4}$',  # AA####
-        r'^[A-Z]{3}[0-9]{3}$',  # AAA###
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, plate_text):
-            return True
-    
-    # Validación adicional: al menos 2 letras y 1 número
-    letter_count = sum(1 for c in plate_text if c.isalpha())
-    number_count = sum(1 for c in plate_text if c.isdigit())
-    
-    return letter_count >= 2 and number_count >= 1
+    return ChileanLicensePlateValidator.validate(plate_text)
 
 def detect_license_plate(img_bytes):
     """Función principal para detectar placas"""
@@ -151,7 +133,7 @@ def detect_license_plate(img_bytes):
             plate_text = extract_text_from_plate(gray, plate_contour)
             
             if plate_text and validate_chilean_plate(plate_text):
-                return plate_text
+                return ChileanLicensePlateValidator.normalize(plate_text)
         
         # Si no se encuentra por contornos, intentar OCR directo
         try:
@@ -166,9 +148,9 @@ def detect_license_plate(img_bytes):
             # Buscar patrones de placa en el texto completo
             words = full_text.split()
             for word in words:
-                cleaned = re.sub(r'[^A-Z0-9]', '', word.upper())
+                cleaned = ChileanLicensePlateValidator.clean_text(word)
                 if validate_chilean_plate(cleaned):
-                    return cleaned
+                    return ChileanLicensePlateValidator.normalize(cleaned)
                     
         except Exception as e:
             print(f"Error en OCR directo: {e}")
@@ -0,0 +1,143 @@
+"""
+DetectionAuditLog against a real Postgres. The database tests only run with
+AUDIT_TEST_DATABASE_URL set, e.g.
+
+    AUDIT_TEST_DATABASE_URL=postgresql://postgres@localhost/lpr_test python -m pytest tests/test_audit_log_service.py
+
+Each test writes to its own table, dropped afterwards.
+"""
+import os
+import time
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2 import sql
+
+from app.config.settings import AuditConfig
+from app.services.audit_log_service import DetectionAuditLog
+
+DATABASE_URL = os.getenv('AUDIT_TEST_DATABASE_URL', '')
+
+requires_postgres = pytest.mark.skipif(not DATABASE_URL, reason="AUDIT_TEST_DATABASE_URL not set")
+
+
+def event(plate: str = "HCJH72", **overrides):
+    values = {
+        "camera_id": "porton-norte",
+        "plate": plate,
+        "engine": "opencv_tesseract",
+        "method": "santifiorino",
+        "confidence": 0.9,
+        "is_on_database": 1,
+        "latency_ms": 120.5,
+        "coalesced": False
+    }
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture
+def table(monkeypatch):
+    monkeypatch.setattr(AuditConfig, "DATABASE_URL", DATABASE_URL)
+    monkeypatch.setattr(AuditConfig, "CREATE_TABLE", True)
+    name = f"detection_audit_test_{uuid.uuid4().hex[:8]}"
+    yield name
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(name)))
+
+
+def rows(table: str):
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cursor:
+        cursor.execute(sql.SQL(
+            "SELECT plate, camera_id, engine, method, confidence, is_on_database, latency_ms, coalesced "
+            "FROM {} ORDER BY id"
+        ).format(sql.Identifier(table)))
+        return cursor.fetchall()
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@requires_postgres
+def test_events_are_inserted_in_batches(table):
+    audit_log = DetectionAuditLog(table=table, batch_size=10, flush_interval=60)
+    for i in range(25):
+        audit_log.record(event(f"PLATE{i:02d}"))
+    audit_log.close()
+
+    written = rows(table)
+    assert [row[0] for row in written] == [f"PLATE{i:02d}" for i in range(25)]
+    assert written[0][1:] == ("porton-norte", "opencv_tesseract", "santifiorino", pytest.approx(0.9), 1,
+                              pytest.approx(120.5), False)
+    assert audit_log.stats["written"] == 25
+    assert audit_log.stats["flushes"] == 3
+
+
+@requires_postgres
+def test_partial_batch_is_flushed_after_the_interval(table):
+    audit_log = DetectionAuditLog(table=table, batch_size=100, flush_interval=0.2)
+    try:
+        for i in range(3):
+            audit_log.record(event(f"PLATE{i:02d}"))
+        assert wait_for(lambda: audit_log.stats["written"] == 3)
+        assert len(rows(table)) == 3
+    finally:
+        audit_log.close()
+
+
+@requires_postgres
+def test_queued_events_are_flushed_on_shutdown(table):
+    audit_log = DetectionAuditLog(table=table, batch_size=1000, flush_interval=60)
+    for i in range(7):
+        audit_log.record(event(f"PLATE{i:02d}"))
+    audit_log.close()
+
+    assert len(rows(table)) == 7
+    assert audit_log.stats["flushes"] == 1
+
+
+@requires_postgres
+def test_events_are_dropped_and_counted_when_the_queue_is_full(table):
+    audit_log = DetectionAuditLog(table=table, queue_size=5, batch_size=1, flush_interval=60)
+    audit_log.record(event("WARMUP"))
+    assert wait_for(lambda: audit_log.stats["written"] == 1)
+
+    # Hold the table locked so the writer blocks inside its INSERT while the queue fills up
+    blocker = psycopg2.connect(DATABASE_URL)
+    try:
+        with blocker.cursor() as cursor:
+            cursor.execute(sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE").format(sql.Identifier(table)))
+        audit_log.record(event("BLOCKED"))
+        assert wait_for(lambda: audit_log._queue.qsize() == 0)
+        for i in range(8):
+            audit_log.record(event(f"PLATE{i:02d}"))
+        assert audit_log.stats["dropped"] == 3
+    finally:
+        blocker.rollback()
+        blocker.close()
+    audit_log.close()
+
+    assert [row[0] for row in rows(table)] == ["WARMUP", "BLOCKED"] + [f"PLATE{i:02d}" for i in range(5)]
+    assert audit_log.stats["written"] == 7
+
+
+def test_database_outage_counts_failed_events(monkeypatch):
+    # Nothing listens on port 1: every flush fails without reaching a server
+    monkeypatch.setattr(AuditConfig, "DATABASE_URL", "postgresql://audit@127.0.0.1:1/audit?connect_timeout=1")
+    audit_log = DetectionAuditLog(table="detection_audit", batch_size=2, flush_interval=60)
+
+    started = time.perf_counter()
+    for i in range(5):
+        audit_log.record(event(f"PLATE{i:02d}"))
+    assert time.perf_counter() - started < 0.5
+    audit_log.close()
+
+    assert audit_log.stats["failed"] == 5
+    assert audit_log.stats["written"] == 0
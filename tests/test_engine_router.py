@@ -0,0 +1,105 @@
+import threading
+import time
+
+import grpc
+import pytest
+
+from app.config.settings import GCPVisionConfig
+from app.models.license_plate_model import LicensePlateResult
+from app.services.admission_control_service import AdmissionControlService
+from app.services.engine_router_service import EngineRouter
+from app.services.gcp_vision_service import GCPVisionError
+from app.utils.metrics import metrics
+
+
+class FakeVision:
+    """Answers after a delay with a plate, or raises"""
+
+    def __init__(self, delay: float = 0.0, plate=None, errors=()):
+        self.delay = delay
+        self.plate = plate
+        self.errors = list(errors)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def extract_license_plate_from_image(self, image_data, raise_on_error=False):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        if error is not None:
+            raise error
+        return self.plate
+
+
+class FakeLocal:
+    def __init__(self, delay: float = 0.0, plate=None, error=None):
+        self.delay = delay
+        self.plate = plate
+        self.error = error
+        self.calls = 0
+
+    def recognize(self, image_bytes, camera_id=None, profile=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if self.plate:
+            return LicensePlateResult(self.plate, 0.9, "santifiorino")
+        return LicensePlateResult(None, 0.0, "santifiorino", "No valid license plate found")
+
+
+class GrpcUnavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    monkeypatch.setattr(GCPVisionConfig, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(GCPVisionConfig, "HEDGE_DELAY_SECONDS", "0.05")
+
+    def router(local, vision, target=EngineRouter.LOCAL):
+        monkeypatch.setattr(GCPVisionConfig, "HEDGE_TARGET", target)
+        return EngineRouter(local, vision, AdmissionControlService(), policy=EngineRouter.POLICY_LEGACY)
+    return router
+
+
+def test_slow_primary_is_beaten_by_the_hedge(hedged):
+    vision = FakeVision(delay=0.5, plate="ABCD12")
+    local = FakeLocal(plate="HCJH72")
+    won_before = metrics.get_counter("router.hedge.won_by_hedge")
+
+    result = hedged(local, vision).recognize(b"image", EngineRouter.GCP_VISION)
+
+    assert (result.plate, result.engine) == ("HCJH72", EngineRouter.LOCAL)
+    assert metrics.get_counter("router.hedge.won_by_hedge") == won_before + 1
+
+
+def test_failing_hedge_leg_leaves_the_primary_result(hedged):
+    vision = FakeVision(delay=0.2, plate="ABCD12")
+    local = FakeLocal(error=RuntimeError("tesseract crashed"))
+
+    result = hedged(local, vision).recognize(b"image", EngineRouter.GCP_VISION)
+
+    assert (result.plate, result.engine) == ("ABCD12", EngineRouter.GCP_VISION)
+
+
+def test_failing_primary_leg_leaves_the_hedge_result(hedged):
+    vision = FakeVision(delay=0.1, errors=[GrpcUnavailable()])
+    local = FakeLocal(delay=0.2, plate="HCJH72")
+
+    result = hedged(local, vision).recognize(b"image", EngineRouter.GCP_VISION)
+
+    assert (result.plate, result.engine) == ("HCJH72", EngineRouter.LOCAL)
+
+
+def test_both_legs_failing_falls_back_to_local(hedged):
+    vision = FakeVision(delay=0.1, errors=[GCPVisionError("deadline exceeded"), GrpcUnavailable()])
+    local = FakeLocal(plate="HCJH72")
+
+    result = hedged(local, vision, target=EngineRouter.GCP_VISION).recognize(b"image", EngineRouter.GCP_VISION)
+
+    assert vision.calls == 2
+    assert (result.plate, result.engine) == ("HCJH72", EngineRouter.LOCAL)
+    assert local.calls == 1
@@ -0,0 +1,106 @@
+from concurrent import futures
+
+import grpc
+import pytest
+from google.cloud import vision
+
+from app.config.settings import GCPVisionConfig
+from app.services.gcp_vision_service import GCPVisionError, GCPVisionService
+
+
+class FakeImageAnnotator:
+    """In-process ImageAnnotator: fails the first calls with the queued status codes, then reads a plate"""
+
+    METHOD = "/google.cloud.vision.v1.ImageAnnotator/BatchAnnotateImages"
+
+    def __init__(self, text: str = "CHILE\nHCJH72"):
+        self.text = text
+        self.failures = []
+        self.requests = []
+        self.peers = set()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        self.server.add_generic_rpc_handlers([grpc.method_handlers_generic_handler(
+            "google.cloud.vision.v1.ImageAnnotator",
+            {"BatchAnnotateImages": grpc.unary_unary_rpc_method_handler(
+                self.batch_annotate_images,
+                request_deserializer=vision.BatchAnnotateImagesRequest.deserialize,
+                response_serializer=vision.BatchAnnotateImagesResponse.serialize
+            )}
+        )])
+        self.port = self.server.add_insecure_port("localhost:0")
+
+    def batch_annotate_images(self, request, context):
+        self.requests.append(request)
+        self.peers.add(context.peer())
+        if self.failures:
+            context.abort(self.failures.pop(0), "fake failure")
+        annotations = [vision.EntityAnnotation(description=self.text)] if self.text else []
+        return vision.BatchAnnotateImagesResponse(
+            responses=[vision.AnnotateImageResponse(text_annotations=annotations)]
+        )
+
+
+@pytest.fixture
+def fake_vision(monkeypatch):
+    fake = FakeImageAnnotator()
+    fake.server.start()
+    monkeypatch.setattr(GCPVisionConfig, "ENDPOINT", f"localhost:{fake.port}")
+    monkeypatch.setattr(GCPVisionConfig, "INSECURE_ENDPOINT", True)
+    monkeypatch.setattr(GCPVisionConfig, "DEADLINE_SECONDS", 2.0)
+    monkeypatch.setattr(GCPVisionConfig, "RETRY_INITIAL_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(GCPVisionConfig, "RETRY_MAX_BACKOFF_SECONDS", 0.05)
+    monkeypatch.setattr(GCPVisionService, "_shared_clients", {})
+    yield fake
+    fake.server.stop(None)
+
+
+def test_reads_plate_through_insecure_channel(fake_vision):
+    service = GCPVisionService()
+
+    assert service.extract_license_plate_from_image(b"jpeg bytes") == "HCJH72"
+    assert len(fake_vision.requests) == 1
+    image_request = fake_vision.requests[0].requests[0]
+    assert image_request.image.content == b"jpeg bytes"
+    assert image_request.features[0].type_ == vision.Feature.Type.TEXT_DETECTION
+
+
+def test_services_share_one_channel(fake_vision):
+    first, second = GCPVisionService(), GCPVisionService()
+
+    assert first.client is second.client
+    for service in (first, second, first):
+        assert service.extract_license_plate_from_image(b"jpeg bytes") == "HCJH72"
+    assert len(fake_vision.requests) == 3
+    assert len(fake_vision.peers) == 1
+
+
+def test_retries_transient_errors(fake_vision):
+    fake_vision.failures = [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.UNAVAILABLE]
+
+    assert GCPVisionService().extract_license_plate_from_image(b"jpeg bytes", raise_on_error=True) == "HCJH72"
+    assert len(fake_vision.requests) == 3
+
+
+def test_does_not_retry_permanent_errors(fake_vision):
+    fake_vision.failures = [grpc.StatusCode.INVALID_ARGUMENT]
+
+    with pytest.raises(GCPVisionError):
+        GCPVisionService().extract_license_plate_from_image(b"jpeg bytes", raise_on_error=True)
+    assert len(fake_vision.requests) == 1
+
+
+def test_gives_up_at_the_deadline(fake_vision, monkeypatch):
+    monkeypatch.setattr(GCPVisionConfig, "DEADLINE_SECONDS", 0.3)
+    fake_vision.failures = [grpc.StatusCode.UNAVAILABLE] * 1000
+    service = GCPVisionService()
+
+    with pytest.raises(GCPVisionError):
+        service.extract_license_plate_from_image(b"jpeg bytes", raise_on_error=True)
+    assert 1 < len(fake_vision.requests) < 1000
+    assert service.extract_license_plate_from_image(b"jpeg bytes") is None
+
+
+def test_no_text_is_not_an_error(fake_vision):
+    fake_vision.text = ""
+
+    assert GCPVisionService().extract_license_plate_from_image(b"jpeg bytes", raise_on_error=True) is None
@@ -0,0 +1,118 @@
+import struct
+import zlib
+
+import cv2
+import numpy as np
+import pytest
+from skimage.segmentation import clear_border as skimage_clear_border
+
+from app.services.image_processing_service import ImageProcessingService, ImageTooLargeError
+
+
+def random_masks(seed: int, count: int):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        h = int(rng.integers(3, 90))
+        w = int(rng.integers(3, 240))
+        kind = i % 3
+        if kind == 0:
+            yield (rng.random((h, w)) > 0.5).astype(np.uint8) * 255
+        elif kind == 1:
+            yield rng.integers(0, 256, (h, w), dtype=np.uint8)
+        else:
+            # Few-level blocks: large same-valued regions, many of them reaching the border
+            levels = rng.integers(0, 4, (h // 6 + 1, w // 6 + 1)).astype(np.uint8) * 85
+            yield cv2.resize(levels, (w, h), interpolation=cv2.INTER_NEAREST)
+
+
+def assert_matches_skimage(mask: np.ndarray):
+    np.testing.assert_array_equal(ImageProcessingService.clear_border(mask), skimage_clear_border(mask))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_clear_border_matches_skimage_on_random_masks(seed):
+    for mask in random_masks(seed, 60):
+        assert_matches_skimage(mask)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (2, 7), (7, 2), (3, 3), (40, 130)])
+def test_clear_border_empty_mask(shape):
+    mask = np.zeros(shape, np.uint8)
+    assert_matches_skimage(mask)
+    assert not ImageProcessingService.clear_border(mask).any()
+
+
+@pytest.mark.parametrize("shape", [(1, 5), (2, 2), (3, 3), (40, 130)])
+def test_clear_border_full_mask(shape):
+    assert_matches_skimage(np.full(shape, 255, np.uint8))
+
+
+def test_clear_border_keeps_interior_and_drops_border_touching_regions():
+    mask = np.zeros((40, 130), np.uint8)
+    mask[10:30, 20:35] = 255     # interior character
+    mask[0:15, 60:70] = 255      # touches the top edge
+    mask[25:40, 100:130] = 255   # touches the bottom-right corner
+    mask[5:8, 1:4] = 255         # one pixel off the left edge
+    mask[1:3, 45:50] = 255
+    mask[0, 50] = 255            # joined to the block above only diagonally
+    
+    cleared = ImageProcessingService.clear_border(mask)
+    
+    assert_matches_skimage(mask)
+    assert cleared[10:30, 20:35].all()
+    assert cleared[5:8, 1:4].all()
+    assert not cleared[0:15, 60:70].any()
+    assert not cleared[25:40, 100:130].any()
+    assert not cleared[1:3, 45:50].any()
+
+
+def test_clear_border_grayscale_regions_are_per_value():
+    crop = np.full((30, 90), 50, np.uint8)
+    crop[8:22, 10:80] = 200      # interior region of another value, enclosed by the border one
+    crop[8:22, 80:90] = 120      # touches the right edge
+    
+    cleared = ImageProcessingService.clear_border(crop)
+    
+    assert_matches_skimage(crop)
+    assert (cleared[8:22, 10:80] == 200).all()
+    assert not cleared[8:22, 80:90].any()
+
+
+def test_clear_border_does_not_modify_input():
+    mask = (np.random.default_rng(0).random((30, 90)) > 0.5).astype(np.uint8) * 255
+    original = mask.copy()
+    ImageProcessingService.clear_border(mask)
+    np.testing.assert_array_equal(mask, original)
+
+
+def png_header(width: int, height: int) -> bytes:
+    """A PNG whose IHDR claims width x height, with no pixel data behind it"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return ImageProcessingService.PNG_SIGNATURE + chunk(b'IHDR', ihdr) + chunk(b'IEND', b'')
+
+
+def jpeg_header(width: int, height: int) -> bytes:
+    """A small JPEG whose SOF0 segment is rewritten to claim width x height"""
+    encoded = bytearray(cv2.imencode('.jpg', np.zeros((8, 8), np.uint8))[1].tobytes())
+    sof = encoded.index(b'\xff\xc0')
+    encoded[sof + 5:sof + 9] = struct.pack('>HH', height, width)
+    return bytes(encoded)
+
+
+@pytest.mark.parametrize("encoded", [png_header(20000, 20000), jpeg_header(20000, 20000)])
+def test_oversized_header_is_rejected_before_decoding(encoded, monkeypatch):
+    monkeypatch.setattr(cv2, "imdecode", lambda *args: pytest.fail("decoded an oversized image"))
+
+    assert ImageProcessingService.read_image_size(encoded) == (20000, 20000)
+    with pytest.raises(ImageTooLargeError):
+        ImageProcessingService.decode_image(encoded)
+
+
+@pytest.mark.parametrize("extension", ['.webp', '.bmp', '.tiff'])
+def test_formats_without_size_check_are_not_decoded(extension, monkeypatch):
+    encoded = cv2.imencode(extension, np.zeros((40, 130, 3), np.uint8))[1].tobytes()
+    monkeypatch.setattr(cv2, "imdecode", lambda *args: pytest.fail(f"decoded a {extension} image"))
+
+    assert ImageProcessingService.decode_image(encoded) is None
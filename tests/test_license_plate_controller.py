@@ -0,0 +1,36 @@
+import io
+
+import pytest
+from flask import Flask
+
+from app.config.settings import GCPVisionConfig, ROIConfig
+from app.routes.api_routes import create_api_routes
+from app.services.gcp_vision_service import GCPVisionService
+from tests.test_image_processing import png_header
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # No credentials needed and no calls made: the channel to this endpoint is never used
+    monkeypatch.setattr(GCPVisionConfig, "ENDPOINT", "localhost:1")
+    monkeypatch.setattr(GCPVisionConfig, "INSECURE_ENDPOINT", True)
+    monkeypatch.setattr(GCPVisionService, "_shared_clients", {})
+    # Keep the learned camera ROIs on disk out of the test
+    monkeypatch.setattr(ROIConfig, "ENABLED", False)
+    app = Flask(__name__)
+    app.register_blueprint(create_api_routes())
+    return app.test_client()
+
+
+@pytest.mark.parametrize("path, empty", [
+    ("/detect-license-plate/v1", {"placa": None}),
+    ("/detect-license-plates/v1", {"placas": []}),
+])
+def test_oversized_image_is_rejected_with_413(client, path, empty):
+    response = client.post(path, data={"image": (io.BytesIO(png_header(20000, 20000)), "big.png")},
+                           content_type="multipart/form-data")
+
+    assert response.status_code == 413
+    body = response.get_json()
+    assert body["status"] == 413
+    assert body.items() >= empty.items()
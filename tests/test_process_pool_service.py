@@ -0,0 +1,63 @@
+import os
+import signal
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.process_pool_service import PipelinePoolService
+from app.utils.metrics import metrics
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PipelinePoolService(workers=1)
+    pool.warm_up()
+    yield pool
+    pool.shutdown()
+
+
+def jpeg(channels: int = 1) -> bytes:
+    shape = (120, 360) if channels == 1 else (120, 360, channels)
+    img = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    return cv2.imencode('.jpg', img)[1].tobytes()
+
+
+def test_color_localization_decodes_color_frames(pool, monkeypatch):
+    decoded = []
+    decode_image = pool.image_processor.decode_image
+
+    def record_decode(img_bytes, **kwargs):
+        img = decode_image(img_bytes, **kwargs)
+        decoded.append(img.shape)
+        return img
+    monkeypatch.setattr(pool.image_processor, "decode_image", record_decode)
+
+    monkeypatch.setattr(pool, "processing_params", replace(pool.processing_params, color_localization=None))
+    pool.recognize(jpeg(3))
+    monkeypatch.setattr(pool, "processing_params", replace(pool.processing_params, color_localization="seed"))
+    result = pool.recognize(jpeg(3))
+
+    assert decoded == [(120, 360), (120, 360, 3)]
+    assert not (result.error or "").startswith("Error in recognition")
+
+
+def test_broken_pool_is_replaced(pool):
+    broken_before = metrics.get_counter("process_pool.broken")
+    old_executor = pool._executor
+    for process in list(old_executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    # The request that finds the pool broken is served in-process
+    result = pool.recognize(jpeg())
+    assert result is not None
+    assert pool._executor is not old_executor
+    assert metrics.get_counter("process_pool.broken") == broken_before + 1
+
+    # Later requests go to the new pool again
+    tasks_before = metrics.get_counter("process_pool.tasks")
+    pool.recognize(jpeg())
+    assert metrics.get_counter("process_pool.tasks") == tasks_before + 1
+    assert metrics.get_counter("process_pool.broken") == broken_before + 1
@@ -0,0 +1,47 @@
+import json
+import os
+
+from app.services.profiling_service import RequestProfiler
+
+
+def profile(profiler, client_request_id=None):
+    session = profiler.start(client_request_id)
+    sum(i * i for i in range(10000))
+    profiler.finish(session, {"path": "/detect-license-plate/v1"})
+    return session
+
+
+def test_files_are_named_by_server_generated_id(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+
+    session = profile(profiler, "client-chosen")
+
+    assert session.profile_id != "client-chosen"
+    expected = [session.profile_id + suffix for suffix in RequestProfiler.KINDS.values()]
+    assert sorted(os.listdir(tmp_path)) == sorted(expected)
+    with open(profiler.profile_path(session.profile_id, "meta")) as f:
+        meta = json.load(f)
+    assert (meta["profile_id"], meta["client_request_id"]) == (session.profile_id, "client-chosen")
+    assert profiler.profile_path("client-chosen", "meta") is None
+
+
+def test_repeated_client_id_does_not_overwrite(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+
+    first = profile(profiler, "same-id")
+    second = profile(profiler, "same-id")
+
+    assert first.profile_id != second.profile_id
+    assert len(profiler.list_profiles()) == 2
+
+
+def test_existing_files_are_never_replaced(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    session = profiler.start()
+    existing = tmp_path / (session.profile_id + RequestProfiler.KINDS["folded"])
+    existing.write_text("keep me\n")
+
+    profiler.finish(session)
+
+    assert existing.read_text() == "keep me\n"
+    assert profiler.profile_path(session.profile_id, "meta") is None
@@ -0,0 +1,85 @@
+import pytest
+
+from app.config.settings import AdaptiveScheduleConfig
+from app.services.license_plate_service import LicensePlateService
+from app.services.threshold_schedule_service import AdaptiveThresholdScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = AdaptiveThresholdScheduler(str(tmp_path / "schedule.json"))
+    yield scheduler
+    scheduler.close()
+
+
+def record(scheduler, arm, successes, trials, kind=AdaptiveThresholdScheduler.THRESHOLDS):
+    for i in range(trials):
+        scheduler.record(AdaptiveThresholdScheduler.GLOBAL_CONTEXT, kind, arm, i < successes)
+
+
+def test_cold_schedule_keeps_configured_order(scheduler):
+    thresholds = [150, 100, 200, 50]
+    record(scheduler, 200, 25, 25)
+
+    for _ in range(50):
+        assert scheduler.order_thresholds(AdaptiveThresholdScheduler.GLOBAL_CONTEXT, thresholds) == thresholds
+
+
+def test_order_is_learned_once_every_arm_has_enough_trials(scheduler):
+    trials = AdaptiveScheduleConfig.MIN_ARM_TRIALS * 4
+    record(scheduler, 150, 0, trials)
+    record(scheduler, 100, trials // 2, trials)
+    record(scheduler, 200, trials, trials)
+
+    order = scheduler.order_thresholds(AdaptiveThresholdScheduler.GLOBAL_CONTEXT, [150, 100, 200])
+
+    assert order == [200, 100, 150]
+
+
+def test_pruning_is_opt_in(scheduler, monkeypatch):
+    trials = max(AdaptiveScheduleConfig.PRUNE_MIN_TRIALS, AdaptiveScheduleConfig.MIN_ARM_TRIALS)
+    record(scheduler, 150, 0, trials)
+    record(scheduler, 100, trials, trials)
+    context = AdaptiveThresholdScheduler.GLOBAL_CONTEXT
+
+    assert sorted(scheduler.order_thresholds(context, [150, 100])) == [100, 150]
+
+    monkeypatch.setattr(AdaptiveScheduleConfig, "PRUNE_ENABLED", True)
+    monkeypatch.setattr(AdaptiveScheduleConfig, "PRUNED_EXPLORATION_RATE", 0.0)
+    assert scheduler.order_thresholds(context, [150, 100]) == [100]
+
+
+@pytest.mark.parametrize("variants", [
+    ["processed", "inverted", "original"],
+    ["inverted", "processed", "original"],
+    ["original", "inverted", "processed"],
+    ["inverted", "original", "processed"],
+])
+def test_accepted_variant_does_not_depend_on_schedule_order(variants, monkeypatch):
+    service = LicensePlateService()
+    reads = {"processed": "HCJH72", "inverted": "HCJH72", "original": "HCJH72"}
+    calls = []
+
+    def ocr_variant(variant, img):
+        calls.append(variant)
+        return reads[variant]
+    monkeypatch.setattr(service, "_ocr_variant", ocr_variant)
+
+    text, variant, made = service._read_variants(None, variants, None)
+
+    assert (text, variant) == ("HCJH72", "processed")
+    assert made == len(calls) == len(set(calls))
+
+
+def test_rejected_better_variant_keeps_scheduled_read(monkeypatch):
+    service = LicensePlateService()
+    reads = {"processed": "???", "inverted": "HCJH72", "original": "HCJH72"}
+    calls = []
+
+    def ocr_variant(variant, img):
+        calls.append(variant)
+        return reads[variant]
+    monkeypatch.setattr(service, "_ocr_variant", ocr_variant)
+
+    assert service._read_variants(None, ["original", "processed", "inverted"], None)[:2] == ("HCJH72", "inverted")
+    assert calls == ["original", "processed", "inverted"]